@@ -0,0 +1,62 @@
+# acesso direto com LivroMmapReader x leitura sequencial com LivroInputStream: tempo de
+# abertura (índice no rodapé, arquivo .idx ou varredura) e de leituras em posições aleatórias
+# uso (a partir de trabalho1/): python -m benchmarks.bench_mmap [n_registros] [n_leituras]
+import os
+import random
+import sys
+import tempfile
+import time
+from streams.esquema import VERSAO_ESQUEMA
+from streams.livro_input_stream import LivroInputStream
+from streams.livro_mmap_reader import LivroMmapReader
+from streams.livro_output_stream import LivroOutputStream
+from benchmarks.gerador import gerar_produtos
+
+N = 1_000_000
+LEITURAS = 10_000
+
+def _medir(f) -> float:
+    inicio = time.perf_counter()
+    f()
+    return time.perf_counter() - inicio
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else N
+    leituras = int(sys.argv[2]) if len(sys.argv) > 2 else LEITURAS
+    produtos = gerar_produtos(n)
+    rnd = random.Random(7)
+    posicoes = [rnd.randrange(n) for _ in range(leituras)]
+    ids = [produtos[k].id for k in posicoes]
+    with tempfile.TemporaryDirectory() as tmp:
+        com_rodape = os.path.join(tmp, "com_rodape.bin")
+        sem_rodape = os.path.join(tmp, "sem_rodape.bin")
+        for caminho, indice in ((com_rodape, True), (sem_rodape, False)):
+            with open(caminho, "wb") as f:
+                LivroOutputStream(produtos, n, f, versao=VERSAO_ESQUEMA, indice=indice).send_all()
+        del produtos
+        print(f"{n:,} registros, {os.path.getsize(sem_rodape) / 1e6:.1f} MB "
+              f"(+{(os.path.getsize(com_rodape) - os.path.getsize(sem_rodape)) / 1e6:.1f} MB de índice)")
+
+        def sequencial() -> None:
+            with open(sem_rodape, "rb") as f:
+                LivroInputStream(f).read_all()[posicoes[-1]]
+        print(f"{'leitura sequencial completa':<34} {_medir(sequencial):>8.3f} s")
+
+        def abrir(caminho: str) -> None:
+            LivroMmapReader(caminho).close()
+        print(f"{'abertura, varredura':<34} {_medir(lambda: abrir(sem_rodape)):>8.3f} s")
+        with LivroMmapReader(sem_rodape) as r:
+            r.salvar_indice()
+        print(f"{'abertura, arquivo .idx':<34} {_medir(lambda: abrir(sem_rodape)):>8.3f} s")
+        print(f"{'abertura, rodapé':<34} {_medir(lambda: abrir(com_rodape)):>8.3f} s")
+
+        with LivroMmapReader(com_rodape) as r:
+            s = _medir(lambda: [r[k] for k in posicoes])
+            print(f"{f'{leituras:,} leituras por posição':<34} {s:>8.3f} s {leituras / s:>12,.0f} leituras/s")
+            s_ids = _medir(lambda: r.buscar_id(ids[0]))
+            print(f"{'montagem do mapa de ids':<34} {s_ids:>8.3f} s")
+            s = _medir(lambda: [r.buscar_id(i) for i in ids])
+            print(f"{f'{leituras:,} leituras por id':<34} {s:>8.3f} s {leituras / s:>12,.0f} leituras/s")
+
+if __name__ == "__main__":
+    main()
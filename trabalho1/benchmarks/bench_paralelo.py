@@ -0,0 +1,46 @@
+# escala da codificação/decodificação em blocos com vários processos (processos=1 é o
+# caminho sequencial de sempre); a aceleração fica limitada pelos núcleos da máquina e
+# pela serialização dos blocos entre processos; "cpu pai" é o tempo de CPU do processo
+# principal (separar blocos, serializar, juntar), a parte que não escala
+# uso (a partir de trabalho1/): python -m benchmarks.bench_paralelo [n_registros] [processos...]
+import io
+import os
+import sys
+import time
+from streams.esquema import VERSAO_ESQUEMA, VERSAO_TEXTO
+from streams.livro_input_stream import LivroInputStream
+from streams.livro_output_stream import LivroOutputStream
+from benchmarks.gerador import gerar_produtos
+
+N = 1_000_000
+PROCESSOS = [1, 2, 4, 8]
+
+def _codificar(produtos, versao: int, processos: int) -> bytes:
+    destino = io.BytesIO()
+    LivroOutputStream(produtos, len(produtos), destino, versao=versao, processos=processos).send_all()
+    return destino.getvalue()
+
+def _decodificar(dados: bytes, processos: int) -> int:
+    return len(LivroInputStream(io.BytesIO(dados), processos=processos).read_all())
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else N
+    processos = [int(p) for p in sys.argv[2:]] or PROCESSOS
+    produtos = gerar_produtos(n)
+    print(f"{n:,} registros, {os.cpu_count()} núcleos")
+    print(f"{'formato':>8} {'etapa':>12} {'processos':>9} {'s':>8} {'registros/s':>12} {'aceleração':>10} {'cpu pai':>8}")
+    for formato, versao in (("texto", VERSAO_TEXTO), ("esquema", VERSAO_ESQUEMA)):
+        dados = _codificar(produtos, versao, 1)
+        for etapa, medir in (("codificação", lambda p: _codificar(produtos, versao, p)),
+                             ("decodificação", lambda p: _decodificar(dados, p))):
+            base = None
+            for p in processos:
+                inicio, cpu = time.perf_counter(), time.process_time()
+                medir(p)
+                s = time.perf_counter() - inicio
+                cpu = time.process_time() - cpu
+                base = base or s
+                print(f"{formato:>8} {etapa:>12} {p:>9} {s:>8.2f} {n / s:>12,.0f} {base / s:>9.2f}x {cpu:>8.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# vazão da decodificação do formato de LivroOutputStream: leitura antiga (bytes
+# concatenados + BytesIO + read por campo) x buffer reaproveitado com readinto/unpack_from,
+# e o formato com esquema (nomes e tipos no cabeçalho, registros só com valores)
+# uso (a partir de trabalho1/): python -m benchmarks.bench_streams [n_registros]
+import io
+import os
+import socket
+import struct
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List
+from streams.esquema import VERSAO_ESQUEMA, VERSAO_TEXTO
+from streams.livro_input_stream import LivroInputStream
+from streams.livro_output_stream import LivroOutputStream
+from streams.socket_reader import _SocketReader
+from benchmarks.gerador import gerar_produtos
+
+N = 1_000_000
+
+# LivroInputStream antigo, reproduzido para comparação
+class LivroInputStreamAntigo:
+    def __init__(self, origem: Any) -> None:
+        self._src = origem
+
+    def _read_exact(self, n: int) -> bytes:
+        data = b""
+        while len(data) < n:
+            chunk = self._src.read(n - len(data))
+            if not chunk:
+                raise EOFError("Dados insuficientes (EOF).")
+            data += chunk
+        return data
+
+    def _decode_obj(self) -> Dict[str, str]:
+        (length,) = struct.unpack(">I", self._read_exact(4))
+        payload = io.BytesIO(self._read_exact(length))
+        campos_qtd = payload.read(1)[0]
+        obj: Dict[str, str] = {}
+        for _ in range(campos_qtd):
+            name_len = payload.read(1)[0]
+            name = payload.read(name_len).decode("utf-8")
+            (val_len,) = struct.unpack(">I", payload.read(4))
+            obj[name] = payload.read(val_len).decode("utf-8")
+        return obj
+
+    def read_all(self) -> List[Dict[str, str]]:
+        (n_objs,) = struct.unpack(">I", self._read_exact(4))
+        return [self._decode_obj() for _ in range(n_objs)]
+
+def _medir_arquivo(caminho: str, cls) -> float:
+    with open(caminho, "rb") as f:
+        inicio = time.perf_counter()
+        cls(f).read_all()
+        return time.perf_counter() - inicio
+
+# o arquivo é enviado por um socket local em blocos grandes; mede só o leitor
+def _medir_socket(caminho: str, cls) -> float:
+    a, b = socket.socketpair()
+    def enviar() -> None:
+        with open(caminho, "rb") as f:
+            while bloco := f.read(1 << 20):
+                a.sendall(bloco)
+        a.close()
+    escritor = threading.Thread(target=enviar)
+    escritor.start()
+    inicio = time.perf_counter()
+    cls(_SocketReader(b)).read_all()
+    segundos = time.perf_counter() - inicio
+    escritor.join()
+    b.close()
+    return segundos
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else N
+    produtos = gerar_produtos(n)
+    with tempfile.TemporaryDirectory() as tmp:
+        arquivos = {}
+        for formato, versao in (("texto", VERSAO_TEXTO), ("esquema", VERSAO_ESQUEMA)):
+            arquivos[formato] = os.path.join(tmp, f"saida_sebo_{formato}.bin")
+            with open(arquivos[formato], "wb") as f:
+                LivroOutputStream(produtos, len(produtos), f, versao=versao).send_all()
+            print(f"{formato}: {n:,} registros, {os.path.getsize(arquivos[formato]) / 1e6:.1f} MB")
+        del produtos
+        print(f"{'origem':>8} {'formato':>8} {'leitor':>8} {'s':>8} {'MB/s':>8} {'registros/s':>12}")
+        for origem, medir in (("arquivo", _medir_arquivo), ("socket", _medir_socket)):
+            for formato, nome, cls in (("texto", "antigo", LivroInputStreamAntigo),
+                                       ("texto", "buffer", LivroInputStream),
+                                       ("esquema", "buffer", LivroInputStream)):
+                mb = os.path.getsize(arquivos[formato]) / 1e6
+                s = medir(arquivos[formato], cls)
+                print(f"{origem:>8} {formato:>8} {nome:>8} {s:>8.2f} {mb / s:>8.1f} {n / s:>12,.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ from testes.teste_stdout import teste_stdout
 from testes.teste_arquivo import teste_leitura_arquivo, teste_escrita_arquivo
 from testes.teste_tcp import teste_tcp_envia, teste_tcp_recebe
 from testes.teste_stdin import teste_stdin
+from testes.teste_fluxo import teste_fluxo_tcp
 
 if __name__ == "__main__":
     teste_stdout()
@@ -13,4 +14,5 @@ if __name__ == "__main__":
         sys.stdin = f
         teste_stdin()
     teste_escrita_arquivo()
-    teste_tcp_recebe()
\ No newline at end of file
+    teste_tcp_recebe()
+    teste_fluxo_tcp()
\ No newline at end of file
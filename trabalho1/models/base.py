@@ -3,13 +3,15 @@ from typing import Literal
 from abc import ABC, abstractmethod
 
 class Trocavel(ABC):
+    __slots__ = ()
+
     @abstractmethod
     # define a política de troca entre produtos
     def pode_trocar_por(self, outro: "Produto") -> bool:
         pass
 
 
-@dataclass
+@dataclass(slots=True)
 class Produto(ABC):
     id: str
     titulo: str
@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from models.base import Produto, Trocavel
 
-@dataclass
+@dataclass(slots=True)
 class EBook(Produto, Trocavel):
     autor: str
     isbn: str
@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from models.base import Produto, Trocavel
 from models.ebook import EBook
 
-@dataclass
+@dataclass(slots=True)
 class Livro(Produto, Trocavel):
     autor: str
     isbn: str
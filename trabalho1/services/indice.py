@@ -0,0 +1,66 @@
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Set
+
+N_GRAMA = 3
+
+# normaliza texto para busca: sem acentos e sem diferença de caixa ("Anéis" -> "aneis")
+def normalizar(texto: str) -> str:
+    decomposto = unicodedata.normalize("NFKD", texto)
+    return "".join(c for c in decomposto if not unicodedata.combining(c)).casefold()
+
+# conjunto de trigramas de um texto já normalizado
+def trigramas(texto: str) -> Set[str]:
+    return {texto[i:i + N_GRAMA] for i in range(len(texto) - N_GRAMA + 1)}
+
+# índice invertido de trigramas sobre título e autor dos produtos
+class IndiceTexto:
+    def __init__(self) -> None:
+        self._postings: Dict[str, Set[str]] = {}
+        self._textos: Dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._textos)
+
+    # indexa (ou reindexa) um documento
+    def adicionar(self, doc_id: str, campos: Iterable[Optional[str]]) -> None:
+        self.remover(doc_id)
+        # "\n" separa os campos para que nenhum termo case atravessando título e autor
+        texto = "\n".join(normalizar(str(c)) for c in campos if c is not None)
+        self._textos[doc_id] = texto
+        for tri in trigramas(texto):
+            self._postings.setdefault(tri, set()).add(doc_id)
+
+    # remove um documento do índice (sem erro se não existir)
+    def remover(self, doc_id: str) -> None:
+        texto = self._textos.pop(doc_id, None)
+        if texto is None:
+            return
+        for tri in trigramas(texto):
+            docs = self._postings.get(tri)
+            if docs is not None:
+                docs.discard(doc_id)
+                if not docs:
+                    del self._postings[tri]
+
+    # retorna os IDs cujo texto contém o termo como substring
+    def buscar(self, termo: str) -> Set[str]:
+        termo = normalizar(termo)
+        if len(termo) < N_GRAMA:
+            # termos curtos não têm trigramas: varre os textos já normalizados
+            return {doc_id for doc_id, texto in self._textos.items() if termo in texto}
+
+        listas: List[Set[str]] = []
+        for tri in trigramas(termo):
+            docs = self._postings.get(tri)
+            if not docs:
+                return set()
+            listas.append(docs)
+        listas.sort(key=len)
+
+        candidatos = set(listas[0])
+        for docs in listas[1:]:
+            candidatos &= docs
+            if not candidatos:
+                return candidatos
+        # trigramas em comum não garantem a substring: confirma no texto
+        return {doc_id for doc_id in candidatos if termo in self._textos[doc_id]}
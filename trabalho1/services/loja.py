@@ -1,15 +1,45 @@
+import itertools
 from dataclasses import dataclass, field
-from typing import List, Dict
+from typing import Dict, Iterator, List
 from models.base import Produto
+from services.indice import IndiceTexto
 
 @dataclass
 class Loja:
     nome: str
     estoque: Dict[str, Produto] = field(default_factory=dict)
+    _indice_texto: IndiceTexto = field(default_factory=IndiceTexto, init=False, repr=False)
+    _ordem: Dict[str, int] = field(default_factory=dict, init=False, repr=False)
+    _seq: Iterator[int] = field(default_factory=itertools.count, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        for produto in self.estoque.values():
+            self._indexar(produto)
+
+    # mantém os índices em dia com o produto
+    def _indexar(self, produto: Produto) -> None:
+        if produto.id not in self._ordem:
+            self._ordem[produto.id] = next(self._seq)
+        self._indice_texto.adicionar(produto.id, (produto.titulo, getattr(produto, "autor", None)))
 
     # adiciona um produto ao estoque
     def add_produto(self, produto: Produto) -> None:
         self.estoque[produto.id] = produto
+        self._indexar(produto)
+
+    # substitui um produto existente, mantendo sua posição no estoque
+    def substituir(self, produto: Produto) -> None:
+        if produto.id not in self.estoque:
+            raise KeyError("Produto não encontrado.")
+        self.add_produto(produto)
+
+    # remove um produto do estoque
+    def remover(self, produto_id: str) -> Produto:
+        if produto_id not in self.estoque:
+            raise KeyError("Produto não encontrado.")
+        self._indice_texto.remover(produto_id)
+        del self._ordem[produto_id]
+        return self.estoque.pop(produto_id)
 
     # obtém um produto pelo ID
     def get(self, produto_id: str) -> Produto:
@@ -21,12 +51,7 @@ class Loja:
     def listar(self) -> List[Produto]:
         return list(self.estoque.values())
 
-    # busca produtos pelo termo
+    # busca produtos pelo termo (substring no título ou autor, sem diferenciar acentos)
     def buscar(self, termo: str) -> List[Produto]:
-        termo = termo.lower()
-        return [
-            p
-            for p in self.estoque.values()
-            if termo in p.titulo.lower()
-            or ("autor" in p.__dict__ and termo in str(p.__dict__["autor"]).lower())
-        ]
+        ids = sorted(self._indice_texto.buscar(termo), key=self._ordem.__getitem__)
+        return [self.estoque[i] for i in ids]
@@ -0,0 +1,139 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import struct
+import typing
+
+# Formato com esquema (versão 2): no lugar da contagem vem COM_ESQUEMA, seguido de
+# versão (u8), contagem (u32, ou SEM_CONTAGEM) e o esquema (u32 tamanho + campos);
+# cada campo do esquema: nome (u8 tamanho + UTF-8) e tipo (u8). Os registros continuam
+# com u32 de tamanho na frente, mas trazem só os valores, na ordem do esquema:
+#   u32 (4 bytes), f64 (8 bytes), bool (1 byte), utf8 (tamanho em varint + bytes)
+# O varint usa 7 bits por byte (o bit alto indica que há mais bytes): textos de até
+# 127 bytes gastam 1 byte de tamanho.
+COM_ESQUEMA = 0xFFFFFFFE
+VERSAO_TEXTO = 1
+VERSAO_ESQUEMA = 2
+
+TIPOS = {"u32": 1, "f64": 2, "bool": 3, "utf8": 4}
+_NOMES_TIPOS = {codigo: nome for nome, codigo in TIPOS.items()}
+_FIXOS = {"u32": "I", "f64": "d", "bool": "?"}
+_PYTHON = {bool: "bool", int: "u32", float: "f64", str: "utf8"}
+
+_U32 = struct.Struct(">I")
+CABECALHO = struct.Struct(">BII")  # versão, contagem, tamanho do esquema
+
+def _varint(n: int) -> bytes:
+    if n < 0x80:
+        return bytes((n,))
+    partes = bytearray()
+    while n >= 0x80:
+        partes.append((n & 0x7F) | 0x80)
+        n >>= 7
+    partes.append(n)
+    return bytes(partes)
+
+# retorna (valor, nova posição)
+def _ler_varint(buf: Any, pos: int) -> Tuple[int, int]:
+    n = 0
+    deslocamento = 0
+    while True:
+        b = buf[pos]
+        pos += 1
+        n |= (b & 0x7F) << deslocamento
+        if b < 0x80:
+            return n, pos
+        deslocamento += 7
+
+# tipo de um campo pela anotação da classe (Literal de textos vira utf8);
+# sem anotação conhecida, pelo tipo do valor
+def inferir_tipo(obj: Any, nome: str) -> str:
+    try:
+        anotacao = typing.get_type_hints(type(obj)).get(nome)
+    except Exception:
+        anotacao = None
+    if typing.get_origin(anotacao) is typing.Literal:
+        anotacao = type(typing.get_args(anotacao)[0])
+    return _PYTHON.get(anotacao) or _PYTHON.get(type(getattr(obj, nome)), "utf8")
+
+class Esquema:
+    def __init__(self, campos: Sequence[Tuple[str, str]]) -> None:
+        for nome, tipo in campos:
+            if tipo not in TIPOS:
+                raise ValueError(f"Tipo desconhecido para o campo {nome!r}: {tipo}")
+            if len(nome.encode("utf-8")) > 255:
+                raise ValueError("Nome do campo ficou grande demais para 1 byte de tamanho.")
+        self.campos = list(campos)
+        # campos fixos consecutivos viram um único struct; cada texto é um passo próprio
+        self._passos: List[Tuple[Optional[struct.Struct], Any]] = []
+        fixos: List[Tuple[str, str]] = []
+        for nome, tipo in self.campos + [("", "utf8")]:
+            if tipo in _FIXOS:
+                fixos.append((nome, tipo))
+                continue
+            if fixos:
+                formato = ">" + "".join(_FIXOS[t] for _, t in fixos)
+                self._passos.append((struct.Struct(formato), tuple(n for n, _ in fixos)))
+                fixos = []
+            if nome:
+                self._passos.append((None, nome))
+
+    # esquema dos `campos` com os tipos informados ou inferidos do primeiro objeto
+    @classmethod
+    def montar(cls, campos: Sequence[str], tipos: Optional[Sequence[str]], exemplo: Any) -> "Esquema":
+        if tipos is None:
+            tipos = [inferir_tipo(exemplo, c) if exemplo is not None else "utf8" for c in campos]
+        if len(tipos) != len(campos):
+            raise ValueError("Informe um tipo para cada campo.")
+        return cls(list(zip(campos, tipos)))
+
+    def cabecalho(self, contagem: int) -> bytes:
+        partes = [bytes([len(self.campos)])]
+        for nome, tipo in self.campos:
+            nome_b = nome.encode("utf-8")
+            partes.append(bytes([len(nome_b)]) + nome_b + bytes([TIPOS[tipo]]))
+        esquema = b"".join(partes)
+        return _U32.pack(COM_ESQUEMA) + CABECALHO.pack(VERSAO_ESQUEMA, contagem, len(esquema)) + esquema
+
+    @classmethod
+    def ler(cls, dados: bytes) -> "Esquema":
+        campos = []
+        pos = 1
+        for _ in range(dados[0]):
+            n = dados[pos]
+            nome = dados[pos + 1:pos + 1 + n].decode("utf-8")
+            codigo = dados[pos + 1 + n]
+            if codigo not in _NOMES_TIPOS:
+                raise ValueError(f"Tipo desconhecido no esquema: {codigo}")
+            campos.append((nome, _NOMES_TIPOS[codigo]))
+            pos += n + 2
+        return cls(campos)
+
+    # payload de um registro (sem o tamanho na frente)
+    def codificar(self, obj: Any) -> bytes:
+        partes = []
+        for st, nomes in self._passos:
+            if st is None:
+                valor = getattr(obj, nomes)
+                dados = (valor if type(valor) is str else str(valor)).encode("utf-8")
+                partes.append(_varint(len(dados)))
+                partes.append(dados)
+            else:
+                partes.append(st.pack(*[getattr(obj, n) for n in nomes]))
+        return b"".join(partes)
+
+    # registro em buf[pos:fim], com os valores já nos tipos do esquema
+    def decodificar(self, buf: Any, pos: int, fim: int) -> Dict[str, Any]:
+        obj: Dict[str, Any] = {}
+        for st, nomes in self._passos:
+            if st is None:
+                n = buf[pos]
+                pos += 1
+                if n >= 0x80:
+                    n, pos = _ler_varint(buf, pos - 1)
+                obj[nomes] = buf[pos:pos + n].decode()
+                pos += n
+            else:
+                obj.update(zip(nomes, st.unpack_from(buf, pos)))
+                pos += st.size
+        if pos > fim:
+            raise EOFError("Payload truncado.")
+        return obj
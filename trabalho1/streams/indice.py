@@ -0,0 +1,66 @@
+from array import array
+from typing import Any, List, Optional, Sequence, Tuple
+import struct
+import sys
+from streams.esquema import _ler_varint, _varint
+
+# Índice de posições dos registros, usado pelo LivroMmapReader. Vai no fim do próprio
+# arquivo (rodapé, depois dos registros: leitores sequenciais nem chegam a ele) ou num
+# arquivo ao lado (<arquivo>.idx):
+#   offsets: u64 por registro (posição do tamanho do registro, a partir do início do fluxo)
+#   ids (se COM_IDS): o campo "id" de cada registro, em ordem (varint tamanho + UTF-8)
+#   rodapé fixo: início do índice (u64), tamanho dos dados (u64), registros (u32),
+#                flags (u8), MAGIC_INDICE
+MAGIC_INDICE = b"LIVIDX01"
+COM_IDS = 1
+RODAPE = struct.Struct(">QQIB8s")
+
+def _offsets_bytes(offsets: Sequence[int]) -> bytes:
+    arr = array("Q", offsets)
+    if sys.byteorder == "little":
+        arr.byteswap()
+    return arr.tobytes()
+
+# índice + rodapé prontos para gravar; `inicio` é a posição em que o índice vai ficar
+# (no arquivo de dados, para o rodapé; 0 no arquivo .idx)
+def codificar_indice(offsets: Sequence[int], ids: Optional[Sequence[str]], inicio: int, tamanho_dados: int) -> bytes:
+    partes = [_offsets_bytes(offsets)]
+    if ids is not None:
+        for i in ids:
+            dados = i.encode("utf-8")
+            partes.append(_varint(len(dados)))
+            partes.append(dados)
+    partes.append(RODAPE.pack(inicio, tamanho_dados, len(offsets), COM_IDS if ids is not None else 0, MAGIC_INDICE))
+    return b"".join(partes)
+
+# rodapé no fim de buf: (início do índice, tamanho dos dados, registros, flags) ou None
+def ler_rodape(buf: Any) -> Optional[Tuple[int, int, int, int]]:
+    if len(buf) < RODAPE.size:
+        return None
+    inicio, tamanho_dados, n, flags, magic = RODAPE.unpack_from(buf, len(buf) - RODAPE.size)
+    if magic != MAGIC_INDICE:
+        return None
+    return inicio, tamanho_dados, n, flags
+
+def ler_offsets(buf: Any, inicio: int, n: int) -> array:
+    arr = array("Q")
+    arr.frombytes(buf[inicio:inicio + 8 * n])
+    if sys.byteorder == "little":
+        arr.byteswap()
+    return arr
+
+# os ids ficam entre os offsets e o rodapé; copiados de uma vez (num mmap, cada acesso
+# por índice custa bem mais que em bytes)
+def ler_ids(buf: Any, inicio: int, n: int) -> List[str]:
+    dados = buf[inicio + 8 * n:len(buf) - RODAPE.size]
+    ids = []
+    pos = 0
+    for _ in range(n):
+        tamanho = dados[pos]
+        if tamanho < 0x80:
+            pos += 1
+        else:
+            tamanho, pos = _ler_varint(dados, pos)
+        ids.append(dados[pos:pos + tamanho].decode("utf-8"))
+        pos += tamanho
+    return ids
@@ -1,56 +1,234 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 import io
 import struct
+from streams.esquema import CABECALHO, COM_ESQUEMA, VERSAO_ESQUEMA, VERSAO_TEXTO, Esquema
+from streams.livro_output_stream import FIM_FLUXO, REGISTROS_POR_BLOCO, SEM_CONTAGEM
+
+_U32 = struct.Struct(">I")
+_unpack_u32 = _U32.unpack_from
+TAMANHO_BUFFER = 1 << 16
+
+# registro da versão 1 em buf[pos:fim] (nome e valor de cada campo como texto);
+# buf é qualquer objeto indexável por bytes (bytearray, mmap)
+def decodificar_texto(buf: Any, pos: int, fim: int) -> Dict[str, str]:
+    campos_qtd = buf[pos]
+    pos += 1
+    obj: Dict[str, str] = {}
+    for _ in range(campos_qtd):
+        n = buf[pos]
+        pos += 1
+        name = buf[pos:pos + n].decode()
+        pos += n
+        (n,) = _unpack_u32(buf, pos)
+        pos += 4
+        obj[name] = buf[pos:pos + n].decode()
+        pos += n
+    # um campo que passe do fim do payload invade o próximo registro: verifica uma vez só
+    if pos > fim:
+        raise EOFError("Payload truncado.")
+    return obj
+
+# executado nos processos filhos: decodifica um segmento de registros enquadrados
+# (u32 tamanho + payload), na ordem
+def decodificar_bloco(segmento: bytes, esquema: Optional[List[Tuple[str, str]]]) -> List[Dict[str, Any]]:
+    decodificar = Esquema(esquema).decodificar if esquema is not None else decodificar_texto
+    objs = []
+    pos = 0
+    while pos < len(segmento):
+        (tamanho,) = _unpack_u32(segmento, pos)
+        if tamanho < 1:
+            raise EOFError("Payload truncado.")
+        fim = pos + 4 + tamanho
+        objs.append(decodificar(segmento, pos + 4, fim))
+        pos = fim
+    return objs
 
 class LivroInputStream(io.BufferedIOBase):
-    def __init__(self, origem: Any, close_origem: bool = False) -> None:
+    # com processos > 1, read_all separa os registros em blocos de registros_por_bloco
+    # (só lendo os tamanhos) e os decodifica num ProcessPoolExecutor, juntando os
+    # resultados na ordem original; a iteração continua sequencial
+    def __init__(
+        self,
+        origem: Any,
+        close_origem: bool = False,
+        tamanho_buffer: int = TAMANHO_BUFFER,
+        processos: int = 1,
+        registros_por_bloco: int = REGISTROS_POR_BLOCO,
+    ) -> None:
         super().__init__()
         self._src = origem
         self._close = close_origem
+        # buffer reaproveitado entre registros: dados válidos em [_pos, _fim)
+        self._buf = bytearray(tamanho_buffer)
+        self._view = memoryview(self._buf)
+        self._pos = 0
+        self._fim = 0
+        # readinto1 faz no máximo uma leitura na origem, sem esperar encher o buffer
+        self._readinto = getattr(origem, "readinto1", None) or getattr(origem, "readinto", None)
+        # objetos ainda por ler: None antes do cabeçalho, SEM_CONTAGEM até o marcador de fim
+        self._restantes: Optional[int] = None
+        # definidos pelo cabeçalho: o formato com esquema devolve valores tipados
+        self.versao: Optional[int] = None
+        self.esquema: Optional[Esquema] = None
+        self._processos = processos
+        self._registros_por_bloco = max(1, registros_por_bloco)
 
-    def _read_exact(self, n: int) -> bytes:
-        data = b""
-        while len(data) < n:
-            chunk = self._src.read(n - len(data))
-            if not chunk:
+    # garante pelo menos n bytes não consumidos no buffer
+    def _garantir(self, n: int) -> None:
+        disponivel = self._fim - self._pos
+        if disponivel >= n:
+            return
+        # o que sobrou vai para o início; o buffer só cresce se um registro não couber
+        if n > len(self._buf):
+            self._view.release()
+            novo = bytearray(max(n, 2 * len(self._buf)))
+            novo[:disponivel] = self._buf[self._pos:self._fim]
+            self._buf = novo
+            self._view = memoryview(novo)
+        elif self._pos:
+            self._view[:disponivel] = self._view[self._pos:self._fim]
+        self._pos, self._fim = 0, disponivel
+        while self._fim < n:
+            lidos = self._preencher(n)
+            if not lidos:
                 raise EOFError("Dados insuficientes (EOF).")
-            data += chunk
-        return data
+            self._fim += lidos
+
+    def _preencher(self, n: int) -> int:
+        if self._readinto is not None:
+            return self._readinto(self._view[self._fim:]) or 0
+        # origem só com read (ex.: socket): pede só o que falta, para não bloquear
+        # esperando dados além do registro atual
+        dados = self._src.read(n - self._fim)
+        self._buf[self._fim:self._fim + len(dados)] = dados
+        return len(dados)
 
-    def _decode_obj(self) -> Dict[str, str]:
-        (length,) = struct.unpack(">I", self._read_exact(4))
-        payload = io.BytesIO(self._read_exact(length))
+    def _read_exact(self, n: int) -> bytes:
+        self._garantir(n)
+        dados = bytes(self._view[self._pos:self._pos + n])
+        self._pos += n
+        return dados
 
-        campos_qtd_raw = payload.read(1)
-        if not campos_qtd_raw:
+    # payload decodificado direto do buffer por offset (sem BytesIO nem cópia);
+    # fora do caminho comum (registro incompleto no buffer) recorre a _garantir
+    def _decode_obj(self) -> Dict[str, Any]:
+        pos = self._pos
+        if self._fim - pos < 4:
+            self._garantir(4)
+            pos = self._pos
+        (length,) = _unpack_u32(self._buf, pos)
+        fim = pos + 4 + length
+        if fim > self._fim:
+            self._garantir(4 + length)
+            pos = self._pos
+            fim = pos + 4 + length
+        self._pos = fim
+        if length < 1:
             raise EOFError("Payload truncado.")
-        campos_qtd = campos_qtd_raw[0]
-
-        obj: Dict[str, str] = {}
-        for _ in range(campos_qtd):
-            name_len_raw = payload.read(1)
-            if not name_len_raw:
-                raise EOFError("Payload truncado (name_len).")
-            name_len = name_len_raw[0]
-        
-            name = payload.read(name_len).decode("utf-8")
-            (val_len,) = struct.unpack(">I", payload.read(4))
-
-            value = payload.read(val_len).decode("utf-8")
-            obj[name] = value
-        return obj
-
-    def read_all(self) -> List[Dict[str, str]]:
-        (n_objs,) = struct.unpack(">I", self._read_exact(4))
+        if self.esquema is not None:
+            return self.esquema.decodificar(self._buf, pos + 4, fim)
+        return decodificar_texto(self._buf, pos + 4, fim)
+
+    def _ler_cabecalho(self) -> None:
+        self._garantir(4)
+        (contagem,) = _unpack_u32(self._buf, self._pos)
+        self._pos += 4
+        self.versao = VERSAO_TEXTO
+        if contagem == COM_ESQUEMA:
+            self._garantir(CABECALHO.size)
+            self.versao, contagem, tamanho = CABECALHO.unpack_from(self._buf, self._pos)
+            if self.versao != VERSAO_ESQUEMA:
+                raise ValueError(f"Versão de formato não suportada: {self.versao}")
+            self._pos += CABECALHO.size
+            self.esquema = Esquema.ler(self._read_exact(tamanho))
+        self._restantes = contagem
+
+    # for obj in stream: lê um objeto por vez, com memória constante, tanto no formato
+    # com contagem quanto no fluxo sem contagem (até o marcador de fim)
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self
+
+    def __next__(self) -> Dict[str, Any]:
+        if self._restantes is None:
+            self._ler_cabecalho()
+        if self._restantes == SEM_CONTAGEM:
+            self._garantir(4)
+            if _unpack_u32(self._buf, self._pos)[0] == FIM_FLUXO:
+                self._pos += 4
+                self._restantes = 0
+                raise StopIteration
+            return self._decode_obj()
+        if not self._restantes:
+            raise StopIteration
+        self._restantes -= 1
+        return self._decode_obj()
+
+    def read_all(self) -> List[Dict[str, Any]]:
+        if self._restantes is None:
+            self._ler_cabecalho()
+        if self._processos > 1:
+            return self._ler_paralelo()
+        if self._restantes == SEM_CONTAGEM:
+            return list(self)
+        n_objs, self._restantes = self._restantes, 0
         objs = []
         for _ in range(n_objs):
             objs.append(self._decode_obj())
         return objs
 
+    # bytes dos próximos registros (até registros_por_bloco), com os tamanhos na frente
+    def _ler_bloco(self) -> bytes:
+        partes = []
+        faltam = self._registros_por_bloco
+        sem_contagem = self._restantes == SEM_CONTAGEM
+        while faltam and self._restantes:
+            self._garantir(4)
+            (tamanho,) = _unpack_u32(self._buf, self._pos)
+            if sem_contagem and tamanho == FIM_FLUXO:
+                self._pos += 4
+                self._restantes = 0
+                break
+            self._garantir(4 + tamanho)
+            # este registro e os seguintes que já estão inteiros no buffer saem numa cópia só
+            buf, fim = self._buf, self._fim
+            inicio = self._pos
+            pos = inicio + 4 + tamanho
+            n = 1
+            limite = faltam if sem_contagem else min(faltam, self._restantes)
+            while n < limite and pos + 4 <= fim:
+                (tamanho,) = _unpack_u32(buf, pos)
+                if pos + 4 + tamanho > fim or (sem_contagem and tamanho == FIM_FLUXO):
+                    break
+                pos += 4 + tamanho
+                n += 1
+            partes.append(self._view[inicio:pos].tobytes())
+            self._pos = pos
+            faltam -= n
+            if not sem_contagem:
+                self._restantes -= n
+        return b"".join(partes)
+
+    # como em LivroOutputStream._enviar_paralelo, no máximo 2 blocos por processo em andamento
+    def _ler_paralelo(self) -> List[Dict[str, Any]]:
+        campos_esquema = self.esquema.campos if self.esquema is not None else None
+        objs: List[Dict[str, Any]] = []
+        pendentes = deque()
+        with ProcessPoolExecutor(self._processos) as pool:
+            while segmento := self._ler_bloco():
+                pendentes.append(pool.submit(decodificar_bloco, segmento, campos_esquema))
+                if len(pendentes) >= 2 * self._processos:
+                    objs.extend(pendentes.popleft().result())
+            while pendentes:
+                objs.extend(pendentes.popleft().result())
+        return objs
+
     def close(self) -> None:
+        self._view.release()
         if self._close and hasattr(self._src, "close"):
             try:
                 self._src.close()
             except Exception:
                 pass
-        return super().close()
\ No newline at end of file
+        return super().close()
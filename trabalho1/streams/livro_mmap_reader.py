@@ -0,0 +1,147 @@
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Union
+import mmap
+import os
+import struct
+from streams.esquema import CABECALHO, COM_ESQUEMA, VERSAO_ESQUEMA, VERSAO_TEXTO, Esquema
+from streams.indice import COM_IDS, codificar_indice, ler_ids, ler_offsets, ler_rodape
+from streams.livro_input_stream import decodificar_texto
+from streams.livro_output_stream import FIM_FLUXO, SEM_CONTAGEM
+
+_U32 = struct.Struct(">I")
+_unpack_u32 = _U32.unpack_from
+
+# leitor de acesso direto para arquivos gravados pelo LivroOutputStream (qualquer versão
+# e enquadramento): o arquivo é mapeado em memória e só os registros pedidos são
+# decodificados. As posições dos registros vêm, em ordem de preferência, do rodapé
+# gravado com indice=True, do arquivo <caminho>.idx (ver salvar_indice) ou de uma
+# varredura dos tamanhos dos registros, sem decodificá-los.
+class LivroMmapReader:
+    def __init__(self, caminho: str) -> None:
+        self.caminho = caminho
+        self._arquivo = open(caminho, "rb")
+        try:
+            self._mm = mmap.mmap(self._arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # mmap não aceita arquivos vazios
+            self._arquivo.close()
+            raise EOFError("Dados insuficientes (EOF).")
+        self.versao = VERSAO_TEXTO
+        self.esquema: Optional[Esquema] = None
+        self._inicio = self._ler_cabecalho()
+        self._ids: Optional[Dict[str, int]] = None
+        self._fonte_ids: Optional[tuple] = None
+        self._offsets = self._carregar_indice()
+
+    def _ler_cabecalho(self) -> int:
+        mm = self._mm
+        if len(mm) < 4:
+            raise EOFError("Dados insuficientes (EOF).")
+        (self._contagem,) = _unpack_u32(mm, 0)
+        if self._contagem != COM_ESQUEMA:
+            return 4
+        self.versao, self._contagem, tamanho = CABECALHO.unpack_from(mm, 4)
+        if self.versao != VERSAO_ESQUEMA:
+            raise ValueError(f"Versão de formato não suportada: {self.versao}")
+        inicio = 4 + CABECALHO.size
+        self.esquema = Esquema.ler(mm[inicio:inicio + tamanho])
+        return inicio + tamanho
+
+    def _carregar_indice(self) -> array:
+        rodape = ler_rodape(self._mm)
+        if rodape is not None:
+            inicio, _, n, flags = rodape
+            self._fonte_ids = (self._mm, inicio, n) if flags & COM_IDS else None
+            return ler_offsets(self._mm, inicio, n)
+        caminho_idx = self.caminho + ".idx"
+        if os.path.exists(caminho_idx):
+            with open(caminho_idx, "rb") as f:
+                dados = f.read()
+            rodape = ler_rodape(dados)
+            # um .idx de outra versão do arquivo é ignorado
+            if rodape is not None and rodape[1] == len(self._mm):
+                _, _, n, flags = rodape
+                self._fonte_ids = (dados, 0, n) if flags & COM_IDS else None
+                return ler_offsets(dados, 0, n)
+        return self._varrer()
+
+    # percorre só os tamanhos dos registros
+    def _varrer(self) -> array:
+        mm = self._mm
+        offsets = array("Q")
+        pos = self._inicio
+        sem_contagem = self._contagem == SEM_CONTAGEM
+        while sem_contagem or len(offsets) < self._contagem:
+            if pos + 4 > len(mm):
+                raise EOFError("Dados insuficientes (EOF).")
+            (tamanho,) = _unpack_u32(mm, pos)
+            if sem_contagem and tamanho == FIM_FLUXO:
+                break
+            offsets.append(pos)
+            pos += 4 + tamanho
+        if pos > len(mm):
+            raise EOFError("Payload truncado.")
+        return offsets
+
+    # grava o índice em <caminho>.idx para as próximas aberturas não precisarem varrer o arquivo
+    def salvar_indice(self) -> str:
+        ids = [str(self.ler(k).get("id")) for k in range(len(self))] if self._tem_campo_id() else None
+        with open(self.caminho + ".idx", "wb") as f:
+            f.write(codificar_indice(self._offsets, ids, 0, len(self._mm)))
+        return self.caminho + ".idx"
+
+    def _tem_campo_id(self) -> bool:
+        if self.esquema is not None:
+            return any(nome == "id" for nome, _ in self.esquema.campos)
+        return len(self) > 0 and "id" in self.ler(0)
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    # registro k (com valores tipados no formato com esquema)
+    def ler(self, k: int) -> Dict[str, Any]:
+        pos = self._offsets[k]
+        (tamanho,) = _unpack_u32(self._mm, pos)
+        fim = pos + 4 + tamanho
+        if self.esquema is not None:
+            return self.esquema.decodificar(self._mm, pos + 4, fim)
+        return decodificar_texto(self._mm, pos + 4, fim)
+
+    def __getitem__(self, k: Union[int, slice]) -> Any:
+        if isinstance(k, slice):
+            return [self.ler(i) for i in range(*k.indices(len(self)))]
+        if k < 0:
+            k += len(self)
+        if not 0 <= k < len(self):
+            raise IndexError(k)
+        return self.ler(k)
+
+    def fatia(self, inicio: int, fim: int) -> List[Dict[str, Any]]:
+        return self[inicio:fim]
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for k in range(len(self)):
+            yield self.ler(k)
+
+    # registro pelo campo "id"; os ids vêm do índice ou, sem eles, de uma leitura de todos os registros
+    def buscar_id(self, produto_id: str) -> Dict[str, Any]:
+        if self._ids is None:
+            if self._fonte_ids is not None:
+                ids = ler_ids(*self._fonte_ids)
+            else:
+                ids = [str(self.ler(k).get("id")) for k in range(len(self))]
+            self._ids = {i: k for k, i in enumerate(ids)}
+        k = self._ids.get(str(produto_id))
+        if k is None:
+            raise KeyError("Produto não encontrado.")
+        return self.ler(k)
+
+    def close(self) -> None:
+        self._mm.close()
+        self._arquivo.close()
+
+    def __enter__(self) -> "LivroMmapReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
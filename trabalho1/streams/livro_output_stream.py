@@ -1,18 +1,97 @@
-from typing import Iterable, List, Optional, Sequence, Any
+from typing import Iterable, List, Optional, Sequence, Tuple, Any
+from array import array
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
 import io
+import itertools
+import operator
 import struct
+from streams.esquema import VERSAO_ESQUEMA, VERSAO_TEXTO, Esquema
+from streams.indice import codificar_indice
+
+_U32 = struct.Struct(">I")
+# contagem reservada: o fluxo não informa quantos objetos tem e termina com FIM_FLUXO
+SEM_CONTAGEM = 0xFFFFFFFF
+# tamanho de payload que marca o fim de um fluxo sem contagem (um objeto tem ao menos 1 byte)
+FIM_FLUXO = 0
+
+# registros por bloco no modo com vários processos
+REGISTROS_POR_BLOCO = 10_000
+
+# payload da versão 1: nome e valor (como texto) de cada campo
+def codificar_texto(obj: Any, campos: Sequence[str]) -> bytes:
+    payload = bytearray()
+    payload.append(len(campos) & 0xFF)
+
+    for nome in campos:
+        valor = getattr(obj, nome)
+        valor_str = str(valor)
+        nome_b = nome.encode("utf-8")
+        val_b = valor_str.encode("utf-8")
+        if len(nome_b) > 255:
+            raise ValueError("Nome do campo ficou grande demais para 1 byte de tamanho.")
+
+        payload.append(len(nome_b))
+        payload.extend(nome_b)
+        payload.extend(struct.pack(">I", len(val_b)))
+        payload.extend(val_b)
+
+    return bytes(payload)
+
+# executado nos processos filhos: recebe só os valores dos campos de cada objeto (bem
+# mais baratos de serializar que os objetos) e devolve o segmento já enquadrado
+# (u32 tamanho + payload por registro) e os tamanhos dos payloads
+def codificar_bloco(
+    valores: List[tuple], campos: List[str], esquema: Optional[List[Tuple[str, str]]]
+) -> Tuple[bytes, array]:
+    Registro = namedtuple("Registro", campos)
+    if esquema is not None:
+        codificar = Esquema(esquema).codificar
+    else:
+        codificar = lambda obj: codificar_texto(obj, campos)
+    partes = []
+    tamanhos = array("I")
+    for v in valores:
+        payload = codificar(Registro._make(v))
+        partes.append(_U32.pack(len(payload)))
+        partes.append(payload)
+        tamanhos.append(len(payload))
+    return b"".join(partes), tamanhos
 
 class LivroOutputStream(io.BufferedIOBase):
+    # com n_objetos=None, array_objs pode ser qualquer iterável (inclusive um gerador
+    # sem fim): os objetos são codificados e enviados um a um, sem contagem no início
+    # com versao=VERSAO_ESQUEMA, nomes e tipos dos campos vão uma vez no cabeçalho e os
+    # registros levam só os valores tipados; `tipos` (u32, f64, bool, utf8) é inferido
+    # das anotações do primeiro objeto se não for informado
+    # com indice=True, um índice das posições (e dos ids) dos registros vai no fim do
+    # fluxo, para acesso direto com o LivroMmapReader; as posições contam do início do fluxo
+    # com processos > 1, os objetos são codificados em blocos de registros_por_bloco num
+    # ProcessPoolExecutor e os segmentos são escritos na ordem original: a saída é idêntica
+    # à do modo com um processo
     def __init__(
         self,
         array_objs: Iterable[Any],
-        n_objetos: int,
+        n_objetos: Optional[int],
         destino: Any,
         campos: Optional[Sequence[str]] = ["id", "titulo", "preco"],
         close_destino: bool = False,
+        versao: int = VERSAO_TEXTO,
+        tipos: Optional[Sequence[str]] = None,
+        indice: bool = False,
+        processos: int = 1,
+        registros_por_bloco: int = REGISTROS_POR_BLOCO,
     ) -> None:
         super().__init__()
-        self._objetos: List[Any] = list(array_objs)[: max(0, n_objetos)]
+        if versao not in (VERSAO_TEXTO, VERSAO_ESQUEMA):
+            raise ValueError(f"Versão de formato desconhecida: {versao}")
+        self._objetos = array_objs
+        self._n = None if n_objetos is None else max(0, n_objetos)
+        self._versao = versao
+        self._tipos = tipos
+        self._indice = indice
+        self._processos = processos
+        self._registros_por_bloco = max(1, registros_por_bloco)
         self._dest = destino
         self._campos = list(campos) if campos else None
         self._close_destino = close_destino
@@ -26,23 +105,7 @@ class LivroOutputStream(io.BufferedIOBase):
 
     # codifica um objeto em bytes conforme o formato especificado
     def _encode_obj(self, obj: Any) -> bytes:
-        payload = bytearray()
-        payload.append(len(self._campos) & 0xFF)
-
-        for nome in self._campos:
-            valor = getattr(obj, nome)
-            valor_str = str(valor)
-            nome_b = self._to_bytes(nome)
-            val_b = self._to_bytes(valor_str)
-            if len(nome_b) > 255:
-                raise ValueError("Nome do campo ficou grande demais para 1 byte de tamanho.")
-
-            payload.append(len(nome_b))
-            payload.extend(nome_b)
-            payload.extend(struct.pack(">I", len(val_b)))  
-            payload.extend(val_b)
-
-        return bytes(payload)
+        return codificar_texto(obj, self._campos)
 
     # escreve bytes no destino
     def write(self, b: bytes) -> int:
@@ -64,9 +127,87 @@ class LivroOutputStream(io.BufferedIOBase):
 
     # envia todos os objetos no stream
     def send_all(self) -> None:
-        self.write(struct.pack(">I", len(self._objetos)))
-        for obj in self._objetos:
-            payload = self._encode_obj(obj)
-            self.write(struct.pack(">I", len(payload))) 
-            self.write(payload)
-        self.flush()
\ No newline at end of file
+        if self._n is None:
+            contagem, objetos = SEM_CONTAGEM, iter(self._objetos)
+        elif hasattr(self._objetos, "__len__"):
+            contagem = min(len(self._objetos), self._n)
+            objetos = itertools.islice(self._objetos, self._n)
+        else:
+            # a contagem vai antes dos objetos: um iterável sem tamanho precisa ser lido antes
+            lidos = list(itertools.islice(self._objetos, self._n))
+            contagem, objetos = len(lidos), iter(lidos)
+        if self._versao == VERSAO_ESQUEMA:
+            primeiro = next(objetos, None)
+            if primeiro is not None:
+                objetos = itertools.chain([primeiro], objetos)
+            esquema = Esquema.montar(self._campos, self._tipos, primeiro)
+            cabecalho = esquema.cabecalho(contagem)
+            codificar = esquema.codificar
+        else:
+            esquema = None
+            cabecalho = _U32.pack(contagem)
+            codificar = self._encode_obj
+        self.write(cabecalho)
+        if self._processos > 1:
+            self._enviar_paralelo(objetos, esquema, len(cabecalho))
+        elif self._indice:
+            self._enviar_com_indice(objetos, codificar, len(cabecalho))
+        else:
+            for obj in objetos:
+                payload = codificar(obj)
+                self.write(_U32.pack(len(payload)) + payload)
+            if self._n is None:
+                self.write(_U32.pack(FIM_FLUXO))
+        self.flush()
+
+    # como o laço de send_all, anotando a posição (e o id) de cada registro para o rodapé
+    def _enviar_com_indice(self, objetos: Iterable[Any], codificar, pos: int) -> None:
+        offsets = array("Q")
+        ids = [] if "id" in self._campos else None
+        for obj in objetos:
+            payload = codificar(obj)
+            self.write(_U32.pack(len(payload)) + payload)
+            offsets.append(pos)
+            pos += 4 + len(payload)
+            if ids is not None:
+                ids.append(str(obj.id))
+        self._fechar_com_indice(offsets, ids, pos)
+
+    def _fechar_com_indice(self, offsets: array, ids: Optional[List[str]], pos: int) -> None:
+        if self._n is None:
+            self.write(_U32.pack(FIM_FLUXO))
+            pos += 4
+        self.write(codificar_indice(offsets, ids, pos, pos))
+
+    # no máximo 2 blocos por processo em andamento: um gerador sem fim (ou maior que a
+    # memória) continua sendo enviado aos poucos
+    def _enviar_paralelo(self, objetos: Iterable[Any], esquema: Optional[Esquema], pos: int) -> None:
+        objetos = iter(objetos)
+        pegar = operator.attrgetter(*self._campos)
+        campos_esquema = esquema.campos if esquema is not None else None
+        offsets = array("Q") if self._indice else None
+        ids = [] if self._indice and "id" in self._campos else None
+        pendentes = deque()
+
+        def escrever(segmento: bytes, tamanhos: array) -> None:
+            nonlocal pos
+            self.write(segmento)
+            if offsets is not None:
+                for tamanho in tamanhos:
+                    offsets.append(pos)
+                    pos += 4 + tamanho
+
+        with ProcessPoolExecutor(self._processos) as pool:
+            while bloco := list(itertools.islice(objetos, self._registros_por_bloco)):
+                if ids is not None:
+                    ids.extend(str(obj.id) for obj in bloco)
+                valores = list(map(pegar, bloco))
+                pendentes.append(pool.submit(codificar_bloco, valores, self._campos, campos_esquema))
+                if len(pendentes) >= 2 * self._processos:
+                    escrever(*pendentes.popleft().result())
+            while pendentes:
+                escrever(*pendentes.popleft().result())
+        if offsets is not None:
+            self._fechar_com_indice(offsets, ids, pos)
+        elif self._n is None:
+            self.write(_U32.pack(FIM_FLUXO))
\ No newline at end of file
@@ -19,6 +19,9 @@ class _SocketReader:
                 break
             buf.extend(c)
         return bytes(buf)
+    # lê direto no buffer do chamador o que já chegou (ao menos 1 byte; 0 no fim da conexão)
+    def readinto(self, b) -> int:
+        return self.sock.recv_into(b)
     def close(self) -> None:
         try:
             self.sock.shutdown(socket.SHUT_RD)
@@ -0,0 +1,31 @@
+from models.livro import Livro
+from streams.livro_output_stream import LivroOutputStream
+from streams.livro_input_stream import LivroInputStream
+from servidor import start_tcp_server
+from cliente import connect_tcp_client
+from streams.socket_writer import _SocketWriter
+from streams.socket_reader import _SocketReader
+
+# gerador de produtos sem tamanho conhecido (como um feed)
+def _feed(n: int):
+    for i in range(n):
+        yield Livro(id=str(i), titulo=f"Livro {i}", preco=10.0 + i % 90, estado="usado",
+                    autor="Feed", isbn=f"{i:013d}", paginas=100, genero="TI")
+
+def teste_fluxo_tcp():
+    print("\n=== Teste vii) Fluxo sem contagem via TCP ===")
+    def server_handler(conn):
+        dest = _SocketWriter(conn)
+        out = LivroOutputStream(_feed(10_000), None, dest, close_destino=True)
+        out.send_all()
+
+    start_tcp_server(server_handler, port=5061)
+
+    def client_handler(sock):
+        ins = LivroInputStream(_SocketReader(sock), close_origem=True)
+        n = 0
+        for obj in ins:
+            n += 1
+        print(f"[TCP] Lidos {n} objetos um a um; último: {obj}")
+
+    connect_tcp_client("127.0.0.1", 5061, client_handler)
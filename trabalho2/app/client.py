@@ -1,33 +1,247 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
 from rmi.naming import Registry
 from rmi.transport import Requestor
 from rmi.marshalling import marshal
 from rmi.protocol import RemoteObjectRef
 
-class CatalogoProxy:
+# acumula chamadas de proxies e as envia numa única requisição de lote ao sair do bloco;
+# dentro do bloco, cada chamada retorna um Future, resolvido quando o lote é enviado.
+# Para misturar objetos remotos do mesmo servidor:
+#   with Lote(requestor) as lote:
+#       c, t = lote.proxy(catalogo), lote.proxy(transacao)
+class Lote:
+    def __init__(self, requestor):
+        self.requestor = requestor
+        self._ror = None
+        self._invocacoes = []
+        self._futuros = []
+
+    # cópia do proxy cujas chamadas entram neste lote
+    def proxy(self, proxy):
+        return type(proxy)(proxy.ror, _RequestorLote(self))
+
+    def registrar(self, o: RemoteObjectRef, methodId: str, arguments) -> Future:
+        if self._ror is None:
+            self._ror = o
+        elif (o.host, o.port) != (self._ror.host, self._ror.port):
+            raise ValueError("Todas as chamadas de um lote devem ir para o mesmo servidor.")
+        futuro = Future()
+        self._invocacoes.append((o.object_name, methodId, arguments))
+        self._futuros.append(futuro)
+        return futuro
+
+    # envia as chamadas acumuladas; falhas individuais ficam nos respectivos Futures
+    def enviar(self) -> None:
+        invocacoes, futuros = self._invocacoes, self._futuros
+        self._invocacoes, self._futuros = [], []
+        if not invocacoes:
+            return
+        try:
+            resultados = self.requestor.doBatch(self._ror, invocacoes)
+        except Exception as e:
+            for futuro in futuros:
+                futuro.set_exception(e)
+            raise
+        for futuro, r in zip(futuros, resultados):
+            if isinstance(r, Exception):
+                futuro.set_exception(r)
+            else:
+                futuro.set_result(r)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, tb):
+        if tipo is None:
+            self.enviar()
+        else:
+            for futuro in self._futuros:
+                futuro.cancel()
+
+class _RequestorLote:
+    def __init__(self, lote: Lote):
+        self.lote = lote
+
+    def doOperation(self, o: RemoteObjectRef, methodId: str, arguments) -> Future:
+        return self.lote.registrar(o, methodId, arguments)
+
+    doOperationAsync = doOperation
+
+# cache LRU com expiração para leituras do catálogo; cada entrada guarda a versão do
+# catálogo em que foi lida e só vale enquanto essa ainda for a versão conhecida
+class CacheLRU:
+    def __init__(self, capacidade: int = 256, ttl: float = 30.0):
+        self.capacidade = capacidade
+        self.ttl = ttl
+        self.acertos = 0
+        self.falhas = 0
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+
+    # (True, valor) se houver entrada válida para a versão; (False, None) caso contrário
+    def obter(self, chave, versao):
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is not None:
+                valor, versao_item, expira = item
+                if versao_item == versao and time.monotonic() < expira:
+                    self._itens.move_to_end(chave)
+                    self.acertos += 1
+                    return True, valor
+                del self._itens[chave]
+            self.falhas += 1
+            return False, None
+
+    def guardar(self, chave, valor, versao) -> None:
+        with self._lock:
+            self._itens[chave] = (valor, versao, time.monotonic() + self.ttl)
+            self._itens.move_to_end(chave)
+            if len(self._itens) > self.capacidade:
+                self._itens.popitem(last=False)
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._itens.clear()
+
+class ProxyRemoto:
     def __init__(self, ror: RemoteObjectRef, requestor: Requestor):
         self.ror = ror
         self.req = requestor
 
+    # with transacao.batch() as lote:
+    #     futuros = [lote.vender(i) for i in ids]   # uma única ida ao servidor
+    @contextmanager
+    def batch(self):
+        with Lote(self.req) as lote:
+            yield lote.proxy(self)
+
+# com `cache`, listar e buscar repetidos são atendidos localmente enquanto a versão do
+# catálogo conhecida pelo requestor (vinda em toda resposta) não mudar. Os produtos
+# retornados do cache são compartilhados entre as chamadas: não os altere.
+class CatalogoProxy(ProxyRemoto):
+    def __init__(self, ror: RemoteObjectRef, requestor: Requestor, cache: CacheLRU = None):
+        super().__init__(ror, requestor)
+        self.cache = cache
+
+    def _ler(self, metodo: str, args):
+        versao = self.req.versao(self.ror) if self.cache is not None else None
+        if versao is None:
+            return self.req.doOperation(self.ror, metodo, args)
+        chave = (metodo, json.dumps(args, sort_keys=True))
+        achou, valor = self.cache.obter(chave, versao)
+        if achou:
+            return valor
+        valor = self.req.doOperation(self.ror, metodo, args)
+        # só guarda se nenhuma alteração do catálogo ocorreu desde a última resposta e se
+        # quem respondeu estava nessa versão (com réplicas, pode ter respondido uma atrasada)
+        versao_resposta = getattr(self.req, "versao_resposta", self.req.versao)
+        if self.req.versao(self.ror) == versao and versao_resposta(self.ror) == versao:
+            self.cache.guardar(chave, valor, versao)
+        return valor
+
     def cadastrar(self, produto):
         args = {"args": [marshal(produto)]}
         return self.req.doOperation(self.ror, "cadastrar", args)
 
-    def listar(self, tipo=None):
+    # filtros aceitos: termo, disponivel, estado, preco_min, preco_max;
+    # com limite/cursor a resposta é uma Pagina
+    # com por_referencia=True a resposta é um ResultadoRemoto: os produtos ficam no servidor
+    def listar(self, tipo=None, **filtros):
+        if filtros.get("por_referencia"):
+            ror = self.req.doOperation(self.ror, "listar", self._args_listar(tipo, filtros))
+            return ResultadoRemoto(ror, self.req)
+        return self._ler("listar", self._args_listar(tipo, filtros))
+
+    @staticmethod
+    def _args_listar(tipo, filtros):
         if tipo is None:
             args = {"args": []}
         else:
             args = {"args": [tipo]}
-        return self.req.doOperation(self.ror, "listar", args)
+        if filtros:
+            args["kwargs"] = filtros
+        return args
+
+    # percorre a listagem página a página sem materializar o catálogo inteiro
+    def listar_paginas(self, tipo=None, limite=50, **filtros):
+        cursor = None
+        while True:
+            pagina = self.listar(tipo, limite=limite, cursor=cursor, **filtros)
+            yield from pagina.itens
+            cursor = pagina.cursor
+            if cursor is None:
+                return
 
     def buscar(self, termo: str):
         args = {"args": [termo]}
-        return self.req.doOperation(self.ror, "buscar", args)
+        return self._ler("buscar", args)
 
-class TransacaoProxy:
-    def __init__(self, ror: RemoteObjectRef, requestor: Requestor):
-        self.ror = ror
-        self.req = requestor
+    # versões assíncronas: retornam um Future com o resultado;
+    # com o RequestorMultiplexado, todas compartilham uma única conexão
+    def cadastrar_async(self, produto) -> Future:
+        return self.req.doOperationAsync(self.ror, "cadastrar", {"args": [marshal(produto)]})
+
+    def listar_async(self, tipo=None, **filtros) -> Future:
+        return self.req.doOperationAsync(self.ror, "listar", self._args_listar(tipo, filtros))
+
+    def buscar_async(self, termo: str) -> Future:
+        return self.req.doOperationAsync(self.ror, "buscar", {"args": [termo]})
+
+# resultado mantido no servidor (listar(por_referencia=True)); os itens são buscados
+# sob demanda, em fatias. O servidor o descarta após um período sem acesso (lease)
+# ou ao chamar fechar()
+class ResultadoRemoto(ProxyRemoto):
+    LOTE = 200
+
+    def tamanho(self) -> int:
+        return self.req.doOperation(self.ror, "tamanho", {"args": []})
+
+    def __len__(self) -> int:
+        return self.tamanho()
 
+    def fatia(self, inicio: int, fim: int):
+        return self.req.doOperation(self.ror, "fatia", {"args": [inicio, fim]}) or []
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            if i.step not in (None, 1) or (i.start or 0) < 0 or (i.stop is not None and i.stop < 0):
+                raise ValueError("Use fatias simples e não negativas.")
+            fim = i.stop if i.stop is not None else self.tamanho()
+            return self.fatia(i.start or 0, fim)
+        itens = self.fatia(i, i + 1)
+        if not itens:
+            raise IndexError(i)
+        return itens[0]
+
+    # cursor mantido no servidor: os próximos `n` itens
+    def proximos(self, n: int):
+        return self.req.doOperation(self.ror, "proximos", {"args": [n]}) or []
+
+    # percorre todos os itens em lotes (independente do cursor de proximos)
+    def __iter__(self):
+        inicio = 0
+        while True:
+            itens = self.fatia(inicio, inicio + self.LOTE)
+            yield from itens
+            if len(itens) < self.LOTE:
+                return
+            inicio += self.LOTE
+
+    def fechar(self) -> None:
+        self.req.doOperation(self.ror, "fechar", {"args": []})
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, tb):
+        self.fechar()
+
+class TransacaoProxy(ProxyRemoto):
     def vender(self, produto_id: str):
         args = {"args": [produto_id]}
         return self.req.doOperation(self.ror, "vender", args)
@@ -36,6 +250,12 @@ class TransacaoProxy:
         args = {"args": [a_id, b_id]}
         return self.req.doOperation(self.ror, "trocar", args)
 
+    def vender_async(self, produto_id: str) -> Future:
+        return self.req.doOperationAsync(self.ror, "vender", {"args": [produto_id]})
+
+    def trocar_async(self, a_id: str, b_id: str) -> Future:
+        return self.req.doOperationAsync(self.ror, "trocar", {"args": [a_id, b_id]})
+
 def demo():
     reg = Registry(host="127.0.0.1", port=9000)
     requestor = Requestor()
@@ -0,0 +1,85 @@
+# sobe, em processos separados, o serviço de nomes e três servidores RMI registrados nele;
+# um cliente balanceado distribui as chamadas entre eles e continua atendendo quando um cai
+# (ou quando o próprio registro cai)
+# uso (a partir de trabalho2/): python -m app.demo_cluster
+import subprocess
+import sys
+import time
+from collections import Counter
+from rmi.registro import RegistroRemoto, RequestorBalanceado
+from rmi.transport import Requestor
+from app.client import CatalogoProxy
+
+HOST = "127.0.0.1"
+PORTA_REGISTRO = 9100
+PORTAS = (9101, 9102, 9103)
+
+# Requestor que conta as chamadas por servidor, para mostrar a distribuição
+class RequestorContador(Requestor):
+    def __init__(self):
+        super().__init__()
+        self.chamadas = Counter()
+
+    def doOperation(self, o, methodId, arguments):
+        resultado = super().doOperation(o, methodId, arguments)
+        self.chamadas[o.port] += 1
+        return resultado
+
+def _processo(modulo: str, *args: str) -> subprocess.Popen:
+    return subprocess.Popen([sys.executable, "-m", modulo, *args], stdout=subprocess.DEVNULL)
+
+def _aguardar(registro: RegistroRemoto, nome: str, n: int, limite: float = 10.0) -> None:
+    fim = time.monotonic() + limite
+    while time.monotonic() < fim:
+        try:
+            registro.invalidar(nome)
+            if len(registro.resolver(nome)) >= n:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise TimeoutError(f"{n} servidores não se registraram a tempo")
+
+# chamadas concorrentes, para o menos_pendentes ter o que comparar
+def _rodada(catalogo: CatalogoProxy, contador: RequestorContador, chamadas: int) -> None:
+    contador.chamadas.clear()
+    for futuro in [catalogo.buscar_async("python") for _ in range(chamadas)]:
+        futuro.result()
+    print("  chamadas por servidor:", dict(sorted(contador.chamadas.items())))
+
+def main():
+    processos = [_processo("app.registro", "--port", str(PORTA_REGISTRO), "--expira", "2")]
+    processos += [_processo("app.server", "--port", str(p), "--registro", f"{HOST}:{PORTA_REGISTRO}")
+                  for p in PORTAS]
+    registro = RegistroRemoto(HOST, PORTA_REGISTRO, validade=0.5)
+    try:
+        _aguardar(registro, "CatalogoService", len(PORTAS))
+        for politica in ("round_robin", "menos_pendentes"):
+            contador = RequestorContador()
+            req = RequestorBalanceado(registro, politica=politica, requestor=contador)
+            catalogo = CatalogoProxy(registro.ror("CatalogoService"), req)
+            print(f"== {politica}: 30 buscas ==")
+            _rodada(catalogo, contador, 30)
+            if politica == "round_robin":
+                req.close()
+
+        print(f"\n== servidor {PORTAS[0]} derrubado: failover para os demais ==")
+        processos[1].kill()
+        processos[1].wait()
+        _rodada(catalogo, contador, 30)
+
+        print("\n== registro derrubado: os clientes seguem com a última lista de servidores ==")
+        processos[0].kill()
+        processos[0].wait()
+        time.sleep(registro.validade)
+        _rodada(catalogo, contador, 30)
+        req.close()
+    finally:
+        for p in processos:
+            p.terminate()
+        for p in processos:
+            p.wait()
+        registro.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 # app/demo_in_process.py
 from rmi.naming import Registry, Repository
+from rmi.resultados import GerenciadorResultados
 from rmi.skeleton import Dispatcher
 from rmi.transport import ServerRequestHandler, Requestor
 from services.loja import Loja
@@ -32,12 +33,12 @@ def start_server(host="127.0.0.1", port=9999):
     loja.add_produto(CD(id="C1", titulo="Kind of Blue", preco=40.0, estado="novo",
                         artista="Miles", genero="Jazz", faixas=5))
 
-    catalogo = CatalogoService(loja)
+    catalogo = CatalogoService(loja, GerenciadorResultados(repo, host, port))
     transacao = TransacaoService(loja)
     repo.bind("CatalogoService", catalogo)
     repo.bind("TransacaoService", transacao)
 
-    handler = ServerRequestHandler(host, port, Dispatcher(repo))
+    handler = ServerRequestHandler(host, port, Dispatcher(repo), versao=lambda: loja.versao)
 
     # inicia servidor em background
     import threading, time
@@ -0,0 +1,82 @@
+# sobe um primário e duas réplicas em processos separados; as escritas do cliente vão
+# ao primário, as leituras às réplicas, e cada leitura enxerga as escritas anteriores
+# uso (a partir de trabalho2/): python -m app.demo_replicas
+import subprocess
+import sys
+import time
+from models.livro import Livro
+from rmi.naming import Registry
+from rmi.replicacao import RequestorReplicado
+from rmi.transport import Requestor
+from app.client import CatalogoProxy, TransacaoProxy
+
+HOST = "127.0.0.1"
+PRIMARIO = 9200
+REPLICAS = (9201, 9202)
+
+def _processo(*args: str) -> subprocess.Popen:
+    return subprocess.Popen([sys.executable, "-m", "app.server", *args], stdout=subprocess.DEVNULL)
+
+def _aguardar(req: Requestor, port: int, objeto: str, metodo: str, limite: float = 10.0):
+    fim = time.monotonic() + limite
+    while True:
+        try:
+            return req.doOperation(Registry(HOST, port).ror(objeto), metodo, {"args": []})
+        except OSError:
+            if time.monotonic() > fim:
+                raise
+            time.sleep(0.2)
+
+# a réplica só atende leituras depois de carregar o estado do primário
+def _aguardar_carga(req: Requestor, port: int, limite: float = 10.0) -> None:
+    fim = time.monotonic() + limite
+    while _aguardar(req, port, "Replica", "atraso")["operacoes"] is None and time.monotonic() < fim:
+        time.sleep(0.05)
+
+def _atrasos(req: Requestor) -> None:
+    for port in REPLICAS:
+        print(f"  réplica {port}: atraso {_aguardar(req, port, 'Replica', 'atraso')}")
+
+def main():
+    processos = [_processo("--port", str(PRIMARIO))]
+    processos += [_processo("--port", str(p), "--primario", f"{HOST}:{PRIMARIO}") for p in REPLICAS]
+    direto = Requestor()
+    try:
+        _aguardar(direto, PRIMARIO, "CatalogoService", "listar")
+        for port in REPLICAS:
+            _aguardar_carga(direto, port)
+        _atrasos(direto)
+
+        req = RequestorReplicado([(HOST, p) for p in REPLICAS])
+        reg = Registry(HOST, PRIMARIO)
+        catalogo = CatalogoProxy(reg.ror("CatalogoService"), req)
+        transacao = TransacaoProxy(reg.ror("TransacaoService"), req)
+
+        print("\n== escritas no primário seguidas de leituras nas réplicas ==")
+        for i in range(5):
+            catalogo.cadastrar(Livro(id=f"R{i}", titulo=f"Replicado {i}", preco=10.0 + i, estado="novo",
+                                     autor="Demo", isbn="978", paginas=100, genero="Teste"))
+            print(f"  R{i} cadastrado; buscas 'replicado' na réplica: {len(catalogo.buscar('replicado'))}")
+        transacao.vender("R0")
+        disponiveis = [p.id for p in catalogo.listar(disponivel=True) if p.id.startswith("R")]
+        print(f"  após vender R0, disponíveis: {disponiveis}")
+
+        print("\n== cadastro direto numa réplica (erro esperado) ==")
+        try:
+            CatalogoProxy(Registry(HOST, REPLICAS[0]).ror("CatalogoService"), direto).cadastrar(
+                Livro(id="X", titulo="X", preco=1.0, estado="novo", autor="X", isbn="1", paginas=1, genero="X"))
+        except Exception as e:
+            print("  Erro esperado:", e)
+
+        print("\n== atraso das réplicas ==")
+        _atrasos(direto)
+        req.close()
+    finally:
+        for p in processos:
+            p.terminate()
+        for p in processos:
+            p.wait()
+        direto.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+import argparse
+from rmi.naming import Repository
+from rmi.registro import NOME_REGISTRO, ServicoRegistro
+from rmi.skeleton import Dispatcher
+from rmi.transport import ServerRequestHandler
+
+# serviço de nomes: os servidores (app/server.py --registro HOST:PORT) se registram nele
+# e os clientes (RequestorBalanceado) resolvem os nomes dos objetos para os servidores vivos
+def main(host: str="127.0.0.1", port: int=8999, expira: float=5.0):
+    repo = Repository()
+    repo.bind(NOME_REGISTRO, ServicoRegistro(expira=expira))
+    handler = ServerRequestHandler(host, port, Dispatcher(repo))
+    print(f"Registro de nomes em {host}:{port} (servidores expiram após {expira:g} s sem heartbeat)")
+    handler.serve_forever()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serviço de nomes do RMI")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8999)
+    parser.add_argument("--expira", type=float, default=5.0, help="Segundos sem heartbeat até remover um servidor")
+    args = parser.parse_args()
+    main(args.host, args.port, expira=args.expira)
@@ -1,8 +1,14 @@
+import argparse
 from rmi.naming import Registry, Repository
+from rmi.registro import Anunciante
+from rmi.resultados import GerenciadorResultados
 from rmi.skeleton import Dispatcher
-from rmi.transport import ServerRequestHandler
+from rmi.transport import MODOS_SERVIDOR, PROTOCOLOS, Requestor, RequestorBinario, ServerRequestHandler
 from services.loja import Loja
+from services.loja_colunar import LojaColunar
+from services.persistencia import Persistencia
 from services.catalogo import CatalogoService
+from services.replicacao import LogReplicacao, Replica, ReplicacaoService
 from services.transacao import TransacaoService
 from models.livro import Livro
 from models.ebook import EBook
@@ -24,20 +30,83 @@ def seed(loja: Loja):
     loja.add_produto(CD(id="C1", titulo="Kind of Blue", preco=40.0, estado="novo",
                         artista="Miles Davis", genero="Jazz", faixas=5))
 
-def main(host: str="127.0.0.1", port: int=9000):
+def main(host: str="127.0.0.1", port: int=9000, colunar: bool=False, dados: str=None,
+         modo: str="threads", workers: int=16, fila: int=64, protocolo: str="xmlrpc",
+         registro: str=None, primario: str=None):
     repo = Repository()
-    loja = Loja("Loja de Mídias")
-    seed(loja)
-
-    catalogo = CatalogoService(loja)
-    transacao = TransacaoService(loja)
-    repo.bind("CatalogoService", catalogo)
-    repo.bind("TransacaoService", transacao)
+    persistencia = Persistencia(dados) if dados else None
+    # a loja colunar acelera filtros e agregações em massa, com a mesma API
+    cls_loja = LojaColunar if colunar else Loja
+    loja = cls_loja("Loja de Mídias", persistencia=persistencia)
+    resultados = GerenciadorResultados(repo, host, port, lease=60.0)
+    replica = None
+    if primario:
+        # réplica: o estado vem do primário e as escritas são recusadas
+        prim_host, prim_port = primario.rsplit(":", 1)
+        req_primario = RequestorBinario() if protocolo == "binario" else Requestor()
+        ror = Registry(prim_host, int(prim_port)).ror("ReplicacaoService")
+        replica = Replica(
+            loja,
+            estado=lambda: req_primario.doOperation(ror, "estado", {"args": []}),
+            operacoes=lambda desde, maximo, espera: req_primario.doOperation(
+                ror, "operacoes", {"args": [desde, maximo, espera]}),
+        )
+        replica.iniciar()
+        repo.bind("CatalogoService", CatalogoService(loja, resultados, replica=replica))
+        repo.bind("Replica", replica, metodos=["atraso"])
+    else:
+        # com persistência, o estado vem do snapshot + log; o seed só popula uma loja vazia
+        loja.recuperar()
+        if not loja.estoque:
+            seed(loja)
+        # as alterações seguintes ficam disponíveis às réplicas (app/server.py --primario)
+        loja.replicacao = LogReplicacao(loja.versao)
+        # resultados de listar(por_referencia=True) ficam no servidor por até 60 s sem acesso
+        repo.bind("CatalogoService", CatalogoService(loja, resultados))
+        repo.bind("TransacaoService", TransacaoService(loja))
+        repo.bind("ReplicacaoService", ReplicacaoService(loja, loja.replicacao))
 
     disp = Dispatcher(repo)
-    handler = ServerRequestHandler(host, port, disp)
-    print(f"Servidor RMI em {host}:{port} - objetos: CatalogoService, TransacaoService")
-    handler.serve_forever()
+    handler = ServerRequestHandler(host, port, disp, modo=modo, workers=workers, fila=fila, protocolo=protocolo,
+                                   versao=lambda: loja.versao)
+    nomes = [n for n in ("CatalogoService", "TransacaoService") if n in repo.skeletons]
+    papel = f"réplica de {primario}" if primario else "primário"
+    print(f"Servidor RMI em {host}:{port} ({protocolo}, {modo}, {papel}) - objetos: {', '.join(nomes)}")
+    # com um serviço de nomes, os clientes balanceados passam a enxergar este servidor
+    anunciante = None
+    if registro:
+        reg_host, reg_port = registro.rsplit(":", 1)
+        anunciante = Anunciante((reg_host, int(reg_port)), host, port, nomes)
+        anunciante.iniciar()
+    try:
+        handler.serve_forever()
+    finally:
+        if anunciante is not None:
+            anunciante.parar()
+        if replica is not None:
+            replica.parar()
+        if persistencia is not None:
+            persistencia.fechar()
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Servidor RMI da loja")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--colunar", action="store_true", help="Usa o armazenamento colunar da loja")
+    parser.add_argument("--dados", default=None, help="Diretório do log/snapshot (sem ele a loja é volátil)")
+    parser.add_argument("--modo", choices=MODOS_SERVIDOR, default="threads",
+                        help="simples: uma requisição por vez; threads: pool de workers; asyncio: laço de eventos")
+    parser.add_argument("--workers", type=int, default=16, help="Threads que executam as chamadas")
+    parser.add_argument("--fila", type=int, default=64, help="Conexões/chamadas em espera antes de bloquear os clientes")
+    parser.add_argument("--protocolo", choices=PROTOCOLOS, default="xmlrpc",
+                        help="xmlrpc: compatível com o Requestor; binario: quadros TCP para o RequestorBinario")
+    parser.add_argument("--registro", default=None, metavar="HOST:PORT",
+                        help="Serviço de nomes (app/registro.py) onde este servidor se registra")
+    parser.add_argument("--primario", default=None, metavar="HOST:PORT",
+                        help="Sobe como réplica somente leitura do servidor primário informado")
+    args = parser.parse_args()
+    if args.primario and args.dados:
+        parser.error("--dados não se aplica a réplicas: o estado vem do primário")
+    main(args.host, args.port, colunar=args.colunar, dados=args.dados,
+         modo=args.modo, workers=args.workers, fila=args.fila, protocolo=args.protocolo,
+         registro=args.registro, primario=args.primario)
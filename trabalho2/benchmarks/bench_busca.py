@@ -0,0 +1,44 @@
+# benchmark de Loja.buscar: varredura linear (implementação antiga) x índice de trigramas
+# uso (a partir de trabalho2/): python -m benchmarks.bench_busca
+import time
+from typing import List
+from models.base import Produto
+from services.loja import Loja
+from benchmarks.gerador import gerar_produtos
+
+TAMANHOS = (1_000, 10_000, 100_000)
+TERMOS = ("aneis", "Python", "tolkien", "sistemas distribuidos", "inexistente")
+REPETICOES = 20
+
+# busca antiga, reproduzida para comparação
+def buscar_linear(loja: Loja, termo: str) -> List[Produto]:
+    termo = termo.lower()
+    return [
+        p
+        for p in loja.estoque.values()
+        if termo in p.titulo.lower()
+        or (hasattr(p, "autor") and termo in str(p.autor).lower())
+    ]
+
+def _medir_ms(fn, *args) -> float:
+    inicio = time.perf_counter()
+    for _ in range(REPETICOES):
+        fn(*args)
+    return (time.perf_counter() - inicio) * 1000 / REPETICOES
+
+def main() -> None:
+    print(f"{'produtos':>10} {'termo':>24} {'linear (ms)':>12} {'índice (ms)':>12} {'achados':>8}")
+    for n in TAMANHOS:
+        loja = Loja("Bench")
+        inicio = time.perf_counter()
+        for p in gerar_produtos(n):
+            loja.add_produto(p)
+        print(f"-- {n} produtos indexados em {(time.perf_counter() - inicio) * 1000:.0f} ms")
+        for termo in TERMOS:
+            t_lin = _medir_ms(buscar_linear, loja, termo)
+            t_idx = _medir_ms(loja.buscar, termo)
+            achados = len(loja.buscar(termo))
+            print(f"{n:>10} {termo:>24} {t_lin:>12.3f} {t_idx:>12.3f} {achados:>8}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# benchmark de consultas analíticas: varredura de objetos x LojaColunar
+# uso (a partir de trabalho2/): python -m benchmarks.bench_colunar
+import time
+from services.loja_colunar import LojaColunar, np
+from benchmarks.gerador import gerar_produtos
+
+N = 200_000
+LIMITES = [0, 25, 50, 100, 150, 200]
+
+def _medir_ms(fn) -> float:
+    inicio = time.perf_counter()
+    fn()
+    return (time.perf_counter() - inicio) * 1000
+
+# as mesmas consultas feitas objeto a objeto
+def _histograma_objetos(produtos):
+    contagem = [0] * (len(LIMITES) - 1)
+    for p in produtos:
+        for k in range(len(contagem)):
+            if LIMITES[k] <= p.preco < LIMITES[k + 1]:
+                contagem[k] += 1
+                break
+    return contagem
+
+def _apostilas_objetos(produtos):
+    return [p for p in produtos if type(p).__name__ == "Apostila"
+            and p.estado == "usado" and p.instituicao == "UF"]
+
+def _media_objetos(produtos):
+    precos = [p.preco for p in produtos if p.disponivel and p.estado == "novo"]
+    return sum(precos) / len(precos)
+
+def main() -> None:
+    loja = LojaColunar("Bench")
+    for p in gerar_produtos(N):
+        loja.add_produto(p)
+    produtos = loja.listar()
+    print(f"{N} produtos, numpy {'disponível' if np is not None else 'ausente (Python puro)'}")
+    consultas = [
+        ("histograma de preços", lambda: _histograma_objetos(produtos), lambda: loja.histograma_precos(LIMITES)),
+        ("apostilas usadas da UF", lambda: _apostilas_objetos(produtos),
+         lambda: loja.filtrar(tipo="apostila", estado="usado", instituicao="UF")),
+        ("preço médio novos disp.", lambda: _media_objetos(produtos),
+         lambda: loja.estatisticas_preco(disponivel=True, estado="novo")),
+    ]
+    print(f"{'consulta':>26} {'objetos (ms)':>13} {'colunar (ms)':>13}")
+    for nome, por_objeto, colunar in consultas:
+        print(f"{nome:>26} {_medir_ms(por_objeto):>13.1f} {_medir_ms(colunar):>13.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# teste de estresse de vendas concorrentes: cada produto deve ser vendido exatamente uma vez,
+# mesmo com várias threads disputando os mesmos itens; mede também a vazão por nº de threads
+# uso (a partir de trabalho2/): python -m benchmarks.bench_concorrencia
+import random
+import threading
+import time
+from collections import Counter
+from services.loja import Loja
+from services.transacao import TransacaoService
+from benchmarks.gerador import gerar_produtos
+
+N = 20_000
+THREADS = (1, 2, 4, 8, 16)
+
+def _rodada(n_threads: int) -> float:
+    loja = Loja("Bench")
+    produtos = gerar_produtos(N)
+    for p in produtos:
+        loja.add_produto(p)
+    transacao = TransacaoService(loja)
+    ids = [p.id for p in produtos]
+    vendas = Counter()
+    lock_vendas = threading.Lock()
+    barreira = threading.Barrier(n_threads)
+
+    # todas as threads tentam vender todos os produtos, em ordens diferentes
+    def trabalhador(semente: int) -> None:
+        meus = ids[:]
+        random.Random(semente).shuffle(meus)
+        vendidos = []
+        barreira.wait()
+        for produto_id in meus:
+            try:
+                transacao.vender(produto_id)
+                vendidos.append(produto_id)
+            except ValueError:
+                pass
+        with lock_vendas:
+            vendas.update(vendidos)
+
+    threads = [threading.Thread(target=trabalhador, args=(i,)) for i in range(n_threads)]
+    inicio = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    seg = time.perf_counter() - inicio
+
+    assert len(vendas) == N, f"{N - len(vendas)} produtos não vendidos"
+    repetidos = [pid for pid, qtd in vendas.items() if qtd > 1]
+    assert not repetidos, f"{len(repetidos)} produtos vendidos mais de uma vez"
+    assert not loja.consultar(disponivel=True)
+    return n_threads * N / seg
+
+def main() -> None:
+    print(f"{N} produtos; cada thread tenta vender todos (só uma venda por produto pode passar)")
+    print(f"{'threads':>8} {'tentativas/s':>14}  vendas exatamente-uma-vez")
+    for n in THREADS:
+        print(f"{n:>8} {_rodada(n):>14,.0f}  ok")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# custo do Dispatcher por chamada: getattr + unmarshal de cada argumento (antigo)
+# x tabela de métodos montada no bind com plano de conversão dos argumentos
+# uso (a partir de trabalho2/): python -m benchmarks.bench_dispatch
+import timeit
+from rmi.marshalling import marshal, unmarshal
+from rmi.naming import Repository
+from rmi.skeleton import Dispatcher
+from services.loja import Loja
+from services.catalogo import CatalogoService
+from services.transacao import TransacaoService
+from benchmarks.gerador import gerar_produtos
+
+N = 100_000
+
+# Dispatcher antigo, reproduzido para comparação
+class DispatcherAntigo:
+    def __init__(self, repository):
+        self.repo = repository
+
+    def dispatch(self, object_name, method_id, args_external):
+        obj = self.repo.resolve(object_name)
+        if isinstance(args_external, dict) and "args" in args_external:
+            args = [unmarshal(a) for a in args_external["args"]]
+            kwargs = {k: unmarshal(v) for k, v in args_external.get("kwargs", {}).items()}
+        else:
+            args, kwargs = [], {}
+        method = getattr(obj, method_id)
+        return marshal(method(*args, **kwargs))
+
+# serviço sem trabalho: o tempo medido é só o do despacho
+class Eco:
+    def ping(self) -> None:
+        return None
+
+    def eco(self, a: str, b: str) -> str:
+        return a
+
+    def filtros(self, tipo: str = None, preco_min: float = None, preco_max: float = None) -> None:
+        return None
+
+def main() -> None:
+    repo = Repository()
+    repo.bind("Eco", Eco())
+    loja = Loja("Bench")
+    for p in gerar_produtos(100):
+        loja.add_produto(p)
+    repo.bind("CatalogoService", CatalogoService(loja))
+    repo.bind("TransacaoService", TransacaoService(loja))
+    casos = [
+        ("Eco", "ping", {"args": []}),
+        ("Eco", "eco", {"args": ["a", "b"]}),
+        ("Eco", "filtros", {"args": [], "kwargs": {"tipo": "livro", "preco_min": 10.0, "preco_max": 50.0}}),
+        ("CatalogoService", "buscar", {"args": ["python"]}),
+    ]
+    antigo, novo = DispatcherAntigo(repo), Dispatcher(repo)
+    print(f"{'chamada':>24} {'antigo (µs)':>12} {'tabela (µs)':>12}")
+    for objeto, metodo, args in casos:
+        t_antigo = timeit.timeit(lambda: antigo.dispatch(objeto, metodo, args), number=N) / N * 1e6
+        t_novo = timeit.timeit(lambda: novo.dispatch(objeto, metodo, args), number=N) / N * 1e6
+        print(f"{objeto + '.' + metodo:>24} {t_antigo:>12.2f} {t_novo:>12.2f}")
+
+if __name__ == "__main__":
+    main()
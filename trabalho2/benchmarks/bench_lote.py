@@ -0,0 +1,45 @@
+# 1.000 vendas: uma chamada por venda x todas num único lote (TransacaoProxy.batch)
+# uso (a partir de trabalho2/): python -m benchmarks.bench_lote
+import time
+from rmi.naming import Registry, Repository
+from rmi.skeleton import Dispatcher
+from rmi.transport import Requestor, RequestorBinario, ServerRequestHandler
+from services.loja import Loja
+from services.transacao import TransacaoService
+from app.client import TransacaoProxy
+from benchmarks.gerador import gerar_produtos
+
+HOST = "127.0.0.1"
+N = 1_000
+
+def _subir(port: int, protocolo: str) -> None:
+    loja = Loja("Bench")
+    for p in gerar_produtos(2 * N):
+        loja.add_produto(p)
+    repo = Repository()
+    repo.bind("TransacaoService", TransacaoService(loja))
+    ServerRequestHandler(HOST, port, Dispatcher(repo), protocolo=protocolo).start_in_background()
+
+def main() -> None:
+    ids = [p.id for p in gerar_produtos(2 * N)]
+    print(f"{'protocolo':>10} {'1 a 1 (ms)':>11} {'lote (ms)':>10}")
+    for port, protocolo, cls in ((9945, "xmlrpc", Requestor), (9946, "binario", RequestorBinario)):
+        _subir(port, protocolo)
+        time.sleep(0.2)
+        transacao = TransacaoProxy(Registry(HOST, port).ror("TransacaoService"), cls())
+
+        inicio = time.perf_counter()
+        for produto_id in ids[:N]:
+            transacao.vender(produto_id)
+        ms_um = (time.perf_counter() - inicio) * 1000
+
+        inicio = time.perf_counter()
+        with transacao.batch() as lote:
+            futuros = [lote.vender(produto_id) for produto_id in ids[N:]]
+        vendidos = [f.result() for f in futuros]
+        ms_lote = (time.perf_counter() - inicio) * 1000
+        assert all(not p.disponivel for p in vendidos)
+        print(f"{protocolo:>10} {ms_um:>11.1f} {ms_lote:>10.1f}")
+
+if __name__ == "__main__":
+    main()
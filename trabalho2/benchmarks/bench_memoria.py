@@ -0,0 +1,53 @@
+# benchmark de memória: bytes por produto com __dict__ (antes) x com __slots__ (depois)
+# uso (a partir de trabalho2/): python -m benchmarks.bench_memoria
+import tracemalloc
+from dataclasses import MISSING, field, fields, make_dataclass
+from models.livro import Livro
+from models.ebook import EBook
+from models.apostila import Apostila
+from models.cd import CD
+
+N = 100_000
+
+# mesmos valores para todas as instâncias: mede só o custo do objeto, não das strings
+VALORES = {
+    Livro: dict(id="L1", titulo="Clean Code", preco=120.0, estado="novo",
+                autor="Robert C. Martin", isbn="978", paginas=464, genero="Engenharia"),
+    EBook: dict(id="E1", titulo="Python Fluente", preco=60.0, estado="novo",
+                autor="Luciano Ramalho", isbn="978", formato="PDF", tamanho_mb=12.5, drm=False),
+    Apostila: dict(id="A1", titulo="Cálculo I", preco=30.0, estado="usado",
+                   materia="Cálculo", instituicao="UF"),
+    CD: dict(id="C1", titulo="Kind of Blue", preco=40.0, estado="novo",
+             artista="Miles Davis", genero="Jazz", faixas=5),
+}
+
+# recria a classe como dataclass comum (com __dict__), como era antes
+def _sem_slots(cls: type) -> type:
+    campos = []
+    for f in fields(cls):
+        if f.default is MISSING:
+            campos.append((f.name, f.type))
+        else:
+            campos.append((f.name, f.type, field(default=f.default, init=f.init)))
+    return make_dataclass(cls.__name__ + "Dict", campos)
+
+def _bytes_por_objeto(cls: type, valores: dict) -> float:
+    tracemalloc.start()
+    inicio, _ = tracemalloc.get_traced_memory()
+    objetos = [cls(**valores) for _ in range(N)]
+    fim, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # desconta o ponteiro da lista que guarda os objetos
+    total = (fim - inicio) / len(objetos) - 8
+    del objetos
+    return total
+
+def main() -> None:
+    print(f"{'classe':>10} {'__dict__ (B)':>14} {'__slots__ (B)':>14} {'economia':>9}")
+    for cls, valores in VALORES.items():
+        antes = _bytes_por_objeto(_sem_slots(cls), valores)
+        depois = _bytes_por_objeto(cls, valores)
+        print(f"{cls.__name__:>10} {antes:>14.0f} {depois:>14.0f} {1 - depois / antes:>8.0%}")
+
+if __name__ == "__main__":
+    main()
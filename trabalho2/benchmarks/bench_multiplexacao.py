@@ -0,0 +1,65 @@
+# fan-out de consultas: N consultas pequenas (1ª página de uma busca) uma após a outra
+# x N consultas em andamento ao mesmo tempo
+# numa única conexão multiplexada (respostas associadas pelo requestId, fora de ordem)
+# uso (a partir de trabalho2/): python -m benchmarks.bench_multiplexacao
+import time
+from rmi.naming import Registry, Repository
+from rmi.skeleton import Dispatcher
+from rmi.transport import RequestorBinario, RequestorMultiplexado, ServerRequestHandler
+from services.catalogo import CatalogoService
+from services.loja import Loja
+from app.client import CatalogoProxy
+from benchmarks.gerador import gerar_produtos
+from benchmarks.bench_servidor import LATENCIA, ServicoLento
+
+HOST, PORT = "127.0.0.1", 9940
+TERMOS = ["python", "senhor", "dados", "jazz", "redes", "história", "azul", "paz"]
+CONSULTAS = (10, 50, 200)
+
+def main() -> None:
+    loja = Loja("Bench")
+    for p in gerar_produtos(2_000):
+        loja.add_produto(p)
+    repo = Repository()
+    repo.bind("CatalogoService", CatalogoService(loja))
+    repo.bind("Lento", ServicoLento())
+    ServerRequestHandler(HOST, PORT, Dispatcher(repo), protocolo="binario").start_in_background()
+    time.sleep(0.2)
+    ror = Registry(HOST, PORT).ror("CatalogoService")
+    sequencial = CatalogoProxy(ror, RequestorBinario())
+    multiplexado = CatalogoProxy(ror, RequestorMultiplexado())
+    sequencial.listar(termo="python", limite=10)
+    multiplexado.listar(termo="python", limite=10)
+
+    print(f"{'consultas':>10} {'sequencial (ms)':>16} {'multiplexado (ms)':>18}")
+    for n in CONSULTAS:
+        termos = [TERMOS[i % len(TERMOS)] for i in range(n)]
+        inicio = time.perf_counter()
+        esperado = [sequencial.listar(termo=t, limite=10).cursor for t in termos]
+        ms_seq = (time.perf_counter() - inicio) * 1000
+
+        inicio = time.perf_counter()
+        futuros = [multiplexado.listar_async(termo=t, limite=10) for t in termos]
+        obtido = [f.result().cursor for f in futuros]
+        ms_mux = (time.perf_counter() - inicio) * 1000
+        assert obtido == esperado
+        print(f"{n:>10} {ms_seq:>16.1f} {ms_mux:>18.1f}")
+
+    # com espera de E/S no servidor, as chamadas multiplexadas se sobrepõem
+    lento = Registry(HOST, PORT).ror("Lento")
+    seq, mux = RequestorBinario(), RequestorMultiplexado()
+    print(f"\ncom {LATENCIA * 1000:.0f} ms de espera no servidor por chamada")
+    print(f"{'consultas':>10} {'sequencial (ms)':>16} {'multiplexado (ms)':>18}")
+    for n in CONSULTAS:
+        inicio = time.perf_counter()
+        for i in range(n):
+            seq.doOperation(lento, "consultar", {"args": [str(i)]})
+        ms_seq = (time.perf_counter() - inicio) * 1000
+        inicio = time.perf_counter()
+        futuros = [mux.doOperationAsync(lento, "consultar", {"args": [str(i)]}) for i in range(n)]
+        assert [f.result() for f in futuros] == [str(i) for i in range(n)]
+        ms_mux = (time.perf_counter() - inicio) * 1000
+        print(f"{n:>10} {ms_seq:>16.1f} {ms_mux:>18.1f}")
+
+if __name__ == "__main__":
+    main()
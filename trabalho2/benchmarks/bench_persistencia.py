@@ -0,0 +1,67 @@
+# benchmark da persistência: vazão de escrita com commit em grupo e tempo de recuperação
+# uso (a partir de trabalho2/): python -m benchmarks.bench_persistencia [n_produtos]
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from services.loja import Loja
+from services.persistencia import Persistencia
+from benchmarks.gerador import gerar_produtos
+
+N_ESCRITAS = 20_000
+ESCRITORES = 32
+
+def _vazao(grupo: int) -> float:
+    diretorio = tempfile.mkdtemp(prefix="sebo_wal_")
+    try:
+        persistencia = Persistencia(diretorio, grupo=grupo, intervalo=0)
+        op = {"op": "vender", "id": "L1"}
+        inicio = time.perf_counter()
+        for _ in range(N_ESCRITAS):
+            persistencia.registrar(op)
+        persistencia.fechar()
+        return N_ESCRITAS / (time.perf_counter() - inicio)
+    finally:
+        shutil.rmtree(diretorio)
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    print(f"== vazão de escrita ({N_ESCRITAS} operações, fsync por grupo) ==")
+    for grupo in (1, 16, 256, 4096):
+        print(f"grupo={grupo:>5}: {_vazao(grupo):>10,.0f} ops/s")
+
+    print(f"\n== recuperação com {n} produtos ==")
+    diretorio = tempfile.mkdtemp(prefix="sebo_snap_")
+    try:
+        produtos = gerar_produtos(n)
+        # carga sem persistência: cada escrita confirmada esperaria seu fsync
+        loja = Loja("Bench", estoque={p.id: p for p in produtos})
+        loja.persistencia = Persistencia(diretorio, intervalo=0, ops_por_snapshot=n * 2)
+        inicio = time.perf_counter()
+        loja.compactar()
+        print(f"snapshot gravado em {time.perf_counter() - inicio:.2f} s")
+        # cauda do log: 1% de vendas depois do snapshot, por escritores concorrentes
+        # (cada venda espera o fsync que a cobre; o commit em grupo junta as de todos)
+        vendas = n // 100
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(ESCRITORES) as executor:
+            list(executor.map(loja.vender, (p.id for p in produtos[:vendas])))
+        s = time.perf_counter() - inicio
+        print(f"{vendas} vendas confirmadas por {ESCRITORES} escritores: {vendas / s:,.0f} ops/s")
+        loja.persistencia.fechar()
+        del loja, produtos
+
+        recuperada = Loja("Bench", persistencia=Persistencia(diretorio, intervalo=0))
+        inicio = time.perf_counter()
+        ops = recuperada.recuperar()
+        seg = time.perf_counter() - inicio
+        print(f"recuperação (snapshot + log): {ops} operações em {seg:.2f} s ({ops / seg:,.0f} ops/s)")
+        print(f"produtos: {len(recuperada.estoque)}, vendidos: {len(recuperada.consultar(disponivel=False))}")
+        recuperada.persistencia.fechar()
+    finally:
+        shutil.rmtree(diretorio)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# compara o XML-RPC (JSON em base64) com o protocolo binário: bytes de uma resposta
+# de `listar` e latência da chamada completa, para catálogos de tamanhos diferentes
+# uso (a partir de trabalho2/): python -m benchmarks.bench_protocolo
+import time
+from xmlrpc.client import dumps
+from rmi.binario import codificar_resposta
+from rmi.marshalling import marshal
+from rmi.naming import Registry, Repository
+from rmi.protocol import make_reply
+from rmi.skeleton import Dispatcher
+from rmi.transport import Requestor, RequestorBinario, ServerRequestHandler
+from services.catalogo import CatalogoService
+from services.loja import Loja
+from benchmarks.gerador import gerar_produtos
+
+HOST = "127.0.0.1"
+TAMANHOS = (10, 100, 1_000)
+REPETICOES = 50
+
+def _subir(port: int, protocolo: str, n: int) -> None:
+    loja = Loja("Bench")
+    for p in gerar_produtos(n):
+        loja.add_produto(p)
+    repo = Repository()
+    repo.bind("CatalogoService", CatalogoService(loja))
+    ServerRequestHandler(HOST, port, Dispatcher(repo), protocolo=protocolo).start_in_background()
+
+def _latencia_ms(requestor, port: int) -> float:
+    ror = Registry(HOST, port).ror("CatalogoService")
+    requestor.doOperation(ror, "listar", {"args": []})
+    inicio = time.perf_counter()
+    for _ in range(REPETICOES):
+        requestor.doOperation(ror, "listar", {"args": []})
+    return (time.perf_counter() - inicio) / REPETICOES * 1000
+
+def main() -> None:
+    port = 9930
+    print(f"{'produtos':>9} {'xmlrpc (B)':>11} {'binario (B)':>12} {'xmlrpc (ms)':>12} {'binario (ms)':>13}")
+    for n in TAMANHOS:
+        resultado = marshal(gerar_produtos(n))
+        # corpo HTTP da resposta XML-RPC x quadro binário
+        bytes_xml = len(dumps((make_reply(1, resultado),), methodresponse=True, allow_none=True).encode("utf-8"))
+        bytes_bin = len(codificar_resposta(1, resultado))
+        _subir(port, "xmlrpc", n)
+        _subir(port + 1, "binario", n)
+        time.sleep(0.2)
+        xml, binario = Requestor(), RequestorBinario()
+        ms_xml = _latencia_ms(xml, port)
+        ms_bin = _latencia_ms(binario, port + 1)
+        xml.close()
+        binario.close()
+        print(f"{n:>9} {bytes_xml:>11,} {bytes_bin:>12,} {ms_xml:>12.2f} {ms_bin:>13.2f}")
+        port += 2
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+# listar grande por valor x por referência: a resposta por referência leva só o
+# RemoteObjectRef, e o cliente puxa o tamanho e a primeira página quando precisa
+# uso (a partir de trabalho2/): python -m benchmarks.bench_referencia
+import time
+from rmi.naming import Registry, Repository
+from rmi.resultados import GerenciadorResultados
+from rmi.skeleton import Dispatcher
+from rmi.transport import Requestor, ServerRequestHandler
+from services.loja import Loja
+from services.catalogo import CatalogoService
+from app.client import CatalogoProxy
+from benchmarks.gerador import gerar_produtos
+
+HOST, PORT = "127.0.0.1", 9950
+TAMANHOS = (1_000, 10_000, 50_000)
+
+def main() -> None:
+    print(f"{'produtos':>9} {'por valor (ms)':>15} {'por referência (ms)':>20}")
+    port = PORT
+    for n in TAMANHOS:
+        loja = Loja("Bench")
+        for p in gerar_produtos(n):
+            loja.add_produto(p)
+        repo = Repository()
+        repo.bind("CatalogoService", CatalogoService(loja, GerenciadorResultados(repo, HOST, port)))
+        ServerRequestHandler(HOST, port, Dispatcher(repo)).start_in_background()
+        time.sleep(0.2)
+        catalogo = CatalogoProxy(Registry(HOST, port).ror("CatalogoService"), Requestor())
+
+        # quantos são e os 20 primeiros
+        inicio = time.perf_counter()
+        todos = catalogo.listar()
+        total, primeiros = len(todos), todos[:20]
+        ms_valor = (time.perf_counter() - inicio) * 1000
+
+        inicio = time.perf_counter()
+        with catalogo.listar(por_referencia=True) as resultado:
+            total_ref, primeiros_ref = len(resultado), resultado[:20]
+        ms_ref = (time.perf_counter() - inicio) * 1000
+        assert total == total_ref and [p.id for p in primeiros] == [p.id for p in primeiros_ref]
+        print(f"{n:>9} {ms_valor:>15.1f} {ms_ref:>20.1f}")
+        port += 1
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# benchmark do Requestor: um ServerProxy novo por chamada (antes) x pool keep-alive (depois)
+# uso (a partir de trabalho2/): python -m benchmarks.bench_requestor
+import threading
+import time
+from xmlrpc.client import ServerProxy
+from app.demo_in_process import start_server
+from rmi.naming import Registry
+from rmi.protocol import make_request, unpack_args
+from rmi.marshalling import unmarshal
+from rmi.transport import Requestor
+
+HOST, PORT = "127.0.0.1", 9911
+CHAMADAS = 2_000
+
+# Requestor antigo, reproduzido para comparação
+class RequestorSemPool:
+    def doOperation(self, o, methodId, arguments):
+        req = make_request(o, methodId, arguments)
+        proxy = ServerProxy(f"http://{o.host}:{o.port}", allow_none=True)
+        reply = proxy.invoke(req)
+        return unmarshal(unpack_args(reply["arguments"]))
+
+def _chamadas_por_segundo(requestor, n_threads: int) -> float:
+    ror = Registry(HOST, PORT).ror("CatalogoService")
+    por_thread = CHAMADAS // n_threads
+
+    def trabalhador():
+        for _ in range(por_thread):
+            requestor.doOperation(ror, "buscar", {"args": ["python"]})
+
+    threads = [threading.Thread(target=trabalhador) for _ in range(n_threads)]
+    inicio = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return por_thread * n_threads / (time.perf_counter() - inicio)
+
+def main() -> None:
+    start_server(HOST, PORT)
+    print(f"{'threads':>8} {'sem pool (ch/s)':>16} {'com pool (ch/s)':>16}")
+    for n in (1, 4):
+        antes = _chamadas_por_segundo(RequestorSemPool(), n)
+        pool = Requestor(tamanho_pool=n)
+        depois = _chamadas_por_segundo(pool, n)
+        pool.close()
+        print(f"{n:>8} {antes:>16,.0f} {depois:>16,.0f}")
+
+if __name__ == "__main__":
+    main()
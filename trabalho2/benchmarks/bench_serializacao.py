@@ -0,0 +1,52 @@
+# benchmark de Produto.to_dict/from_dict: caminho antigo (asdict) x codificadores gerados
+# uso (a partir de trabalho2/): python -m benchmarks.bench_serializacao
+import time
+from dataclasses import asdict
+from models.base import Produto
+from models.livro import Livro
+from models.ebook import EBook
+from models.apostila import Apostila
+from models.cd import CD
+from benchmarks.gerador import gerar_produtos
+
+N = 100_000
+
+# implementações antigas, reproduzidas para comparação
+def to_dict_antigo(p: Produto) -> dict:
+    d = asdict(p)
+    d["__type__"] = p.__class__.__name__
+    return d
+
+def from_dict_antigo(d: dict) -> Produto:
+    map_cls = {"Livro": Livro, "EBook": EBook, "Apostila": Apostila, "CD": CD}
+    cls = map_cls.get(d.get("__type__"))
+    if not cls:
+        raise ValueError("Tipo de produto desconhecido")
+    d = dict(d)
+    d.pop("__type__", None)
+    obj = cls(**{k: v for k, v in d.items() if k not in ("disponivel",)})
+    obj.disponivel = d.get("disponivel", True)
+    return obj
+
+def _medir(nome: str, fn, dados) -> float:
+    inicio = time.perf_counter()
+    for x in dados:
+        fn(x)
+    seg = time.perf_counter() - inicio
+    print(f"{nome:>22}: {seg * 1000:8.1f} ms  ({len(dados) / seg:>10,.0f} ops/s)")
+    return seg
+
+def main() -> None:
+    produtos = gerar_produtos(N)
+    dicts = [p.to_dict() for p in produtos]
+    assert all(to_dict_antigo(p) == d for p, d in zip(produtos[:1000], dicts))
+    print(f"{N} produtos")
+    antigo = _medir("to_dict (asdict)", to_dict_antigo, produtos)
+    novo = _medir("to_dict (gerado)", Produto.to_dict, produtos)
+    print(f"{'ganho':>22}: {antigo / novo:.1f}x")
+    antigo = _medir("from_dict (antigo)", from_dict_antigo, dicts)
+    novo = _medir("from_dict (gerado)", Produto.from_dict, dicts)
+    print(f"{'ganho':>22}: {antigo / novo:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# teste de carga do servidor RMI: vazão por modo de servidor e número de workers,
+# com um método remoto lento (espera de E/S simulada) e 16 clientes simultâneos
+# uso (a partir de trabalho2/): python -m benchmarks.bench_servidor
+import threading
+import time
+from rmi.naming import Registry, Repository
+from rmi.skeleton import Dispatcher
+from rmi.transport import Requestor, ServerRequestHandler
+
+HOST = "127.0.0.1"
+CLIENTES = 16
+CHAMADAS_POR_CLIENTE = 100
+LATENCIA = 0.005
+WORKERS = (1, 2, 4, 8, 16)
+
+# serviço cuja consulta espera LATENCIA segundos, como uma busca lenta
+class ServicoLento:
+    def consultar(self, termo: str) -> str:
+        time.sleep(LATENCIA)
+        return termo
+
+def _subir(port: int, modo: str, workers: int) -> None:
+    repo = Repository()
+    repo.bind("Lento", ServicoLento())
+    handler = ServerRequestHandler(HOST, port, Dispatcher(repo), modo=modo, workers=workers)
+    handler.start_in_background()
+    time.sleep(0.2)
+
+def _vazao(port: int) -> float:
+    ror = Registry(HOST, port).ror("Lento")
+    barreira = threading.Barrier(CLIENTES + 1)
+
+    def cliente():
+        requestor = Requestor(tamanho_pool=1)
+        barreira.wait()
+        for _ in range(CHAMADAS_POR_CLIENTE):
+            requestor.doOperation(ror, "consultar", {"args": ["python"]})
+        requestor.close()
+
+    threads = [threading.Thread(target=cliente) for _ in range(CLIENTES)]
+    for t in threads:
+        t.start()
+    barreira.wait()
+    inicio = time.perf_counter()
+    for t in threads:
+        t.join()
+    return CLIENTES * CHAMADAS_POR_CLIENTE / (time.perf_counter() - inicio)
+
+def main() -> None:
+    port = 9920
+    print(f"{'modo':>8} {'workers':>8} {'chamadas/s':>11}")
+    _subir(port, "simples", 1)
+    print(f"{'simples':>8} {'-':>8} {_vazao(port):>11,.0f}")
+    for modo in ("threads", "asyncio"):
+        for workers in WORKERS:
+            port += 1
+            _subir(port, modo, workers)
+            print(f"{modo:>8} {workers:>8} {_vazao(port):>11,.0f}")
+
+if __name__ == "__main__":
+    main()
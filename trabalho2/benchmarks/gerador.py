@@ -0,0 +1,41 @@
+import random
+from typing import List
+from models.base import Produto
+from models.livro import Livro
+from models.ebook import EBook
+from models.apostila import Apostila
+from models.cd import CD
+
+_PALAVRAS = [
+    "senhor", "anéis", "python", "código", "limpo", "cálculo", "dados", "estruturas",
+    "história", "mundo", "guerra", "paz", "noite", "jazz", "azul", "programação",
+    "redes", "sistemas", "distribuídos", "física", "química", "romance", "memórias",
+]
+_AUTORES = ["Machado de Assis", "J.R.R. Tolkien", "Luciano Ramalho", "Clarice Lispector",
+            "Robert C. Martin", "Jorge Amado", "Cecília Meireles", "Beazley"]
+
+# gera um catálogo sintético com os quatro tipos de produto
+def gerar_produtos(n: int, semente: int = 42) -> List[Produto]:
+    rnd = random.Random(semente)
+    produtos: List[Produto] = []
+    for i in range(n):
+        titulo = " ".join(rnd.choice(_PALAVRAS) for _ in range(rnd.randint(2, 5))).title()
+        preco = round(rnd.uniform(5, 200), 2)
+        estado = rnd.choice(("novo", "usado"))
+        tipo = i % 4
+        if tipo == 0:
+            p = Livro(id=f"L{i}", titulo=titulo, preco=preco, estado=estado,
+                      autor=rnd.choice(_AUTORES), isbn=f"978-{i:010d}",
+                      paginas=rnd.randint(50, 1200), genero="Ficção")
+        elif tipo == 1:
+            p = EBook(id=f"E{i}", titulo=titulo, preco=preco, estado=estado,
+                      autor=rnd.choice(_AUTORES), isbn=f"978-{i:010d}", formato="PDF",
+                      tamanho_mb=round(rnd.uniform(1, 50), 1), drm=rnd.random() < 0.5)
+        elif tipo == 2:
+            p = Apostila(id=f"A{i}", titulo=titulo, preco=preco, estado=estado,
+                         materia=rnd.choice(_PALAVRAS), instituicao=rnd.choice(("UF", "UFC", "UECE")))
+        else:
+            p = CD(id=f"C{i}", titulo=titulo, preco=preco, estado=estado,
+                   artista=rnd.choice(_AUTORES), genero="Jazz", faixas=rnd.randint(5, 20))
+        produtos.append(p)
+    return produtos
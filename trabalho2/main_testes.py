@@ -0,0 +1,13 @@
+from testes.teste_servidores import teste_conexoes_ociosas
+from testes.teste_troca import teste_troca_apos_reprecificar
+from testes.teste_replicacao import teste_versoes_replica
+from testes.teste_persistencia import teste_recuperacao
+from testes.teste_transporte import teste_binario_sem_reenvio, teste_multiplexado_falhas
+
+if __name__ == "__main__":
+    teste_conexoes_ociosas()
+    teste_troca_apos_reprecificar()
+    teste_versoes_replica()
+    teste_recuperacao()
+    teste_binario_sem_reenvio()
+    teste_multiplexado_falhas()
@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from models.base import Produto
 
-@dataclass
+@dataclass(slots=True)
 class CD(Produto):
     artista: str
     genero: str
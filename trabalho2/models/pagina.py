@@ -0,0 +1,9 @@
+from dataclasses import dataclass
+from typing import List, Optional
+from models.base import Produto
+
+# página de uma listagem; `cursor` é opaco e fica None na última página
+@dataclass
+class Pagina:
+    itens: List[Produto]
+    cursor: Optional[str] = None
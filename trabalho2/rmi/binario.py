@@ -0,0 +1,230 @@
+from __future__ import annotations
+import socket
+import struct
+from typing import Any, Dict, List, Optional
+from .protocol import BATCH, REQUEST, REPLY
+
+# Protocolo binário do RMI sobre TCP (alternativa ao JSON em base64 dentro de XML-RPC).
+# Quadro: tamanho do corpo (u32) + corpo.
+#   requisição: messageType (u8), requestId (u64), objeto (texto), método (texto), argumentos (valor)
+#   lote: como a requisição (objeto e método vazios), com a lista de invocações nos argumentos
+#   resposta:   messageType (u8), requestId (u64), isException (u8), catalogVersion (u64, 0 = ausente),
+#               resultado (valor)
+# Valores tipados: 1 byte de tag + conteúdo. Textos curtos repetidos na mesma mensagem
+# viram referências de 2 bytes à 1ª ocorrência, e o mesmo vale para as chaves dos dicionários.
+
+_QUADRO = struct.Struct(">I")
+_CABECALHO = struct.Struct(">BQ")
+_RESPOSTA = struct.Struct(">BQ")
+_U8 = struct.Struct(">B")
+_U16 = struct.Struct(">H")
+_U32 = struct.Struct(">I")
+_I64 = struct.Struct(">q")
+_F64 = struct.Struct(">d")
+MAX_QUADRO = 64 << 20
+MAX_INTERNAVEL = 64
+MAX_REFERENCIAS = 1 << 16
+
+class _Escritor:
+    def __init__(self) -> None:
+        self.partes: List[bytes] = []
+        self._refs: Dict[str, int] = {}
+        self._esquemas: Dict[tuple, int] = {}
+
+    def valor(self, v: Any) -> None:
+        t = type(v)
+        if t is str:
+            self.texto(v)
+        elif t is dict:
+            self.dicionario(v)
+        elif t is float:
+            self.partes.append(b"f" + _F64.pack(v))
+        elif v is None:
+            self.partes.append(b"N")
+        elif v is True:
+            self.partes.append(b"T")
+        elif v is False:
+            self.partes.append(b"F")
+        elif isinstance(v, int):
+            self.partes.append(b"i" + _I64.pack(v))
+        elif isinstance(v, float):
+            self.partes.append(b"f" + _F64.pack(v))
+        elif isinstance(v, str):
+            self.texto(v)
+        elif isinstance(v, (list, tuple)):
+            self.partes.append(b"l" + _U32.pack(len(v)))
+            for item in v:
+                self.valor(item)
+        elif isinstance(v, dict):
+            self.dicionario(v)
+        else:
+            raise TypeError(f"Tipo não suportado no protocolo binário: {type(v).__name__}")
+
+    # o conjunto de chaves (esquema) vai uma vez por mensagem; dicionários seguintes
+    # com as mesmas chaves, como os produtos de uma lista, só levam a referência e os valores
+    def dicionario(self, d: dict) -> None:
+        chaves = tuple(d)
+        esquema = self._esquemas.get(chaves)
+        if esquema is None:
+            if len(self._esquemas) < MAX_REFERENCIAS:
+                self._esquemas[chaves] = len(self._esquemas)
+            self.partes.append(b"d" + _U32.pack(len(chaves)))
+            for chave in chaves:
+                self.texto(str(chave))
+        else:
+            self.partes.append(b"D" + _U16.pack(esquema))
+        for item in d.values():
+            self.valor(item)
+
+    def texto(self, s: str) -> None:
+        ref = self._refs.get(s)
+        if ref is not None:
+            self.partes.append(b"r" + _U16.pack(ref))
+            return
+        dados = s.encode("utf-8")
+        if len(dados) <= MAX_INTERNAVEL and len(self._refs) < MAX_REFERENCIAS:
+            self._refs[s] = len(self._refs)
+        if len(dados) < 256:
+            self.partes.append(b"s" + _U8.pack(len(dados)) + dados)
+        else:
+            self.partes.append(b"S" + _U32.pack(len(dados)) + dados)
+
+    def quadro(self) -> bytes:
+        corpo = b"".join(self.partes)
+        return _QUADRO.pack(len(corpo)) + corpo
+
+class _Leitor:
+    def __init__(self, corpo: bytes) -> None:
+        self.buf = corpo
+        self.pos = 0
+        self._refs: List[str] = []
+        self._esquemas: List[List[str]] = []
+
+    def _texto(self, n: int) -> str:
+        s = self.buf[self.pos:self.pos + n].decode("utf-8")
+        self.pos += n
+        if n <= MAX_INTERNAVEL and len(self._refs) < MAX_REFERENCIAS:
+            self._refs.append(s)
+        return s
+
+    def valor(self) -> Any:
+        buf = self.buf
+        tag = buf[self.pos]
+        self.pos += 1
+        if tag == 0x73:  # s
+            n = buf[self.pos]
+            self.pos += 1
+            return self._texto(n)
+        if tag == 0x72:  # r
+            (ref,) = _U16.unpack_from(buf, self.pos)
+            self.pos += 2
+            return self._refs[ref]
+        if tag == 0x44:  # D
+            (esquema,) = _U16.unpack_from(buf, self.pos)
+            self.pos += 2
+            chaves = self._esquemas[esquema]
+            valor = self.valor
+            return dict(zip(chaves, [valor() for _ in chaves]))
+        if tag == 0x66:  # f
+            (v,) = _F64.unpack_from(buf, self.pos)
+            self.pos += 8
+            return v
+        if tag == 0x54:  # T
+            return True
+        if tag == 0x46:  # F
+            return False
+        if tag == 0x4E:  # N
+            return None
+        if tag == 0x69:  # i
+            (v,) = _I64.unpack_from(buf, self.pos)
+            self.pos += 8
+            return v
+        if tag == 0x64:  # d
+            (n,) = _U32.unpack_from(buf, self.pos)
+            self.pos += 4
+            valor = self.valor
+            chaves = [valor() for _ in range(n)]
+            if len(self._esquemas) < MAX_REFERENCIAS:
+                self._esquemas.append(chaves)
+            return dict(zip(chaves, [valor() for _ in chaves]))
+        if tag == 0x6C:  # l
+            (n,) = _U32.unpack_from(buf, self.pos)
+            self.pos += 4
+            return [self.valor() for _ in range(n)]
+        if tag == 0x53:  # S
+            (n,) = _U32.unpack_from(buf, self.pos)
+            self.pos += 4
+            return self._texto(n)
+        raise ValueError(f"Tag inválida no protocolo binário: {tag:#x}")
+
+# quadros de requisição e resposta, prontos para envio
+def codificar_requisicao(request_id: int, objeto: str, metodo: str, argumentos: Any,
+                         tipo: int = REQUEST) -> bytes:
+    e = _Escritor()
+    e.partes.append(_CABECALHO.pack(tipo, request_id))
+    e.texto(objeto)
+    e.texto(metodo)
+    e.valor(argumentos)
+    return e.quadro()
+
+def codificar_resposta(request_id: int, resultado: Any, is_exception: bool = False,
+                       versao: Optional[int] = None) -> bytes:
+    e = _Escritor()
+    e.partes.append(_CABECALHO.pack(REPLY, request_id) + _RESPOSTA.pack(is_exception, versao or 0))
+    e.valor(resultado)
+    return e.quadro()
+
+# requestId de um quadro, mesmo que o restante do corpo não possa ser decodificado
+def ler_request_id(corpo: bytes) -> int:
+    if len(corpo) < _CABECALHO.size:
+        raise ValueError("Quadro sem cabeçalho.")
+    return _CABECALHO.unpack_from(corpo)[1]
+
+# corpo de um quadro -> mensagem no mesmo formato de make_request/make_reply
+# (com os argumentos já decodificados)
+def decodificar(corpo: bytes) -> Dict[str, Any]:
+    tipo, request_id = _CABECALHO.unpack_from(corpo)
+    leitor = _Leitor(corpo)
+    leitor.pos = _CABECALHO.size
+    if tipo in (REQUEST, BATCH):
+        return {
+            "messageType": tipo,
+            "requestId": request_id,
+            "objectReference": leitor.valor(),
+            "methodId": leitor.valor(),
+            "arguments": leitor.valor(),
+        }
+    if tipo == REPLY:
+        is_exception, versao = _RESPOSTA.unpack_from(corpo, leitor.pos)
+        leitor.pos += _RESPOSTA.size
+        return {
+            "messageType": REPLY,
+            "requestId": request_id,
+            "isException": bool(is_exception),
+            "catalogVersion": versao or None,
+            "arguments": leitor.valor(),
+        }
+    raise ValueError(f"Tipo de mensagem inválido: {tipo}")
+
+def _ler_exato(sock: socket.socket, n: int) -> bytes:
+    buf = bytearray(n)
+    vista = memoryview(buf)
+    lidos = 0
+    while lidos < n:
+        k = sock.recv_into(vista[lidos:])
+        if k == 0:
+            raise ConnectionResetError("Conexão encerrada no meio de um quadro.")
+        lidos += k
+    return bytes(buf)
+
+# lê o próximo quadro do socket; None se a conexão foi encerrada entre quadros
+def ler_quadro(sock: socket.socket) -> Optional[bytes]:
+    primeiro = sock.recv(_QUADRO.size)
+    if not primeiro:
+        return None
+    if len(primeiro) < _QUADRO.size:
+        primeiro += _ler_exato(sock, _QUADRO.size - len(primeiro))
+    (tamanho,) = _QUADRO.unpack(primeiro)
+    if tamanho > MAX_QUADRO:
+        raise ValueError(f"Quadro excede o tamanho máximo ({tamanho} bytes).")
+    return _ler_exato(sock, tamanho)
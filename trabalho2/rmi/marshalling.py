@@ -1,5 +1,7 @@
 from typing import Any
 from models.base import Produto
+from models.pagina import Pagina
+from .protocol import RemoteObjectRef
 
 # representação externa: JSON compatível
 def marshal(obj: Any) -> Any:
@@ -9,6 +11,12 @@ def marshal(obj: Any) -> Any:
     # lista de produtos
     if isinstance(obj, list) and obj and isinstance(obj[0], Produto):
         return {"__kind__": "ListaProduto", "value": [p.to_dict() for p in obj]}
+    # página de produtos com cursor
+    if isinstance(obj, Pagina):
+        return {"__kind__": "Pagina", "value": {"itens": [p.to_dict() for p in obj.itens], "cursor": obj.cursor}}
+    # referência a objeto remoto (ex.: resultado mantido no servidor)
+    if isinstance(obj, RemoteObjectRef):
+        return {"__kind__": "RemoteObjectRef", "value": obj.to_dict()}
     # tipos simples
     return obj
 
@@ -17,4 +25,9 @@ def unmarshal(data: Any) -> Any:
         return Produto.from_dict(data["value"])
     if isinstance(data, dict) and data.get("__kind__") == "ListaProduto":
         return [Produto.from_dict(d) for d in data["value"]]
+    if isinstance(data, dict) and data.get("__kind__") == "Pagina":
+        v = data["value"]
+        return Pagina([Produto.from_dict(d) for d in v["itens"]], v["cursor"])
+    if isinstance(data, dict) and data.get("__kind__") == "RemoteObjectRef":
+        return RemoteObjectRef.from_dict(data["value"])
     return data
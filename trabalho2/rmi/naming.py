@@ -1,6 +1,7 @@
 from dataclasses import dataclass
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, Optional
 from .protocol import RemoteObjectRef
+from .skeleton import Skeleton
 
 # representa o registro de objetos remotos
 @dataclass
@@ -14,11 +15,25 @@ class Registry:
 class Repository:
     def __init__(self):
         self._objs: Dict[str, Any] = {}
+        self.skeletons: Dict[str, Skeleton] = {}
 
-    def bind(self, name: str, obj: Any):
+    # registra o objeto e monta seu esqueleto; só os `metodos` informados (por padrão,
+    # os métodos públicos da classe) podem ser invocados remotamente
+    def bind(self, name: str, obj: Any, metodos: Optional[Iterable[str]] = None):
+        self.skeletons[name] = Skeleton(obj, metodos)
         self._objs[name] = obj
 
+    def unbind(self, name: str) -> None:
+        self.skeletons.pop(name, None)
+        self._objs.pop(name, None)
+
     def resolve(self, name: str) -> Any:
         if name not in self._objs:
             raise KeyError(f"Objeto remoto '{name}' não encontrado")
         return self._objs[name]
+
+    def skeleton(self, name: str) -> Skeleton:
+        skeleton = self.skeletons.get(name)
+        if skeleton is None:
+            raise KeyError(f"Objeto remoto '{name}' não encontrado")
+        return skeleton
@@ -1,9 +1,9 @@
 from __future__ import annotations
 import json, base64, itertools
 from dataclasses import dataclass
-from typing import Any, Dict
+from typing import Any, Dict, List, Tuple
 
-REQUEST, REPLY = 0, 1
+REQUEST, REPLY, BATCH = 0, 1, 2
 _request_counter = itertools.count(1)
 
 # representação de referência a objeto remoto
@@ -36,16 +36,33 @@ def unpack_args(s: str) -> Any:
     by = base64.b64decode(s.encode("ascii"))
     return from_bytes(by)
 
+def proximo_request_id() -> int:
+    return next(_request_counter)
+
 # criação de mensagens de requisição e resposta RMI
 def make_request(ror: RemoteObjectRef, method: str, args_external: Any) -> Dict[str, Any]:
     return {
         "messageType": REQUEST,
-        "requestId": next(_request_counter),
+        "requestId": proximo_request_id(),
         "objectReference": ror.object_name,
         "methodId": method,
         "arguments": pack_args(args_external),
     }
 
+# lote: várias invocações (objeto, método, argumentos) numa única requisição;
+# a resposta traz, na mesma ordem, {"isException", "arguments"} de cada uma
+def make_batch_request(invocacoes: List[Tuple[str, str, Any]]) -> Dict[str, Any]:
+    return {
+        "messageType": BATCH,
+        "requestId": proximo_request_id(),
+        "objectReference": "",
+        "methodId": "",
+        "arguments": pack_args(batch_arguments(invocacoes)),
+    }
+
+def batch_arguments(invocacoes: List[Tuple[str, str, Any]]) -> List[Dict[str, Any]]:
+    return [{"objectReference": o, "methodId": m, "arguments": a} for o, m, a in invocacoes]
+
 def make_reply(req_id: int, result_external: Any, is_exception: bool=False) -> Dict[str, Any]:
     return {
         "messageType": REPLY,
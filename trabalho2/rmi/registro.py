@@ -0,0 +1,224 @@
+from __future__ import annotations
+import itertools
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from .protocol import RemoteObjectRef
+from .transport import Requestor
+
+Endpoint = Tuple[str, int]
+NOME_REGISTRO = "Registro"
+
+# serviço de nomes (roda num processo próprio, ver app/registro.py): cada servidor RMI
+# registra os objetos que publica e renova o registro com heartbeats; servidores sem
+# heartbeat há mais de `expira` segundos deixam de ser retornados por resolver
+class ServicoRegistro:
+    def __init__(self, expira: float = 5.0):
+        self.expira = expira
+        self._servidores: Dict[Endpoint, Tuple[List[str], float]] = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, host: str, port: int, nomes: List[str]) -> bool:
+        with self._lock:
+            self._servidores[(host, int(port))] = (list(nomes), time.monotonic())
+        return True
+
+    # False se o servidor não está registrado (ex.: o registro reiniciou): registre de novo
+    def heartbeat(self, host: str, port: int) -> bool:
+        with self._lock:
+            atual = self._servidores.get((host, int(port)))
+            if atual is None:
+                return False
+            self._servidores[(host, int(port))] = (atual[0], time.monotonic())
+        return True
+
+    def remover(self, host: str, port: int) -> bool:
+        with self._lock:
+            return self._servidores.pop((host, int(port)), None) is not None
+
+    # endpoints vivos que publicam `nome`, como [[host, port], ...]
+    def resolver(self, nome: str) -> list:
+        limite = time.monotonic() - self.expira
+        with self._lock:
+            return sorted([list(e) for e, (nomes, visto) in self._servidores.items()
+                           if visto >= limite and nome in nomes])
+
+    # {"host:port": [nomes]} dos servidores vivos
+    def servidores(self) -> dict:
+        limite = time.monotonic() - self.expira
+        with self._lock:
+            return {f"{h}:{p}": nomes for (h, p), (nomes, visto) in self._servidores.items() if visto >= limite}
+
+# lado do servidor RMI: registra os objetos publicados e mantém o registro vivo com
+# heartbeats a cada `intervalo` segundos; se o registro cair, volta a registrar quando ele voltar
+class Anunciante:
+    def __init__(self, registro: Endpoint, host: str, port: int, nomes: List[str],
+                 intervalo: float = 1.0, requestor: Optional[Requestor] = None):
+        self.ror = RemoteObjectRef(registro[0], registro[1], NOME_REGISTRO)
+        self.host = host
+        self.port = port
+        self.nomes = list(nomes)
+        self.intervalo = intervalo
+        self.req = requestor if requestor is not None else Requestor(tamanho_pool=1)
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def iniciar(self) -> None:
+        self._thread = threading.Thread(target=self._anunciar, daemon=True)
+        self._thread.start()
+
+    def _anunciar(self) -> None:
+        registrado = False
+        while not self._parar.is_set():
+            try:
+                if registrado:
+                    registrado = self.req.doOperation(self.ror, "heartbeat", {"args": [self.host, self.port]})
+                if not registrado:
+                    registrado = self.req.doOperation(
+                        self.ror, "registrar", {"args": [self.host, self.port, self.nomes]})
+            except (OSError, RuntimeError):
+                registrado = False
+            self._parar.wait(self.intervalo)
+
+    # sai do registro (os clientes param de escolher este servidor na próxima resolução)
+    def parar(self) -> None:
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join()
+        try:
+            self.req.doOperation(self.ror, "remover", {"args": [self.host, self.port]})
+        except (OSError, RuntimeError):
+            pass
+        self.req.close()
+
+# lado do cliente: resolve nomes no registro, guardando a resposta por `validade` segundos.
+# Se o registro falhar, a última lista obtida continua valendo (e a consulta é repetida
+# só após outros `validade` segundos); enquanto uma thread consulta o registro, as
+# outras usam a lista anterior em vez de esperar
+class RegistroRemoto:
+    def __init__(self, host: str, port: int, requestor: Optional[Requestor] = None, validade: float = 2.0):
+        self.ror_registro = RemoteObjectRef(host, port, NOME_REGISTRO)
+        self.req = requestor if requestor is not None else Requestor(tamanho_pool=2)
+        self.validade = validade
+        self._cache: Dict[str, Tuple[List[Endpoint], float]] = {}
+        self._consultando: Set[str] = set()
+        self._lock = threading.Lock()
+
+    # referência lógica (host vazio): o RequestorBalanceado escolhe o servidor a cada chamada
+    def ror(self, nome: str) -> RemoteObjectRef:
+        return RemoteObjectRef("", 0, nome)
+
+    def resolver(self, nome: str) -> List[Endpoint]:
+        with self._lock:
+            em_cache = self._cache.get(nome)
+            if em_cache is not None and (em_cache[1] > time.monotonic() or nome in self._consultando):
+                return em_cache[0]
+            self._consultando.add(nome)
+        try:
+            endpoints = [(h, int(p)) for h, p in self.req.doOperation(self.ror_registro, "resolver", {"args": [nome]})]
+        except Exception:
+            if em_cache is None:
+                with self._lock:
+                    self._consultando.discard(nome)
+                raise
+            endpoints = em_cache[0]
+        with self._lock:
+            self._cache[nome] = (endpoints, time.monotonic() + self.validade)
+            self._consultando.discard(nome)
+        return endpoints
+
+    # a próxima resolução consulta o registro (a lista atual fica como reserva)
+    def invalidar(self, nome: str) -> None:
+        with self._lock:
+            em_cache = self._cache.get(nome)
+            if em_cache is not None:
+                self._cache[nome] = (em_cache[0], 0.0)
+
+    def close(self) -> None:
+        self.req.close()
+
+POLITICAS = ("round_robin", "menos_pendentes")
+
+# distribui as chamadas a referências lógicas (RegistroRemoto.ror) entre os servidores
+# vivos que publicam o objeto:
+#   round_robin     - um servidor de cada vez, em rodízio
+#   menos_pendentes - o servidor com menos chamadas em andamento deste cliente
+# Failover: servidor que recusa a conexão fica de quarentena e a chamada vai para o próximo.
+# Outras falhas de rede não são repetidas, pois a chamada pode ter sido executada.
+# Referências concretas (com host, ex.: resultados remotos) vão direto ao seu servidor.
+class RequestorBalanceado:
+    def __init__(self, registro: RegistroRemoto, politica: str = "round_robin",
+                 requestor: Optional[Requestor] = None, quarentena: float = 5.0):
+        if politica not in POLITICAS:
+            raise ValueError(f"Política desconhecida: {politica}")
+        self.registro = registro
+        self.politica = politica
+        self.base = requestor if requestor is not None else Requestor()
+        self.quarentena = quarentena
+        self._rodizio = itertools.count()
+        self._pendentes: Dict[Endpoint, int] = {}
+        self._mortos: Dict[Endpoint, float] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    # a resolução (que pode consultar o registro pela rede) fica fora da trava
+    def _escolher(self, nome: str, tentados: Set[Endpoint]) -> Endpoint:
+        endpoints = self.registro.resolver(nome)
+        agora = time.monotonic()
+        with self._lock:
+            vivos = [e for e in endpoints if e not in tentados and self._mortos.get(e, 0.0) <= agora]
+            if not vivos:
+                raise ConnectionRefusedError(f"Nenhum servidor disponível para '{nome}'")
+            # o rodízio também desempata o menos_pendentes (servidores ociosos se alternam)
+            inicio = next(self._rodizio) % len(vivos)
+            vivos = vivos[inicio:] + vivos[:inicio]
+            if self.politica == "round_robin":
+                escolhido = vivos[0]
+            else:
+                escolhido = min(vivos, key=lambda e: self._pendentes.get(e, 0))
+            self._pendentes[escolhido] = self._pendentes.get(escolhido, 0) + 1
+            return escolhido
+
+    def _com_failover(self, o: RemoteObjectRef, chamada: Callable[[RemoteObjectRef], object]):
+        if o.host:
+            return chamada(o)
+        tentados: Set[Endpoint] = set()
+        while True:
+            endpoint = self._escolher(o.object_name, tentados)
+            try:
+                return chamada(RemoteObjectRef(endpoint[0], endpoint[1], o.object_name))
+            except ConnectionRefusedError:
+                tentados.add(endpoint)
+                with self._lock:
+                    self._mortos[endpoint] = time.monotonic() + self.quarentena
+                self.registro.invalidar(o.object_name)
+            finally:
+                with self._lock:
+                    self._pendentes[endpoint] -= 1
+
+    def doOperation(self, o: RemoteObjectRef, methodId: str, arguments):
+        return self._com_failover(o, lambda alvo: self.base.doOperation(alvo, methodId, arguments))
+
+    def doBatch(self, o: RemoteObjectRef, invocacoes):
+        return self._com_failover(o, lambda alvo: self.base.doBatch(alvo, invocacoes))
+
+    def doOperationAsync(self, o: RemoteObjectRef, methodId: str, arguments) -> Future:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(thread_name_prefix="balanceado")
+        return self._executor.submit(self.doOperation, o, methodId, arguments)
+
+    # as réplicas têm versões de catálogo independentes: sem versão, o cache do proxy fica desligado
+    def versao(self, o: RemoteObjectRef) -> Optional[int]:
+        return self.base.versao(o) if o.host else None
+
+    # chamadas em andamento por servidor
+    def pendentes(self) -> Dict[Endpoint, int]:
+        with self._lock:
+            return dict(self._pendentes)
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+        self.base.close()
@@ -0,0 +1,90 @@
+from __future__ import annotations
+import itertools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, List, Optional, Tuple
+from .protocol import RemoteObjectRef
+from .transport import Requestor
+
+Endpoint = Tuple[str, int]
+# métodos só de leitura, que uma réplica (app/server.py --primario) pode atender
+LEITURAS = frozenset({"listar", "buscar"})
+
+# usado com proxies que apontam para o primário: escritas (e tudo o que não é leitura)
+# vão a ele, e as leituras vão às réplicas em rodízio. Se a réplica não responde ou
+# está atrasada, a leitura (idempotente) é refeita no primário.
+# Com ler_escritas=True, cada leitura leva a versão do catálogo devolvida pela última
+# escrita deste requestor (versao_minima) e a réplica só responde depois de aplicá-la.
+class RequestorReplicado:
+    def __init__(self, replicas: List[Endpoint], ler_escritas: bool = True,
+                 requestor: Optional[Requestor] = None):
+        self.replicas = [(h, int(p)) for h, p in replicas]
+        self.ler_escritas = ler_escritas
+        self.base = requestor if requestor is not None else Requestor()
+        self._rodizio = itertools.count()
+        self._escrita: Optional[int] = None
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # servidor que atendeu a última chamada de cada thread
+        self._local = threading.local()
+
+    def _anotar_escrita(self, o: RemoteObjectRef) -> None:
+        versao = self.base.versao(o)
+        if versao is None:
+            return
+        with self._lock:
+            if self._escrita is None or versao > self._escrita:
+                self._escrita = versao
+
+    def _com_versao(self, arguments: Any) -> Any:
+        if not self.ler_escritas or self._escrita is None:
+            return arguments
+        kwargs = dict(arguments.get("kwargs") or {})
+        kwargs["versao_minima"] = self._escrita
+        return {**arguments, "kwargs": kwargs}
+
+    def doOperation(self, o: RemoteObjectRef, methodId: str, arguments: Any) -> Any:
+        self._local.atendeu = (o.host, o.port)
+        if methodId not in LEITURAS or not self.replicas:
+            r = self.base.doOperation(o, methodId, arguments)
+            self._anotar_escrita(o)
+            return r
+        host, port = self.replicas[next(self._rodizio) % len(self.replicas)]
+        try:
+            r = self.base.doOperation(RemoteObjectRef(host, port, o.object_name), methodId,
+                                      self._com_versao(arguments))
+            self._local.atendeu = (host, port)
+            return r
+        except (OSError, RuntimeError):
+            return self.base.doOperation(o, methodId, arguments)
+
+    # lotes vão inteiros ao servidor do proxy (o primário)
+    def doBatch(self, o: RemoteObjectRef, invocacoes):
+        r = self.base.doBatch(o, invocacoes)
+        self._anotar_escrita(o)
+        return r
+
+    def doOperationAsync(self, o: RemoteObjectRef, methodId: str, arguments: Any) -> Future:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(thread_name_prefix="replicado")
+        return self._executor.submit(self.doOperation, o, methodId, arguments)
+
+    # réplicas informam a versão do primário que já aplicaram (e nenhuma antes de carregar
+    # o estado dele): as versões, guardadas por servidor, são comparáveis, e a maior
+    # conhecida vale para o cache do CatalogoProxy
+    def versao(self, o: RemoteObjectRef) -> Optional[int]:
+        versoes = [self.base.versoes.get(h, p) for h, p in [(o.host, o.port)] + self.replicas]
+        versoes = [v for v in versoes if v is not None]
+        return max(versoes) if versoes else None
+
+    # versão informada pelo servidor que atendeu a última chamada desta thread: uma réplica
+    # atrasada responde com uma versão menor que a de versao()
+    def versao_resposta(self, o: RemoteObjectRef) -> Optional[int]:
+        host, port = getattr(self._local, "atendeu", (o.host, o.port))
+        return self.base.versoes.get(host, port)
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+        self.base.close()
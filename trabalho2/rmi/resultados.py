@@ -0,0 +1,111 @@
+import itertools
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+from .naming import Repository
+from .protocol import RemoteObjectRef
+
+# resultado mantido no servidor e acessado por referência: o cliente consulta o tamanho
+# e puxa fatias sob demanda, em vez de receber todos os itens na resposta
+class ConjuntoResultados:
+    def __init__(self, itens: Sequence[Any]):
+        self._itens = itens
+        self._posicao = 0
+        self._lock = threading.Lock()
+
+    def tamanho(self) -> int:
+        return len(self._itens)
+
+    # itens em [inicio, fim)
+    def fatia(self, inicio: int, fim: int) -> List[Any]:
+        return list(self._itens[inicio:fim])
+
+    # cursor do servidor: os próximos `n` itens a partir da última leitura
+    def proximos(self, n: int) -> List[Any]:
+        with self._lock:
+            inicio = self._posicao
+            self._posicao = min(inicio + n, len(self._itens))
+        return list(self._itens[inicio:self._posicao])
+
+# publica resultados no Repository sob nomes únicos, cada um com um lease: todo acesso o
+# renova, e resultados sem acesso por `lease` segundos (ou fechados pelo cliente) são removidos.
+# Os vencidos são recolhidos a cada exportação ou acesso; um lease vencido não é renovado
+class GerenciadorResultados:
+    PREFIXO = "resultado/"
+
+    def __init__(self, repo: Repository, host: str, port: int, lease: float = 60.0, maximo: int = 1000):
+        self.repo = repo
+        self.host = host
+        self.port = port
+        self.lease = lease
+        self.maximo = maximo
+        self._expira: Dict[str, float] = {}
+        # nenhum lease vence antes disto (os acessos só adiam os vencimentos)
+        self._proximo_vencimento = float("inf")
+        self._seq = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def exportar(self, itens: Sequence[Any]) -> RemoteObjectRef:
+        self.expirar()
+        nome = f"{self.PREFIXO}{next(self._seq)}"
+        with self._lock:
+            if len(self._expira) >= self.maximo:
+                raise ValueError("Limite de resultados remotos abertos atingido.")
+            self._expira[nome] = time.monotonic() + self.lease
+            self._proximo_vencimento = min(self._proximo_vencimento, self._expira[nome])
+        self.repo.bind(nome, _ResultadoComLease(self, nome, ConjuntoResultados(itens)))
+        return RemoteObjectRef(self.host, self.port, nome)
+
+    def renovar(self, nome: str) -> None:
+        agora = time.monotonic()
+        self.expirar(agora)
+        with self._lock:
+            if nome not in self._expira:
+                raise KeyError(f"Resultado remoto '{nome}' expirado ou fechado")
+            self._expira[nome] = agora + self.lease
+
+    def fechar(self, nome: str) -> None:
+        with self._lock:
+            existia = self._expira.pop(nome, None) is not None
+        if existia:
+            self.repo.unbind(nome)
+
+    # remove os resultados com lease vencido; retorna quantos saíram. Só percorre os
+    # leases quando o vencimento mais próximo (da última varredura) já passou
+    def expirar(self, agora: Optional[float] = None) -> int:
+        agora = time.monotonic() if agora is None else agora
+        with self._lock:
+            if agora < self._proximo_vencimento:
+                return 0
+            vencidos = [nome for nome, expira in self._expira.items() if expira <= agora]
+            for nome in vencidos:
+                del self._expira[nome]
+            self._proximo_vencimento = min(self._expira.values(), default=float("inf"))
+        for nome in vencidos:
+            self.repo.unbind(nome)
+        return len(vencidos)
+
+    def abertos(self) -> int:
+        return len(self._expira)
+
+# objeto publicado: cada chamada renova o lease antes de ler o conjunto
+class _ResultadoComLease:
+    def __init__(self, gerenciador: GerenciadorResultados, nome: str, conjunto: ConjuntoResultados):
+        self._gerenciador = gerenciador
+        self._nome = nome
+        self._conjunto = conjunto
+
+    def tamanho(self) -> int:
+        self._gerenciador.renovar(self._nome)
+        return self._conjunto.tamanho()
+
+    def fatia(self, inicio: int, fim: int) -> list:
+        self._gerenciador.renovar(self._nome)
+        return self._conjunto.fatia(inicio, fim)
+
+    def proximos(self, n: int) -> list:
+        self._gerenciador.renovar(self._nome)
+        return self._conjunto.proximos(n)
+
+    def fechar(self) -> None:
+        self._gerenciador.fechar(self._nome)
@@ -0,0 +1,212 @@
+from __future__ import annotations
+import asyncio
+import queue
+import select
+import socket
+import socketserver
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Set
+from xmlrpc.client import Fault, dumps, loads
+from xmlrpc.server import SimpleXMLRPCServer, SimpleXMLRPCRequestHandler
+from .binario import ler_quadro
+
+# HTTP/1.1 para que o cliente reaproveite a conexão entre chamadas;
+# conexões ociosas por mais de `timeout` segundos são encerradas pelo servidor, e por
+# mais de `ocioso_com_fila` segundos se houver conexões esperando um worker na fila
+class KeepAliveRequestHandler(SimpleXMLRPCRequestHandler):
+    protocol_version = "HTTP/1.1"
+    timeout = 60
+    ocioso_com_fila = 1.0
+
+    # como BaseHTTPRequestHandler.handle, mas esperando cada requisição com select em vez
+    # de bloquear na leitura: enquanto espera, o worker confere a fila do servidor
+    def handle(self) -> None:
+        self.close_connection = False
+        while not self.close_connection and self._aguardar_requisicao():
+            self.handle_one_request()
+
+    # True quando há dados para ler; False se a conexão deve ser encerrada por ociosidade.
+    # (o cliente XML-RPC não envia uma requisição antes da resposta da anterior, então
+    # não sobram dados no buffer do rfile que o select deixaria de ver)
+    def _aguardar_requisicao(self) -> bool:
+        limite = time.monotonic() + self.timeout
+        while True:
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                return False
+            prontos, _, _ = select.select([self.connection], [], [], min(restante, self.ocioso_com_fila))
+            if prontos:
+                return True
+            if self.server.ocupado():
+                return False
+
+    # com conexões esperando na fila, encerra esta após a resposta para liberar o worker;
+    # o cliente reabre a conexão de forma transparente na próxima chamada
+    def handle_one_request(self) -> None:
+        super().handle_one_request()
+        if self.server.ocupado():
+            self.close_connection = True
+
+# servidor XML-RPC que atende uma requisição por vez
+class ServidorSimples(SimpleXMLRPCServer):
+    # backlog do listen (o padrão, 5, descarta rajadas de conexões simultâneas)
+    request_queue_size = 128
+
+# número fixo de workers para um servidor do socketserver: cada conexão aceita entra numa
+# fila limitada e é atendida por um worker livre. Com a fila cheia, o laço de accept bloqueia
+# e novas conexões esperam no backlog do socket (backpressure para os clientes).
+class PoolMixIn:
+    def iniciar_workers(self, workers: int, fila: int) -> None:
+        self._fila: queue.Queue = queue.Queue(fila)
+        for _ in range(workers):
+            threading.Thread(target=self._trabalhar, daemon=True).start()
+
+    def process_request(self, request, client_address) -> None:
+        self._fila.put((request, client_address))
+
+    def _trabalhar(self) -> None:
+        while True:
+            request, client_address = self._fila.get()
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+    def ocupado(self) -> bool:
+        return not self._fila.empty()
+
+# servidor XML-RPC com pool de workers
+class ServidorPool(PoolMixIn, ServidorSimples):
+    def __init__(self, endereco, workers: int = 16, fila: int = 64, **kwargs) -> None:
+        super().__init__(endereco, requestHandler=KeepAliveRequestHandler, **kwargs)
+        self.iniciar_workers(workers, fila)
+
+# lê os quadros do protocolo binário de uma conexão persistente e os executa no pool
+# do servidor; as respostas saem na ordem em que ficam prontas (o cliente as associa
+# pelo requestId), então várias chamadas da mesma conexão andam em paralelo
+class _QuadrosRequestHandler(socketserver.BaseRequestHandler):
+    def handle(self) -> None:
+        sock = self.request
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        lock_escrita = threading.Lock()
+        pendentes: Set[Future] = set()
+
+        def responder(corpo: bytes) -> None:
+            try:
+                resposta = self.server.tratar(corpo)
+                with lock_escrita:
+                    sock.sendall(resposta)
+            except Exception:
+                # quadro inválido ou cliente desconectado: encerra a conexão
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+            finally:
+                self.server.vagas.release()
+
+        try:
+            while True:
+                corpo = ler_quadro(sock)
+                if corpo is None:
+                    break
+                # sem vaga, para de ler a conexão até alguma chamada terminar
+                self.server.vagas.acquire()
+                futuro = self.server.executor.submit(responder, corpo)
+                pendentes.add(futuro)
+                futuro.add_done_callback(pendentes.discard)
+        except (OSError, ValueError):
+            pass
+        # a conexão só é fechada depois das respostas pendentes
+        wait(list(pendentes))
+
+# servidor do protocolo binário: uma thread leitora por conexão e `workers` threads
+# para as chamadas; no máximo workers + fila chamadas ficam em andamento (backpressure).
+# `tratar` recebe o corpo de um quadro de requisição e devolve o quadro de resposta
+class ServidorBinario(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, endereco, tratar: Callable[[bytes], bytes], workers: int = 16, fila: int = 64) -> None:
+        super().__init__(endereco, _QuadrosRequestHandler)
+        self.tratar = tratar
+        self.executor = ThreadPoolExecutor(workers, thread_name_prefix="rmi")
+        self.vagas = threading.BoundedSemaphore(workers + fila)
+
+# servidor XML-RPC sobre asyncio: o laço de eventos cuida das conexões e do HTTP,
+# e as chamadas rodam em um pool de `workers` threads. No máximo workers + fila chamadas
+# ficam em andamento; além disso, as conexões deixam de ser lidas até abrir uma vaga.
+class ServidorAsyncio:
+    def __init__(self, host: str, port: int, workers: int = 16, fila: int = 64) -> None:
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.fila = fila
+        self._funcoes: Dict[str, Callable[..., Any]] = {}
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="rmi")
+        self._vagas: asyncio.Semaphore = None
+
+    def register_function(self, funcao: Callable[..., Any], nome: str) -> None:
+        self._funcoes[nome] = funcao
+
+    def serve_forever(self) -> None:
+        asyncio.run(self._servir())
+
+    async def _servir(self) -> None:
+        self._vagas = asyncio.Semaphore(self.workers + self.fila)
+        servidor = await asyncio.start_server(self._atender, self.host, self.port)
+        async with servidor:
+            await servidor.serve_forever()
+
+    # atende as requisições HTTP de uma conexão até o cliente encerrá-la
+    async def _atender(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                linha = await reader.readline()
+                if not linha:
+                    break
+                partes = linha.decode("latin-1").split()
+                cabecalhos = {}
+                while True:
+                    cabecalho = await reader.readline()
+                    if cabecalho in (b"\r\n", b"\n", b""):
+                        break
+                    nome, _, valor = cabecalho.decode("latin-1").partition(":")
+                    cabecalhos[nome.strip().lower()] = valor.strip()
+                if len(partes) != 3 or partes[0] != "POST":
+                    writer.write(b"HTTP/1.1 501 Not Implemented\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+                    await writer.drain()
+                    break
+                corpo = await reader.readexactly(int(cabecalhos.get("content-length", 0)))
+                async with self._vagas:
+                    resposta = await loop.run_in_executor(self._executor, self._executar, corpo)
+                manter = partes[2] == "HTTP/1.1" and cabecalhos.get("connection", "").lower() != "close"
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: text/xml\r\nContent-Length: %d\r\n%s\r\n"
+                    % (len(resposta), b"" if manter else b"Connection: close\r\n")
+                    + resposta
+                )
+                await writer.drain()
+                if not manter:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    # decodifica a chamada XML-RPC, executa e codifica a resposta (ou a falha)
+    def _executar(self, corpo: bytes) -> bytes:
+        try:
+            params, nome = loads(corpo)
+            if nome not in self._funcoes:
+                raise KeyError(f'method "{nome}" is not supported')
+            resposta = dumps((self._funcoes[nome](*params),), methodresponse=True, allow_none=True)
+        except Exception as e:
+            resposta = dumps(Fault(1, f"{type(e)}:{e}"), allow_none=True)
+        return resposta.encode("utf-8")
@@ -1,18 +1,98 @@
-from typing import Any
+import inspect
+import typing
+from typing import Any, Callable, Dict, Iterable, List, Optional
 from .marshalling import marshal, unmarshal
+from .protocol import BATCH, REQUEST
+
+# tipos que chegam prontos na representação externa (sem unmarshal)
+_SIMPLES = (str, int, float, bool, type(None))
+
+# conversor de um parâmetro conforme a anotação: None (usa o valor como veio) ou unmarshal
+def _conversor(anotacao: Any) -> Optional[Callable[[Any], Any]]:
+    if anotacao in _SIMPLES:
+        return None
+    if typing.get_origin(anotacao) is typing.Union and all(a in _SIMPLES for a in typing.get_args(anotacao)):
+        return None
+    return unmarshal
+
+# função de saída conforme o retorno anotado: None (o resultado já é representação externa)
+# ou marshal; marshal não altera dicionários, então eles também passam direto
+def _saida(anotacao: Any) -> Optional[Callable[[Any], Any]]:
+    if anotacao is dict or _conversor(anotacao) is None:
+        return None
+    return marshal
+
+# monta a chamada de um método a partir da representação externa dos argumentos;
+# quando nenhum argumento precisa de unmarshal a lista recebida é repassada como está
+def _compilar(metodo: Callable, posicionais: List, nomeados: Dict[str, Any], saida) -> Callable[[Any], Any]:
+    converte = any(c is not None for c in posicionais)
+    n = len(posicionais)
+
+    def chamar(args_external: Any) -> Any:
+        externos = args_external.get("args") if type(args_external) is dict else None
+        if externos is None:
+            r = metodo()
+        else:
+            if converte or len(externos) > n:
+                args = [a if c is None else c(a) for c, a in zip(posicionais, externos)]
+                args.extend(unmarshal(a) for a in externos[n:])
+            else:
+                args = externos
+            kwargs = args_external.get("kwargs")
+            if kwargs:
+                kwargs = {k: v if nomeados.get(k, unmarshal) is None else unmarshal(v) for k, v in kwargs.items()}
+                r = metodo(*args, **kwargs)
+            else:
+                r = metodo(*args)
+        return r if saida is None else saida(r)
+    return chamar
+
+# esqueleto de um objeto remoto, montado uma vez no bind: tabela dos métodos exportados,
+# cada um com o método já ligado e o plano de conversão dos argumentos e do resultado
+class Skeleton:
+    def __init__(self, obj: Any, metodos: Optional[Iterable[str]] = None):
+        self.obj = obj
+        if metodos is None:
+            # por padrão, os métodos públicos definidos na classe do objeto
+            metodos = [n for n, _ in inspect.getmembers(type(obj), inspect.isfunction) if not n.startswith("_")]
+        self.tabela: Dict[str, Callable[[Any], Any]] = {}
+        for nome in metodos:
+            metodo = getattr(obj, nome)
+            if not callable(metodo):
+                raise ValueError(f"'{nome}' não é um método de {type(obj).__name__}")
+            try:
+                dicas = typing.get_type_hints(metodo)
+            except Exception:
+                dicas = {}
+            parametros = [p for p in inspect.signature(metodo).parameters.values()
+                          if p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD, p.KEYWORD_ONLY)]
+            posicionais = [_conversor(dicas.get(p.name, Any)) for p in parametros if p.kind != p.KEYWORD_ONLY]
+            nomeados = {p.name: _conversor(dicas.get(p.name, Any)) for p in parametros}
+            self.tabela[nome] = _compilar(metodo, posicionais, nomeados, _saida(dicas.get("return", Any)))
+
+    def invocar(self, method_id: str, args_external: Any) -> Any:
+        chamar = self.tabela.get(method_id)
+        if chamar is None:
+            raise AttributeError(f"Método '{method_id}' não exportado por {type(self.obj).__name__}")
+        return chamar(args_external)
 
 # localiza objeto e invoca método, retornando representação externa
 class Dispatcher:
     def __init__(self, repository):
         self.repo = repository
 
-    def dispatch(self, object_name: str, method_id: str, args_external: Any) -> Any:
-        obj = self.repo.resolve(object_name)
-        if isinstance(args_external, dict) and "args" in args_external:
-            args = [unmarshal(a) for a in args_external["args"]]
-            kwargs = {k: unmarshal(v) for k, v in args_external.get("kwargs", {}).items()}
-        else:
-            args, kwargs = [], {}
-        method = getattr(obj, method_id)
-        result = method(*args, **kwargs)
-        return marshal(result)
+    def dispatch(self, object_name: str, method_id: str, args_external: Any, message_type: int = REQUEST) -> Any:
+        if message_type == BATCH:
+            return [self._dispatch_item(inv) for inv in args_external]
+        skeleton = self.repo.skeletons.get(object_name)
+        if skeleton is None:
+            raise KeyError(f"Objeto remoto '{object_name}' não encontrado")
+        return skeleton.invocar(method_id, args_external)
+
+    # cada invocação do lote tem resultado ou exceção próprios; uma falha não interrompe as demais
+    def _dispatch_item(self, inv: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            r = self.dispatch(inv["objectReference"], inv["methodId"], inv["arguments"])
+            return {"isException": False, "arguments": r}
+        except Exception as e:
+            return {"isException": True, "arguments": str(e)}
@@ -1,49 +1,413 @@
 from __future__ import annotations
-from .protocol import unpack_args, pack_args, RemoteObjectRef, make_request
+from .protocol import (BATCH, REQUEST, unpack_args, pack_args, RemoteObjectRef, make_request,
+                       make_batch_request, batch_arguments, proximo_request_id)
 from .marshalling import unmarshal
-from typing import Any, Dict
-from xmlrpc.server import SimpleXMLRPCServer
+from .binario import codificar_requisicao, codificar_resposta, decodificar, ler_quadro, ler_request_id
+from .servidores import ServidorAsyncio, ServidorBinario, ServidorPool, ServidorSimples
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor, TimeoutError
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 from xmlrpc.client import ServerProxy
+import select
+import socket
+import threading
+import time
+
+def _conectar_xmlrpc(host: str, port: int) -> ServerProxy:
+    return ServerProxy(f"http://{host}:{port}", allow_none=True)
+
+def _conectar_tcp(host: str, port: int) -> socket.socket:
+    sock = socket.create_connection((host, port))
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return sock
+
+# pool de conexões persistentes por (host, porta); cada conexão (um ServerProxy com
+# HTTP keep-alive, ou um socket do protocolo binário) é usada por uma chamada de cada vez
+class PoolConexoes:
+    def __init__(self, tamanho_max: int = 8, ocioso_max: float = 30.0,
+                 fabrica: Callable[[str, int], Any] = _conectar_xmlrpc):
+        self.tamanho_max = tamanho_max
+        self.ocioso_max = ocioso_max
+        self.fabrica = fabrica
+        self._livres: Dict[Tuple[str, int], List[Tuple[Any, float]]] = {}
+        self._vagas: Dict[Tuple[str, int], threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    # empresta uma conexão; no máximo `tamanho_max` ficam em uso por destino
+    @contextmanager
+    def conexao(self, host: str, port: int) -> Iterator[Any]:
+        chave = (host, port)
+        with self._lock:
+            vagas = self._vagas.setdefault(chave, threading.BoundedSemaphore(self.tamanho_max))
+        vagas.acquire()
+        try:
+            proxy = self._obter(chave)
+            try:
+                yield proxy
+            except Exception:
+                # conexão em estado desconhecido: descarta em vez de devolver ao pool
+                self._fechar(proxy)
+                raise
+            with self._lock:
+                self._livres.setdefault(chave, []).append((proxy, time.monotonic()))
+        finally:
+            vagas.release()
+
+    def _obter(self, chave: Tuple[str, int]) -> Any:
+        agora = time.monotonic()
+        expiradas = []
+        proxy = None
+        with self._lock:
+            livres = self._livres.get(chave, [])
+            while livres:
+                candidato, desde = livres.pop()
+                if agora - desde <= self.ocioso_max:
+                    proxy = candidato
+                    break
+                expiradas.append(candidato)
+        for velha in expiradas:
+            self._fechar(velha)
+        if proxy is None:
+            proxy = self.fabrica(*chave)
+        return proxy
+
+    @staticmethod
+    def _fechar(conexao: Any) -> None:
+        try:
+            if isinstance(conexao, ServerProxy):
+                conexao("close")()
+            else:
+                conexao.close()
+        except Exception:
+            pass
+
+    # fecha todas as conexões ociosas
+    def fechar(self) -> None:
+        with self._lock:
+            livres = [p for lista in self._livres.values() for p, _ in lista]
+            self._livres.clear()
+        for proxy in livres:
+            self._fechar(proxy)
+
+# última versão do catálogo informada por cada servidor nas respostas (catalogVersion);
+# respostas fora de ordem não fazem a versão conhecida voltar atrás
+class VersoesCatalogo:
+    def __init__(self):
+        self._versoes: Dict[Tuple[str, int], int] = {}
+        self._lock = threading.Lock()
+
+    def anotar(self, host: str, port: int, versao: Any) -> None:
+        if versao is None:
+            return
+        versao = int(versao)
+        with self._lock:
+            if versao > self._versoes.get((host, port), 0):
+                self._versoes[(host, port)] = versao
+
+    def get(self, host: str, port: int) -> Optional[int]:
+        return self._versoes.get((host, port))
 
 # cliente RMI
 class Requestor:
+    def __init__(self, pool: PoolConexoes = None, tamanho_pool: int = 8, ocioso_max: float = 30.0):
+        self.pool = pool if pool is not None else PoolConexoes(tamanho_pool, ocioso_max)
+        self.versoes = VersoesCatalogo()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock_executor = threading.Lock()
+
+    # versão do catálogo do servidor de `o` segundo a última resposta (None se desconhecida)
+    def versao(self, o: RemoteObjectRef) -> Optional[int]:
+        return self.versoes.get(o.host, o.port)
+
+    # versão assíncrona de doOperation: cada chamada ocupa uma conexão do pool
+    # numa thread de fundo (o RequestorMultiplexado faz isso sem threads extras)
+    def doOperationAsync(self, o: RemoteObjectRef, methodId: str, arguments: Any) -> Future:
+        with self._lock_executor:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.pool.tamanho_max, thread_name_prefix="requestor")
+        return self._executor.submit(self.doOperation, o, methodId, arguments)
+
     def doOperation(self, o: RemoteObjectRef, methodId: str, arguments: Any) -> Any:
         req = make_request(o, methodId, arguments)
-        proxy = ServerProxy(f"http://{o.host}:{o.port}", allow_none=True)
-        reply_dict = proxy.invoke(req)
+        with self.pool.conexao(o.host, o.port) as proxy:
+            reply_dict = proxy.invoke(req)
+        self.versoes.anotar(o.host, o.port, reply_dict.get("catalogVersion"))
         if reply_dict.get("isException"):
             raise RuntimeError(unmarshal(unpack_args(reply_dict["arguments"])))
         result_external = unpack_args(reply_dict["arguments"])
         return unmarshal(result_external)
 
-# servidor RMI
+    # envia várias invocações (objeto, método, argumentos) ao servidor de `o` numa só
+    # requisição; retorna, na mesma ordem, o resultado ou a exceção de cada uma
+    def doBatch(self, o: RemoteObjectRef, invocacoes: List[Tuple[str, str, Any]]) -> List[Any]:
+        req = make_batch_request(invocacoes)
+        with self.pool.conexao(o.host, o.port) as proxy:
+            reply_dict = proxy.invoke(req)
+        self.versoes.anotar(o.host, o.port, reply_dict.get("catalogVersion"))
+        if reply_dict.get("isException"):
+            raise RuntimeError(unmarshal(unpack_args(reply_dict["arguments"])))
+        return _resultados_lote(unpack_args(reply_dict["arguments"]))
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+        self.pool.fechar()
+
+def _resultados_lote(itens: List[Dict[str, Any]]) -> List[Any]:
+    return [RuntimeError(unmarshal(i["arguments"])) if i["isException"] else unmarshal(i["arguments"])
+            for i in itens]
+
+# cliente RMI do protocolo binário (rmi/binario.py): mesma interface do Requestor,
+# com sockets TCP persistentes em vez de XML-RPC
+class RequestorBinario(Requestor):
+    def __init__(self, pool: PoolConexoes = None, tamanho_pool: int = 8, ocioso_max: float = 30.0):
+        super().__init__(pool if pool is not None else PoolConexoes(tamanho_pool, ocioso_max, _conectar_tcp))
+
+    def doOperation(self, o: RemoteObjectRef, methodId: str, arguments: Any) -> Any:
+        req_id = proximo_request_id()
+        quadro = codificar_requisicao(req_id, o.object_name, methodId, arguments)
+        return unmarshal(self._enviar(o, req_id, quadro))
+
+    def doBatch(self, o: RemoteObjectRef, invocacoes: List[Tuple[str, str, Any]]) -> List[Any]:
+        req_id = proximo_request_id()
+        quadro = codificar_requisicao(req_id, "", "", batch_arguments(invocacoes), BATCH)
+        return _resultados_lote(self._enviar(o, req_id, quadro))
+
+    # envia o quadro e retorna o resultado (representação externa) da resposta.
+    # Só tenta de novo se a falha ocorreu antes do quadro ser enviado por inteiro: depois
+    # disso o servidor pode já ter executado a chamada (ex.: vender) e o erro vai ao chamador
+    def _enviar(self, o: RemoteObjectRef, req_id: int, quadro: bytes) -> Any:
+        for tentativa in (0, 1):
+            enviado = False
+            try:
+                with self.pool.conexao(o.host, o.port) as sock:
+                    # conexão ociosa com algo para ler: o servidor a encerrou (EOF)
+                    if select.select([sock], [], [], 0)[0]:
+                        raise ConnectionResetError("Conexão do pool encerrada pelo servidor.")
+                    sock.sendall(quadro)
+                    enviado = True
+                    corpo = ler_quadro(sock)
+                    if corpo is None:
+                        raise ConnectionResetError("Conexão encerrada pelo servidor.")
+                break
+            except (ConnectionResetError, BrokenPipeError):
+                if tentativa or enviado:
+                    raise
+        reply = decodificar(corpo)
+        if reply["requestId"] != req_id:
+            raise ValueError("Resposta não corresponde à requisição.")
+        self.versoes.anotar(o.host, o.port, reply["catalogVersion"])
+        if reply["isException"]:
+            raise RuntimeError(unmarshal(reply["arguments"]))
+        return reply["arguments"]
+
+# a chamada pode ter sido cancelada por quem a fez; nesse caso o resultado é descartado
+def _resolver(futuro: Future, resultado: Any, erro: Optional[BaseException]) -> None:
+    try:
+        if erro is not None:
+            futuro.set_exception(erro)
+        else:
+            futuro.set_result(resultado)
+    except InvalidStateError:
+        pass
+
+# conexão do protocolo binário com várias chamadas em andamento: os quadros são enviados
+# sem esperar as respostas, e uma thread leitora entrega cada resposta ao Future de mesmo requestId
+class _ConexaoMultiplexada:
+    def __init__(self, host: str, port: int, versoes: VersoesCatalogo):
+        self.host, self.port = host, port
+        self.versoes = versoes
+        self.sock = _conectar_tcp(host, port)
+        self.aberta = True
+        self._pendentes: Dict[int, Future] = {}
+        self._lock = threading.Lock()
+        # envio em trava separada: a leitora nunca espera um sendall longo
+        self._lock_envio = threading.Lock()
+        threading.Thread(target=self._ler, daemon=True).start()
+
+    def enviar(self, req_id: int, quadro: bytes) -> Future:
+        futuro: Future = Future()
+        with self._lock:
+            if not self.aberta:
+                raise ConnectionResetError("Conexão encerrada.")
+            self._pendentes[req_id] = futuro
+        try:
+            with self._lock_envio:
+                self.sock.sendall(quadro)
+        except OSError:
+            with self._lock:
+                self._pendentes.pop(req_id, None)
+            raise
+        return futuro
+
+    def _ler(self) -> None:
+        erro: BaseException = ConnectionResetError("Conexão encerrada com chamadas pendentes.")
+        try:
+            while True:
+                corpo = ler_quadro(self.sock)
+                if corpo is None:
+                    break
+                self._entregar(corpo)
+        except Exception as e:
+            # quadro ilegível ou falha de rede: nenhuma resposta seguinte é confiável
+            erro = ConnectionResetError(f"Conexão encerrada com chamadas pendentes: {e!r}")
+        # fechada, a conexão é substituída na próxima chamada (RequestorMultiplexado._conexao)
+        with self._lock:
+            self.aberta = False
+            pendentes = list(self._pendentes.values())
+            self._pendentes.clear()
+        self.close()
+        for futuro in pendentes:
+            _resolver(futuro, None, erro)
+
+    # a chamada foi abandonada por quem a fez; se a resposta chegar, é descartada
+    def descartar(self, req_id: int) -> None:
+        with self._lock:
+            self._pendentes.pop(req_id, None)
+
+    # uma resposta que não pode ser decodificada faz falhar só a chamada dela
+    def _entregar(self, corpo: bytes) -> None:
+        req_id = ler_request_id(corpo)
+        with self._lock:
+            futuro = self._pendentes.pop(req_id, None)
+        resultado, erro = None, None
+        try:
+            reply = decodificar(corpo)
+            self.versoes.anotar(self.host, self.port, reply["catalogVersion"])
+            if reply["isException"]:
+                erro = RuntimeError(unmarshal(reply["arguments"]))
+            else:
+                resultado = unmarshal(reply["arguments"])
+        except Exception as e:
+            erro = e
+        if futuro is not None:
+            _resolver(futuro, resultado, erro)
+
+    def close(self) -> None:
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+# cliente RMI do protocolo binário com uma única conexão por servidor, compartilhada
+# por todas as chamadas (de qualquer thread); doOperationAsync não bloqueia, e
+# doOperation/doBatch esperam a resposta por até `timeout` segundos (TimeoutError)
+class RequestorMultiplexado:
+    def __init__(self, timeout: Optional[float] = 30.0):
+        self.timeout = timeout
+        self._conexoes: Dict[Tuple[str, int], _ConexaoMultiplexada] = {}
+        self._lock = threading.Lock()
+        self.versoes = VersoesCatalogo()
+
+    def versao(self, o: RemoteObjectRef) -> Optional[int]:
+        return self.versoes.get(o.host, o.port)
+
+    def _conexao(self, host: str, port: int) -> _ConexaoMultiplexada:
+        with self._lock:
+            conexao = self._conexoes.get((host, port))
+            if conexao is None or not conexao.aberta:
+                conexao = self._conexoes[(host, port)] = _ConexaoMultiplexada(host, port, self.versoes)
+            return conexao
+
+    def doOperationAsync(self, o: RemoteObjectRef, methodId: str, arguments: Any) -> Future:
+        req_id = proximo_request_id()
+        quadro = codificar_requisicao(req_id, o.object_name, methodId, arguments)
+        return self._conexao(o.host, o.port).enviar(req_id, quadro)
+
+    def doOperation(self, o: RemoteObjectRef, methodId: str, arguments: Any) -> Any:
+        req_id = proximo_request_id()
+        quadro = codificar_requisicao(req_id, o.object_name, methodId, arguments)
+        return self._aguardar(o, req_id, quadro)
+
+    def doBatch(self, o: RemoteObjectRef, invocacoes: List[Tuple[str, str, Any]]) -> List[Any]:
+        req_id = proximo_request_id()
+        quadro = codificar_requisicao(req_id, "", "", batch_arguments(invocacoes), BATCH)
+        return _resultados_lote(self._aguardar(o, req_id, quadro))
+
+    # uma resposta perdida não prende o chamador: esgotado o timeout, a chamada é abandonada
+    def _aguardar(self, o: RemoteObjectRef, req_id: int, quadro: bytes) -> Any:
+        conexao = self._conexao(o.host, o.port)
+        futuro = conexao.enviar(req_id, quadro)
+        try:
+            return futuro.result(self.timeout)
+        except TimeoutError:
+            conexao.descartar(req_id)
+            raise
+
+    def close(self) -> None:
+        with self._lock:
+            conexoes = list(self._conexoes.values())
+            self._conexoes.clear()
+        for conexao in conexoes:
+            conexao.close()
+
+MODOS_SERVIDOR = ("simples", "threads", "asyncio")
+PROTOCOLOS = ("xmlrpc", "binario")
+
+# servidor RMI; modos:
+#   simples - uma requisição por vez (SimpleXMLRPCServer)
+#   threads - pool fixo de `workers` threads com fila limitada de conexões
+#   asyncio - laço de eventos para as conexões + `workers` threads para as chamadas
+# protocolos: xmlrpc (compatível com o Requestor) ou binario (RequestorBinario e
+# RequestorMultiplexado; modos simples/threads)
+# `versao`, se informada, dá a versão do catálogo enviada em toda resposta (catalogVersion)
 class ServerRequestHandler:
-    def __init__(self, host: str, port: int, dispatcher):
-        self._server = SimpleXMLRPCServer((host, port), allow_none=True, logRequests=False)
+    def __init__(self, host: str, port: int, dispatcher, modo: str = "threads",
+                 workers: int = 16, fila: int = 64, protocolo: str = "xmlrpc",
+                 versao: Optional[Callable[[], int]] = None):
         self.dispatcher = dispatcher
+        self.versao = versao
+        if protocolo == "binario":
+            if modo == "asyncio":
+                raise ValueError("O protocolo binário não tem modo asyncio.")
+            self._server = ServidorBinario((host, port), self._tratar_quadro,
+                                           1 if modo == "simples" else workers, fila)
+            return
+        if protocolo != "xmlrpc":
+            raise ValueError(f"Protocolo desconhecido: {protocolo}")
+        if modo == "simples":
+            self._server = ServidorSimples((host, port), allow_none=True, logRequests=False)
+        elif modo == "threads":
+            self._server = ServidorPool((host, port), workers, fila, allow_none=True, logRequests=False)
+        elif modo == "asyncio":
+            self._server = ServidorAsyncio(host, port, workers, fila)
+        else:
+            raise ValueError(f"Modo de servidor desconhecido: {modo}")
         self._server.register_function(self.getRequest, "invoke")
 
-    def getRequest(self, request_dict: Dict[str, Any]) -> Dict[str, Any]:
-        req_id = int(request_dict["requestId"])
+    # executa a invocação; retorna (isException, resultado em representação externa)
+    def _invocar(self, object_name: str, method_id: str, args_external: Any,
+                 message_type: int = REQUEST) -> Tuple[bool, Any]:
         try:
-            r = self.dispatcher.dispatch(
-                object_name=request_dict["objectReference"],
-                method_id=request_dict["methodId"],
-                args_external=unpack_args(request_dict["arguments"]),
+            return False, self.dispatcher.dispatch(
+                object_name=object_name, method_id=method_id, args_external=args_external,
+                message_type=message_type,
             )
-            return {
-                "messageType": 1,
-                "requestId": req_id,
-                "isException": False,
-                "arguments": pack_args(r),
-            }
         except Exception as e:
-            return {
-                "messageType": 1,
-                "requestId": req_id,
-                "isException": True,
-                "arguments": pack_args(str(e)),
-            }
+            return True, str(e)
+
+    def getRequest(self, request_dict: Dict[str, Any]) -> Dict[str, Any]:
+        req_id = int(request_dict["requestId"])
+        is_exception, r = self._invocar(
+            request_dict["objectReference"], request_dict["methodId"], unpack_args(request_dict["arguments"]),
+            int(request_dict.get("messageType", REQUEST)),
+        )
+        return {
+            "messageType": 1,
+            "requestId": req_id,
+            "isException": is_exception,
+            "arguments": pack_args(r),
+            # texto: inteiros do XML-RPC têm só 32 bits
+            "catalogVersion": None if self.versao is None else str(self.versao()),
+        }
+
+    def _tratar_quadro(self, corpo: bytes) -> bytes:
+        req = decodificar(corpo)
+        is_exception, r = self._invocar(req["objectReference"], req["methodId"], req["arguments"],
+                                        req["messageType"])
+        return codificar_resposta(req["requestId"], r, is_exception,
+                                  None if self.versao is None else self.versao())
 
     def sendReply(self, *args, **kwargs):
         pass
@@ -0,0 +1,232 @@
+import bisect
+import itertools
+import unicodedata
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+N_GRAMA = 3
+# pares (preço, ID) por bloco do índice de preços
+TAMANHO_BLOCO = 1024
+
+# normaliza texto para busca: sem acentos e sem diferença de caixa ("Anéis" -> "aneis")
+def normalizar(texto: str) -> str:
+    if texto.isascii():
+        return texto.casefold()
+    decomposto = unicodedata.normalize("NFKD", texto)
+    return "".join(c for c in decomposto if not unicodedata.combining(c)).casefold()
+
+# conjunto de trigramas de um texto já normalizado
+def trigramas(texto: str) -> Set[str]:
+    return {texto[i:i + N_GRAMA] for i in range(len(texto) - N_GRAMA + 1)}
+
+# índice invertido de trigramas sobre título e autor dos produtos
+class IndiceTexto:
+    def __init__(self) -> None:
+        self._postings: Dict[str, Set[str]] = {}
+        self._textos: Dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._textos)
+
+    # indexa (ou reindexa) um documento
+    def adicionar(self, doc_id: str, campos: Iterable[Optional[str]]) -> None:
+        # "\n" separa os campos para que nenhum termo case atravessando título e autor
+        texto = "\n".join(normalizar(str(c)) for c in campos if c is not None)
+        if self._textos.get(doc_id) == texto:
+            return
+        self.remover(doc_id)
+        self._textos[doc_id] = texto
+        for tri in trigramas(texto):
+            self._postings.setdefault(tri, set()).add(doc_id)
+
+    # remove um documento do índice (sem erro se não existir)
+    def remover(self, doc_id: str) -> None:
+        texto = self._textos.pop(doc_id, None)
+        if texto is None:
+            return
+        for tri in trigramas(texto):
+            docs = self._postings.get(tri)
+            if docs is not None:
+                docs.discard(doc_id)
+                if not docs:
+                    del self._postings[tri]
+
+    # retorna os IDs cujo texto contém o termo como substring
+    def buscar(self, termo: str) -> Set[str]:
+        termo = normalizar(termo)
+        if len(termo) < N_GRAMA:
+            # termos curtos não têm trigramas: varre os textos já normalizados
+            return {doc_id for doc_id, texto in self._textos.items() if termo in texto}
+
+        listas: List[Set[str]] = []
+        for tri in trigramas(termo):
+            docs = self._postings.get(tri)
+            if not docs:
+                return set()
+            listas.append(docs)
+        listas.sort(key=len)
+
+        candidatos = set(listas[0])
+        for docs in listas[1:]:
+            candidatos &= docs
+            if not candidatos:
+                return candidatos
+        # trigramas em comum não garantem a substring: confirma no texto
+        return {doc_id for doc_id in candidatos if termo in self._textos[doc_id]}
+
+# preços ordenados com os IDs na mesma posição, divididos em blocos de até
+# 2 * TAMANHO_BLOCO: inserir ou remover move só um bloco, não a lista inteira
+class PrecosOrdenados:
+    def __init__(self) -> None:
+        self._precos: List[List[float]] = []
+        self._ids: List[List[str]] = []
+        # maior preço de cada bloco, para escolher o bloco com bisect
+        self._maximos: List[float] = []
+
+    def inserir(self, preco: float, doc_id: str) -> None:
+        if not self._precos:
+            self._precos.append([])
+            self._ids.append([])
+            self._maximos.append(preco)
+        b = min(bisect.bisect_right(self._maximos, preco), len(self._precos) - 1)
+        precos, ids = self._precos[b], self._ids[b]
+        i = bisect.bisect_right(precos, preco)
+        precos.insert(i, preco)
+        ids.insert(i, doc_id)
+        self._maximos[b] = precos[-1]
+        if len(precos) > 2 * TAMANHO_BLOCO:
+            self._precos[b + 1:b + 1] = [precos[TAMANHO_BLOCO:]]
+            self._ids[b + 1:b + 1] = [ids[TAMANHO_BLOCO:]]
+            self._maximos.insert(b + 1, precos[-1])
+            del precos[TAMANHO_BLOCO:], ids[TAMANHO_BLOCO:]
+            self._maximos[b] = precos[-1]
+
+    # a busca pelo ID fica limitada aos itens de mesmo preço (bisect_left..bisect_right),
+    # que podem continuar no bloco seguinte; False se o par não está no índice
+    def remover(self, preco: float, doc_id: str) -> bool:
+        b = bisect.bisect_left(self._maximos, preco)
+        while b < len(self._precos):
+            precos, ids = self._precos[b], self._ids[b]
+            fim = bisect.bisect_right(precos, preco)
+            for i in range(bisect.bisect_left(precos, preco), fim):
+                if ids[i] == doc_id:
+                    del precos[i], ids[i]
+                    if precos:
+                        self._maximos[b] = precos[-1]
+                    else:
+                        del self._precos[b], self._ids[b], self._maximos[b]
+                    return True
+            if fim < len(precos):
+                break
+            b += 1
+        return False
+
+    # reconstrói os blocos a partir de pares em qualquer ordem (carga em lote)
+    def carregar(self, pares: Iterable[Tuple[float, str]]) -> None:
+        pares = sorted(pares)
+        self._precos = [[preco for preco, _ in pares[i:i + TAMANHO_BLOCO]]
+                        for i in range(0, len(pares), TAMANHO_BLOCO)]
+        self._ids = [[doc_id for _, doc_id in pares[i:i + TAMANHO_BLOCO]]
+                     for i in range(0, len(pares), TAMANHO_BLOCO)]
+        self._maximos = [precos[-1] for precos in self._precos]
+
+    def pares(self) -> Iterator[Tuple[float, str]]:
+        for precos, ids in zip(self._precos, self._ids):
+            yield from zip(precos, ids)
+
+    # trechos [ini, fim) de cada bloco com preço em [preco_min, preco_max]
+    def _faixa(self, preco_min: Optional[float], preco_max: Optional[float]) -> Iterator[Tuple[int, int, int]]:
+        b = 0 if preco_min is None else bisect.bisect_left(self._maximos, preco_min)
+        while b < len(self._precos):
+            precos = self._precos[b]
+            ini = 0 if preco_min is None else bisect.bisect_left(precos, preco_min)
+            fim = len(precos) if preco_max is None else bisect.bisect_right(precos, preco_max)
+            yield b, ini, fim
+            if fim < len(precos):
+                return
+            b += 1
+
+    # quantos IDs estão na faixa, sem montá-los (custo proporcional aos blocos da faixa)
+    def contar(self, preco_min: Optional[float] = None, preco_max: Optional[float] = None) -> int:
+        return sum(max(fim - ini, 0) for _, ini, fim in self._faixa(preco_min, preco_max))
+
+    def faixa(self, preco_min: Optional[float] = None, preco_max: Optional[float] = None) -> Set[str]:
+        ids: Set[str] = set()
+        for b, ini, fim in self._faixa(preco_min, preco_max):
+            ids.update(self._ids[b][ini:fim])
+        return ids
+
+# índices secundários por tipo, disponibilidade, estado e faixa de preço
+class IndiceAtributos:
+    def __init__(self) -> None:
+        self._por_tipo: Dict[str, Set[str]] = {}
+        self._por_disponivel: Dict[bool, Set[str]] = {True: set(), False: set()}
+        self._por_estado: Dict[str, Set[str]] = {}
+        self._precos = PrecosOrdenados()
+        # preços da carga em lote, ainda fora do índice (ver ordenar)
+        self._lote: List[Tuple[float, str]] = []
+        self._chaves: Dict[str, Tuple[str, bool, str, float]] = {}
+
+    # indexa (ou reindexa) um documento; um preço NaN não entra no índice de preços
+    # (nenhuma faixa o contém)
+    # com ordenado=False o preço só é anexado (carga em lote); chame ordenar() ao final
+    def adicionar(self, doc_id: str, tipo: str, disponivel: bool, estado: str, preco: float,
+                  ordenado: bool = True) -> None:
+        chave = (tipo.lower(), bool(disponivel), estado, float(preco))
+        if self._chaves.get(doc_id) == chave:
+            return
+        self.remover(doc_id)
+        self._chaves[doc_id] = chave
+        tipo, disponivel, estado, preco = chave
+        self._por_tipo.setdefault(tipo, set()).add(doc_id)
+        self._por_disponivel[disponivel].add(doc_id)
+        self._por_estado.setdefault(estado, set()).add(doc_id)
+        if preco != preco:
+            return
+        if not ordenado:
+            self._lote.append((preco, doc_id))
+            return
+        self._precos.inserir(preco, doc_id)
+
+    # reordena o índice de preços depois de uma carga em lote
+    def ordenar(self) -> None:
+        if self._lote:
+            self._precos.carregar(itertools.chain(self._precos.pares(), self._lote))
+            self._lote = []
+
+    # remove um documento do índice (sem erro se não existir)
+    def remover(self, doc_id: str) -> None:
+        chave = self._chaves.pop(doc_id, None)
+        if chave is None:
+            return
+        tipo, disponivel, estado, preco = chave
+        self._por_tipo[tipo].discard(doc_id)
+        self._por_disponivel[disponivel].discard(doc_id)
+        self._por_estado[estado].discard(doc_id)
+        if preco == preco and not self._precos.remover(preco, doc_id):
+            # ainda na carga em lote
+            self._lote.remove((preco, doc_id))
+
+    def por_tipo(self, tipo: str) -> Set[str]:
+        return self._por_tipo.get(tipo.lower(), set())
+
+    def por_disponivel(self, disponivel: bool) -> Set[str]:
+        return self._por_disponivel[bool(disponivel)]
+
+    def por_estado(self, estado: str) -> Set[str]:
+        return self._por_estado.get(estado, set())
+
+    # IDs com preço em [preco_min, preco_max]; limites ausentes ficam abertos
+    def por_preco(self, preco_min: Optional[float] = None, preco_max: Optional[float] = None) -> Set[str]:
+        return self._precos.faixa(preco_min, preco_max)
+
+    # quantos IDs por_preco retornaria, sem montar o conjunto
+    def contar_preco(self, preco_min: Optional[float] = None, preco_max: Optional[float] = None) -> int:
+        return self._precos.contar(preco_min, preco_max)
+
+    # os IDs de `ids` com preço em [preco_min, preco_max], conferindo o preço de cada um:
+    # para poucos candidatos, mais barato que montar a faixa inteira
+    def filtrar_preco(self, ids: Iterable[str], preco_min: Optional[float] = None,
+                      preco_max: Optional[float] = None) -> Set[str]:
+        baixo = float("-inf") if preco_min is None else preco_min
+        alto = float("inf") if preco_max is None else preco_max
+        return {doc_id for doc_id in ids if baixo <= self._chaves[doc_id][3] <= alto}
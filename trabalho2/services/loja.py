@@ -1,15 +1,218 @@
+import bisect
+import itertools
+import threading
+import time
+from contextlib import ExitStack, contextmanager
 from dataclasses import dataclass, field
-from typing import List, Dict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 from models.base import Produto
+from services.indice import IndiceAtributos, IndiceTexto
+from services.persistencia import Persistencia
+from services.replicacao import LogReplicacao
 
+N_TRAVAS = 64
+
+# outra operação alterou o produto entre a leitura e a confirmação
+class ConflitoError(Exception):
+    pass
+
+# Concorrência: cada produto é protegido por uma trava de uma faixa (lock striping),
+# que serializa só operações sobre produtos da mesma faixa; os índices compartilhados
+# têm uma trava própria, mantida apenas durante a atualização/consulta deles.
+# Ordem de aquisição: faixas (em ordem crescente) e depois a trava dos índices.
 @dataclass
 class Loja:
     nome: str
     estoque: Dict[str, Produto] = field(default_factory=dict)
+    persistencia: Optional[Persistencia] = field(default=None, repr=False, compare=False)
+    # no primário de um grupo de réplicas, recebe cada operação aplicada
+    replicacao: Optional[LogReplicacao] = field(default=None, repr=False, compare=False)
+    _indice_texto: IndiceTexto = field(default_factory=IndiceTexto, init=False, repr=False)
+    _indice_atributos: IndiceAtributos = field(default_factory=IndiceAtributos, init=False, repr=False)
+    _ordem: Dict[str, int] = field(default_factory=dict, init=False, repr=False)
+    _ids_ordenados: List[str] = field(default_factory=list, init=False, repr=False)
+    _seq: Iterator[int] = field(default_factory=itertools.count, init=False, repr=False)
+    _recuperando: bool = field(default=False, init=False, repr=False, compare=False)
+    _travas: List[threading.Lock] = field(
+        default_factory=lambda: [threading.Lock() for _ in range(N_TRAVAS)],
+        init=False, repr=False, compare=False,
+    )
+    _lock_indices: threading.RLock = field(default_factory=threading.RLock, init=False, repr=False, compare=False)
+    # versão do catálogo: avança a cada alteração; começa no relógio para continuar
+    # crescendo depois de um reinício do servidor (clientes a usam para invalidar caches)
+    versao: int = field(default_factory=time.time_ns, init=False, repr=False, compare=False)
+    _lock_versao: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        for produto in self.estoque.values():
+            self._indexar(produto)
+
+    # mantém os índices em dia com o produto
+    # (com ordenado=False, usado na carga em lote, as listas ordenadas só recebem o item no fim)
+    def _indexar(self, produto: Produto, ordenado: bool = True) -> None:
+        if produto.id not in self._ordem:
+            self._ordem[produto.id] = next(self._seq)
+            if ordenado:
+                bisect.insort(self._ids_ordenados, produto.id)
+            else:
+                self._ids_ordenados.append(produto.id)
+        self._indice_texto.adicionar(produto.id, (produto.titulo, getattr(produto, "autor", None)))
+        self._indice_atributos.adicionar(
+            produto.id, produto.__class__.__name__, produto.disponivel, produto.estado, produto.preco,
+            ordenado=ordenado,
+        )
+
+    # trava os produtos informados; as faixas são sempre adquiridas na mesma ordem,
+    # então duas operações sobre o mesmo par de produtos não entram em deadlock
+    @contextmanager
+    def travar(self, *produto_ids: str) -> Iterator[None]:
+        faixas = sorted({hash(pid) % N_TRAVAS for pid in produto_ids})
+        with ExitStack() as pilha:
+            for faixa in faixas:
+                pilha.enter_context(self._travas[faixa])
+            yield
+
+    # remove o produto dos índices (chamado com a trava dos índices)
+    def _desindexar(self, produto_id: str) -> None:
+        self._indice_texto.remover(produto_id)
+        self._indice_atributos.remover(produto_id)
+        del self._ordem[produto_id]
+        del self._ids_ordenados[bisect.bisect_left(self._ids_ordenados, produto_id)]
+
+    # registra a operação já aplicada: avança a versão do catálogo e a acrescenta ao log
+    # da persistência (se houver), retornando a posição dela no log. Operações refeitas
+    # (recuperação, réplica) não são registradas: o log já as tem, ou a versão delas vem do primário.
+    # A operação vai ao log depois de aplicada na memória (não é write-ahead): outra leitura
+    # pode vê-la antes do fsync, mas quem a pediu só recebe a resposta depois dele (_confirmar);
+    # uma queda nesse intervalo perde só operações que ainda não foram confirmadas
+    def _registrar(self, op: dict) -> Optional[int]:
+        if self._recuperando:
+            return None
+        with self._lock_versao:
+            self.versao += 1
+            # dentro da trava: o log de replicação fica na ordem das versões
+            if self.replicacao is not None:
+                self.replicacao.anexar(self.versao, op)
+        if self.persistencia is None:
+            return None
+        posicao = self.persistencia.registrar(op)
+        self.persistencia.compactar_se_preciso(self._copiar_estoque)
+        return posicao
+
+    # espera o fsync que cobre a operação registrada (commit em grupo da persistência);
+    # chamado fora das travas, para o disco não segurar as outras operações da faixa
+    def _confirmar(self, posicao: Optional[int]) -> None:
+        if posicao is not None:
+            self.persistencia.aguardar(posicao)
+
+    # grava um snapshot do estoque e descarta o log acumulado
+    def compactar(self) -> None:
+        if self.persistencia is not None:
+            self.persistencia.snapshot(self._copiar_estoque)
+
+    # produtos para o snapshot: só a lista é copiada sob a trava dos índices; alterações
+    # concorrentes que a cópia pegar pela metade estão no log novo e são reaplicadas
+    def _copiar_estoque(self) -> Iterator[Dict[str, Any]]:
+        with self._lock_indices:
+            produtos = list(self.estoque.values())
+        return (p.to_dict() for p in produtos)
+
+    # reconstrói o estoque a partir do snapshot e da cauda do log; retorna quantas operações leu
+    def recuperar(self) -> int:
+        if self.persistencia is None:
+            return 0
+        n = 0
+        self._recuperando = True
+        try:
+            # o snapshot só tem inclusões de IDs distintos: carrega sem manter as listas
+            # ordenadas a cada item e ordena uma única vez no final
+            for op in self.persistencia.ler_snapshot():
+                produto = Produto.from_dict(op["produto"])
+                self.estoque[produto.id] = produto
+                self._indexar(produto, ordenado=False)
+                n += 1
+            self._ids_ordenados.sort()
+            self._indice_atributos.ordenar()
+            for op in self.persistencia.ler_log():
+                self._reaplicar(op)
+                n += 1
+        finally:
+            self._recuperando = False
+        return n
+
+    # aplica uma operação replicada do primário; a versão do catálogo passa a ser a do
+    # primário, então clientes podem comparar as versões de réplicas e primário
+    # (chamado só pela thread de replicação)
+    def aplicar(self, op: dict, versao: int) -> None:
+        self._recuperando = True
+        try:
+            self._reaplicar(op)
+        finally:
+            self._recuperando = False
+        with self._lock_versao:
+            self.versao = versao
+
+    # substitui o estoque pelo estado do primário (produtos em to_dict) na versão informada
+    def carregar(self, produtos: Iterable[Dict[str, Any]], versao: int) -> None:
+        novos = [Produto.from_dict(d) for d in produtos]
+        ids = {p.id for p in novos}
+        self._recuperando = True
+        try:
+            for produto_id in [i for i in self.estoque if i not in ids]:
+                self.remover(produto_id)
+            for produto in novos:
+                self.add_produto(produto)
+        finally:
+            self._recuperando = False
+        with self._lock_versao:
+            self.versao = versao
+
+    def _reaplicar(self, op: dict) -> None:
+        try:
+            if op["op"] in ("add", "substituir"):
+                self.add_produto(Produto.from_dict(op["produto"]))
+            elif op["op"] == "vender":
+                self.vender(op["id"])
+            elif op["op"] == "remover":
+                self.remover(op["id"])
+            elif op["op"] == "trocar":
+                a, b = (self.get(i) for i in op["ids"])
+                self.confirmar_troca(a, a.versao, b, b.versao)
+        except (KeyError, ValueError):
+            # operação já refletida no snapshot (ex.: log não truncado após a compactação)
+            pass
 
     # adiciona um produto ao estoque
     def add_produto(self, produto: Produto) -> None:
-        self.estoque[produto.id] = produto
+        with self.travar(produto.id):
+            with self._lock_indices:
+                self.estoque[produto.id] = produto
+                self._indexar(produto)
+            posicao = self._registrar({"op": "add", "produto": produto.to_dict()})
+        self._confirmar(posicao)
+
+    # substitui um produto existente, mantendo sua posição no estoque
+    def substituir(self, produto: Produto) -> None:
+        with self.travar(produto.id):
+            with self._lock_indices:
+                if produto.id not in self.estoque:
+                    raise KeyError("Produto não encontrado.")
+                self.estoque[produto.id] = produto
+                self._indexar(produto)
+            posicao = self._registrar({"op": "substituir", "produto": produto.to_dict()})
+        self._confirmar(posicao)
+
+    # remove um produto do estoque
+    def remover(self, produto_id: str) -> Produto:
+        with self.travar(produto_id):
+            with self._lock_indices:
+                if produto_id not in self.estoque:
+                    raise KeyError("Produto não encontrado.")
+                self._desindexar(produto_id)
+                produto = self.estoque.pop(produto_id)
+            posicao = self._registrar({"op": "remover", "id": produto_id})
+        self._confirmar(posicao)
+        return produto
 
     # obtém um produto pelo ID
     def get(self, produto_id: str) -> Produto:
@@ -17,16 +220,116 @@ class Loja:
             raise KeyError("Produto não encontrado.")
         return self.estoque[produto_id]
 
+    # vende um produto, atualizando o índice de disponibilidade; a trava do produto
+    # torna a verificação + marcação atômica (duas vendas simultâneas: só uma passa)
+    def vender(self, produto_id: str) -> Produto:
+        with self.travar(produto_id):
+            produto = self.get(produto_id)
+            produto.marcar_vendido()
+            with self._lock_indices:
+                self._indexar(produto)
+            posicao = self._registrar({"op": "vender", "id": produto_id})
+        self._confirmar(posicao)
+        return produto
+
+    # confirma uma troca validada fora de travas: só aplica se nenhum dos dois produtos
+    # mudou desde a leitura (mesmo objeto no estoque e mesma versão); caso contrário
+    # levanta ConflitoError. As travas ficam retidas apenas durante a comparação + escrita.
+    def confirmar_troca(self, a: Produto, versao_a: int, b: Produto, versao_b: int) -> None:
+        with self.travar(a.id, b.id):
+            for produto, versao in ((a, versao_a), (b, versao_b)):
+                if self.estoque.get(produto.id) is not produto or produto.versao != versao:
+                    raise ConflitoError(f"Produto {produto.id} foi alterado por outra operação; tente novamente.")
+            with self._lock_indices:
+                for produto in (a, b):
+                    produto.disponivel = False
+                    produto.versao += 1
+                    self._indexar(produto)
+            posicao = self._registrar({"op": "trocar", "ids": [a.id, b.id]})
+        self._confirmar(posicao)
+
     # lista todos os produtos
     def listar(self) -> List[Produto]:
         return list(self.estoque.values())
 
-    # busca produtos pelo termo
+    # busca produtos pelo termo (substring no título ou autor, sem diferenciar acentos)
     def buscar(self, termo: str) -> List[Produto]:
-        termo = termo.lower()
-        return [
-            p
-            for p in self.estoque.values()
-            if termo in p.titulo.lower()
-            or ("autor" in p.__dict__ and termo in str(p.__dict__["autor"]).lower())
-        ]
+        return self.consultar(termo=termo)
+
+    # consulta combinando filtros; só os filtros informados restringem o resultado
+    def consultar(
+        self,
+        termo: Optional[str] = None,
+        tipo: Optional[str] = None,
+        disponivel: Optional[bool] = None,
+        estado: Optional[str] = None,
+        preco_min: Optional[float] = None,
+        preco_max: Optional[float] = None,
+    ) -> List[Produto]:
+        with self._lock_indices:
+            ids = self._filtrar_ids(termo, tipo, disponivel, estado, preco_min, preco_max)
+            if ids is None:
+                return self.listar()
+            return [self.estoque[i] for i in sorted(ids, key=self._ordem.__getitem__)]
+
+    # página de até `limite` produtos em ordem de ID, a partir do ID seguinte a `apos`;
+    # retorna também o último ID da página quando ainda houver mais itens
+    def paginar(self, limite: int, apos: Optional[str] = None, **filtros) -> Tuple[List[Produto], Optional[str]]:
+        if limite <= 0:
+            raise ValueError("O limite da página deve ser positivo.")
+        with self._lock_indices:
+            ids = self._filtrar_ids(**filtros)
+            ordenados = self._ids_ordenados if ids is None else sorted(ids)
+            ini = 0 if apos is None else bisect.bisect_right(ordenados, apos)
+            pagina = ordenados[ini:ini + limite]
+            proximo = pagina[-1] if pagina and ini + limite < len(ordenados) else None
+            return [self.estoque[i] for i in pagina], proximo
+
+    # percorre o estoque inteiro em ordem de ID, em lotes, sem copiar o catálogo;
+    # produtos cadastrados ou removidos durante a iteração não a invalidam
+    def iterar(self, lote: int = 500) -> Iterator[Produto]:
+        apos = None
+        while True:
+            itens, apos = self.paginar(lote, apos)
+            yield from itens
+            if apos is None:
+                return
+
+    # IDs que atendem aos filtros; None quando nenhum filtro foi informado
+    def _filtrar_ids(
+        self,
+        termo: Optional[str] = None,
+        tipo: Optional[str] = None,
+        disponivel: Optional[bool] = None,
+        estado: Optional[str] = None,
+        preco_min: Optional[float] = None,
+        preco_max: Optional[float] = None,
+    ) -> Optional[Set[str]]:
+        conjuntos: List[Set[str]] = []
+        if termo is not None:
+            conjuntos.append(self._indice_texto.buscar(termo))
+        if tipo:
+            conjuntos.append(self._indice_atributos.por_tipo(tipo))
+        if disponivel is not None:
+            conjuntos.append(self._indice_atributos.por_disponivel(disponivel))
+        if estado:
+            conjuntos.append(self._indice_atributos.por_estado(estado))
+        por_preco = preco_min is not None or preco_max is not None
+        if not conjuntos and not por_preco:
+            return None
+
+        # intersecta a partir do menor conjunto; a faixa de preço só é montada se for menor
+        # que os outros conjuntos; senão, os candidatos do menor deles são conferidos pelo preço
+        conjuntos.sort(key=len)
+        if por_preco:
+            indice = self._indice_atributos
+            if not conjuntos or indice.contar_preco(preco_min, preco_max) < len(conjuntos[0]):
+                conjuntos.insert(0, indice.por_preco(preco_min, preco_max))
+            else:
+                conjuntos[0] = indice.filtrar_preco(conjuntos[0], preco_min, preco_max)
+        ids = set(conjuntos[0])
+        for outro in conjuntos[1:]:
+            ids &= outro
+            if not ids:
+                break
+        return ids
@@ -0,0 +1,221 @@
+import json
+import os
+import struct
+import threading
+import zlib
+from typing import Any, Callable, Dict, Generator, Iterable, Iterator, List, Optional
+
+# cada registro: tamanho (u32) + crc32 (u32) + operação em JSON
+_CABECALHO = struct.Struct(">II")
+MAGIC_WAL = b"SEBOWAL1"
+MAGIC_SNAPSHOT = b"SEBOSNP1"
+
+def _codificar(op: Dict[str, Any]) -> bytes:
+    corpo = json.dumps(op, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return _CABECALHO.pack(len(corpo), zlib.crc32(corpo)) + corpo
+
+# lê os registros de um arquivo; para no primeiro registro truncado ou corrompido
+# e devolve, ao final, o offset do fim do último registro válido
+def _ler_registros(caminho: str, magic: bytes) -> Generator[Dict[str, Any], None, int]:
+    with open(caminho, "rb", buffering=1 << 20) as f:
+        if f.read(len(magic)) != magic:
+            raise ValueError(f"Arquivo de persistência inválido: {caminho}")
+        pos = len(magic)
+        while True:
+            cabecalho = f.read(_CABECALHO.size)
+            if len(cabecalho) < _CABECALHO.size:
+                break
+            tamanho, crc = _CABECALHO.unpack(cabecalho)
+            corpo = f.read(tamanho)
+            if len(corpo) < tamanho or zlib.crc32(corpo) != crc:
+                break
+            yield json.loads(corpo)
+            pos += _CABECALHO.size + tamanho
+    return pos
+
+# log de operações + snapshot compactado da loja.
+# Commit em grupo: registrar() só acumula o registro; aguardar(posição) volta depois do
+# fsync que o cobre. Quem aguarda e encontra o disco livre grava de uma vez tudo o que
+# está pendente, e os registros que chegam durante esse fsync vão juntos no próximo.
+# Os pendentes também são gravados a cada `grupo` registros ou `intervalo` segundos.
+class Persistencia:
+    def __init__(self, diretorio: str, grupo: int = 256, intervalo: float = 0.05,
+                 ops_por_snapshot: int = 100_000) -> None:
+        os.makedirs(diretorio, exist_ok=True)
+        self.caminho_wal = os.path.join(diretorio, "wal.log")
+        # log anterior ao snapshot em construção (ver snapshot)
+        self.caminho_wal_antigo = os.path.join(diretorio, "wal.old")
+        self.caminho_snapshot = os.path.join(diretorio, "snapshot.bin")
+        self.grupo = grupo
+        self.ops_por_snapshot = ops_por_snapshot
+        self.ops_desde_snapshot = 0
+        self._pendentes: List[bytes] = []
+        # posições (contagem de registros) do último registrado e do último já em disco
+        self._registrados = 0
+        self._duraveis = 0
+        self._gravando = False
+        self._compactando = False
+        self._cond = threading.Condition()
+        self._wal = self._abrir_wal()
+        self._fechado = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        if intervalo > 0:
+            self._flusher = threading.Thread(target=self._descarregar_periodicamente,
+                                             args=(intervalo,), daemon=True)
+            self._flusher.start()
+
+    def _abrir_wal(self):
+        novo = not os.path.exists(self.caminho_wal) or os.path.getsize(self.caminho_wal) == 0
+        wal = open(self.caminho_wal, "ab")
+        if novo:
+            wal.write(MAGIC_WAL)
+            wal.flush()
+        return wal
+
+    # acrescenta uma operação ao log e retorna sua posição, para aguardar()
+    def registrar(self, op: Dict[str, Any]) -> int:
+        registro = _codificar(op)
+        with self._cond:
+            self._pendentes.append(registro)
+            self._registrados += 1
+            self.ops_desde_snapshot += 1
+            posicao = self._registrados
+            if len(self._pendentes) >= self.grupo and not self._gravando:
+                self._descarregar()
+            return posicao
+
+    # espera o registro da posição informada estar em disco
+    def aguardar(self, posicao: int) -> None:
+        with self._cond:
+            while self._duraveis < posicao:
+                if self._gravando:
+                    self._cond.wait()
+                else:
+                    self._descarregar()
+
+    # grava e sincroniza em disco tudo o que está pendente
+    def sincronizar(self) -> None:
+        with self._cond:
+            posicao = self._registrados
+        self.aguardar(posicao)
+
+    # chamado com a trava e sem outra gravação em andamento; a escrita e o fsync são
+    # feitos fora da trava, para novos registros continuarem chegando
+    def _descarregar(self) -> None:
+        if not self._pendentes:
+            return
+        lote, self._pendentes = self._pendentes, []
+        posicao = self._registrados
+        self._gravando = True
+        self._cond.release()
+        try:
+            self._wal.write(b"".join(lote))
+            self._wal.flush()
+            os.fsync(self._wal.fileno())
+        except BaseException:
+            self._cond.acquire()
+            # o lote volta para a fila; quem aguarda tenta de novo (ou recebe o erro)
+            self._pendentes[:0] = lote
+            raise
+        else:
+            self._cond.acquire()
+            self._duraveis = posicao
+        finally:
+            self._gravando = False
+            self._cond.notify_all()
+
+    def _descarregar_periodicamente(self, intervalo: float) -> None:
+        while not self._fechado.wait(intervalo):
+            self.sincronizar()
+
+    # inicia a compactação numa thread própria se o log passou do limite (e nenhuma está em andamento)
+    def compactar_se_preciso(self, produtos: Callable[[], Iterable[Dict[str, Any]]]) -> None:
+        with self._cond:
+            if self._compactando or self.ops_desde_snapshot < self.ops_por_snapshot:
+                return
+            self._compactando = True
+        threading.Thread(target=self._snapshot, args=(produtos,), daemon=True).start()
+
+    # grava um snapshot e descarta o log que ele cobre. O log é cortado antes:
+    # o atual vira wal.old e um novo começa; `produtos` é chamado depois do corte,
+    # então a cópia tem todas as operações de wal.old (e talvez algumas do novo log,
+    # que a recuperação reaplica por cima). Só a troca do arquivo trava os escritores.
+    def snapshot(self, produtos: Callable[[], Iterable[Dict[str, Any]]]) -> None:
+        with self._cond:
+            self._cond.wait_for(lambda: not self._compactando)
+            self._compactando = True
+        self._snapshot(produtos)
+
+    def _snapshot(self, produtos: Callable[[], Iterable[Dict[str, Any]]]) -> None:
+        try:
+            self._cortar_log()
+            tmp = self.caminho_snapshot + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(MAGIC_SNAPSHOT)
+                lote: List[bytes] = []
+                for d in produtos():
+                    lote.append(_codificar({"op": "add", "produto": d}))
+                    if len(lote) >= 4096:
+                        f.write(b"".join(lote))
+                        lote.clear()
+                f.write(b"".join(lote))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.caminho_snapshot)
+            # operações já contidas no snapshot saem do log
+            os.remove(self.caminho_wal_antigo)
+        finally:
+            with self._cond:
+                self._compactando = False
+                self._cond.notify_all()
+
+    def _cortar_log(self) -> None:
+        with self._cond:
+            self._cond.wait_for(lambda: not self._gravando)
+            if self._pendentes:
+                self._wal.write(b"".join(self._pendentes))
+                self._pendentes.clear()
+            self._wal.flush()
+            os.fsync(self._wal.fileno())
+            self._duraveis = self._registrados
+            self._cond.notify_all()
+            self._wal.close()
+            if os.path.exists(self.caminho_wal_antigo):
+                # uma compactação anterior não terminou: o log atual continua o antigo
+                with open(self.caminho_wal, "rb") as atual, open(self.caminho_wal_antigo, "ab") as antigo:
+                    atual.seek(len(MAGIC_WAL))
+                    antigo.write(atual.read())
+                    antigo.flush()
+                    os.fsync(antigo.fileno())
+                os.remove(self.caminho_wal)
+            else:
+                os.replace(self.caminho_wal, self.caminho_wal_antigo)
+            self._wal = self._abrir_wal()
+            os.fsync(self._wal.fileno())
+            self.ops_desde_snapshot = 0
+
+    # produtos do último snapshot (registros "add" com IDs distintos)
+    def ler_snapshot(self) -> Iterator[Dict[str, Any]]:
+        if os.path.exists(self.caminho_snapshot):
+            yield from _ler_registros(self.caminho_snapshot, MAGIC_SNAPSHOT)
+
+    # operações registradas depois do snapshot (incluindo as de wal.old, se a última
+    # compactação não terminou); um registro final incompleto (queda durante a escrita)
+    # é descartado do log
+    def ler_log(self) -> Iterator[Dict[str, Any]]:
+        self.sincronizar()
+        if os.path.exists(self.caminho_wal_antigo):
+            yield from _ler_registros(self.caminho_wal_antigo, MAGIC_WAL)
+        fim_valido = yield from _ler_registros(self.caminho_wal, MAGIC_WAL)
+        if fim_valido < os.path.getsize(self.caminho_wal):
+            with self._cond:
+                self._wal.truncate(fim_valido)
+
+    def fechar(self) -> None:
+        self._fechado.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        self.sincronizar()
+        with self._cond:
+            self._cond.wait_for(lambda: not self._compactando)
+            self._wal.close()
@@ -0,0 +1,128 @@
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# log das operações aplicadas no primário, no mesmo formato do log da persistência;
+# cada operação é identificada pela versão do catálogo que ela produziu (versões
+# consecutivas), e só as `capacidade` mais recentes ficam em memória
+class LogReplicacao:
+    def __init__(self, versao_inicial: int, capacidade: int = 100_000) -> None:
+        self.capacidade = capacidade
+        self.ultima = versao_inicial
+        self._ops: List[Tuple[int, Dict[str, Any]]] = []
+        self._cond = threading.Condition()
+
+    # chamado pela loja, na ordem das versões
+    def anexar(self, versao: int, op: Dict[str, Any]) -> None:
+        with self._cond:
+            self._ops.append((versao, op))
+            self.ultima = versao
+            # descarta em blocos para não mover a lista a cada operação
+            if len(self._ops) > self.capacidade + self.capacidade // 4:
+                del self._ops[:len(self._ops) - self.capacidade]
+            self._cond.notify_all()
+
+    # operações posteriores a `versao` (no máximo `maximo`); sem novidades, espera até
+    # `espera` segundos por elas. ValueError se o log não cobre mais a versão pedida
+    def desde(self, versao: int, maximo: int = 1000, espera: float = 0.0) -> List[Tuple[int, Dict[str, Any]]]:
+        with self._cond:
+            if versao == self.ultima and espera > 0:
+                self._cond.wait_for(lambda: self.ultima != versao, espera)
+            base = self._ops[0][0] - 1 if self._ops else self.ultima
+            if not base <= versao <= self.ultima:
+                raise ValueError(f"Versão {versao} fora do log de replicação; recarregue o estado do primário.")
+            inicio = versao - base
+            return self._ops[inicio:inicio + maximo]
+
+# objeto remoto exportado pelo primário: estado inicial e fluxo de operações para as réplicas
+class ReplicacaoService:
+    def __init__(self, loja, log: LogReplicacao):
+        self.loja = loja
+        self.log = log
+
+    # produtos atuais e a versão a partir da qual a réplica deve pedir operações;
+    # a versão é lida antes da cópia, então operações concorrentes podem já estar nela
+    # e são reaplicadas por cima (como na recuperação snapshot + log)
+    def estado(self) -> dict:
+        versao = self.log.ultima
+        return {"versao": versao, "produtos": [p.to_dict() for p in self.loja.listar()]}
+
+    def operacoes(self, desde: int, maximo: int = 1000, espera: float = 1.0) -> dict:
+        ops = self.log.desde(desde, maximo, espera)
+        return {"versao": self.log.ultima, "ops": [[v, op] for v, op in ops]}
+
+# réplica somente leitura: carrega o estado do primário e aplica, em ordem, as operações
+# que ele publica. `estado` e `operacoes` chamam os métodos de mesmo nome do ReplicacaoService
+# do primário (por RMI); a versão do catálogo da loja local segue a do primário.
+# Até a carga do estado terminar, `carregada` é False (a réplica não deve atender leituras)
+# e a loja fica com a versão 0, que as respostas informam como desconhecida.
+class Replica:
+    def __init__(self, loja, estado: Callable[[], dict], operacoes: Callable[[int, int, float], dict],
+                 lote: int = 1000, espera: float = 1.0) -> None:
+        self.loja = loja
+        self._estado = estado
+        self._operacoes = operacoes
+        self.lote = lote
+        self.espera = espera
+        self.aplicada: Optional[int] = None
+        self.carregada = False
+        loja.versao = 0
+        self.versao_primario: Optional[int] = None
+        self._em_dia_desde = time.monotonic()
+        self._cond = threading.Condition()
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def iniciar(self) -> None:
+        self._thread = threading.Thread(target=self._replicar, daemon=True)
+        self._thread.start()
+
+    def parar(self) -> None:
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _replicar(self) -> None:
+        while not self._parar.is_set():
+            try:
+                if self.aplicada is None:
+                    estado = self._estado()
+                    self.carregada = False
+                    self.loja.carregar(estado["produtos"], estado["versao"])
+                    self._avancar(estado["versao"], estado["versao"])
+                    self.carregada = True
+                resposta = self._operacoes(self.aplicada, self.lote, self.espera)
+                for versao, op in resposta["ops"]:
+                    self.loja.aplicar(op, versao)
+                    self._avancar(versao, resposta["versao"])
+                self._avancar(self.aplicada, resposta["versao"])
+            except OSError:
+                # primário fora do ar: tenta de novo em instantes
+                self._parar.wait(self.espera)
+            except Exception:
+                # fora do log (ex.: o primário reiniciou): recarrega o estado inteiro
+                self.aplicada = None
+                self._parar.wait(self.espera)
+
+    def _avancar(self, aplicada: int, versao_primario: int) -> None:
+        with self._cond:
+            self.aplicada = aplicada
+            self.versao_primario = versao_primario
+            if aplicada >= versao_primario:
+                self._em_dia_desde = time.monotonic()
+            self._cond.notify_all()
+
+    # espera a réplica alcançar `versao` (leitura das próprias escritas); False se esgotou o tempo
+    def aguardar(self, versao: int, timeout: float) -> bool:
+        with self._cond:
+            return self._cond.wait_for(lambda: self.aplicada is not None and self.aplicada >= versao, timeout)
+
+    # atraso em relação ao primário: operações ainda não aplicadas e segundos desde
+    # a última vez em que a réplica esteve em dia
+    def atraso(self) -> dict:
+        with self._cond:
+            if self.aplicada is None:
+                return {"operacoes": None, "segundos": time.monotonic() - self._em_dia_desde}
+            operacoes = max(self.versao_primario - self.aplicada, 0)
+            segundos = time.monotonic() - self._em_dia_desde if operacoes else 0.0
+            return {"operacoes": operacoes, "segundos": segundos}
@@ -8,14 +8,17 @@ class TransacaoService:
 
     # vende um produto pelo ID
     def vender(self, produto_id: str) -> Produto:
-        produto = self.loja.get(produto_id)
-        produto.marcar_vendido()
-        return produto
+        return self.loja.vender(produto_id)
 
-    # troca dois produtos pelo ID
+    # troca dois produtos pelo ID: os dois saem do estoque disponível de forma atômica.
+    # Controle otimista: lê e valida sem travas e confirma só se as versões lidas
+    # continuarem valendo; numa corrida, um dos lados recebe ConflitoError.
     def trocar(self, produto_a_id: str, produto_b_id: str) -> dict:
+        if produto_a_id == produto_b_id:
+            raise ValueError("Um produto não pode ser trocado por ele mesmo.")
         a = self.loja.get(produto_a_id)
         b = self.loja.get(produto_b_id)
+        versao_a, versao_b = a.versao, b.versao
 
         if not isinstance(a, Trocavel) or not isinstance(b, Trocavel):
             raise ValueError("Pelo menos um dos itens não é trocável.")
@@ -23,4 +26,5 @@ class TransacaoService:
         if not (a.pode_trocar_por(b) and b.pode_trocar_por(a)):
             raise ValueError("Condições de troca não atendidas.")
 
-        return {"ok": True, "mensagem": f"Troca autorizada entre '{a.titulo}' e '{b.titulo}'."}
\ No newline at end of file
+        self.loja.confirmar_troca(a, versao_a, b, versao_b)
+        return {"ok": True, "mensagem": f"Troca realizada entre '{a.titulo}' e '{b.titulo}'."}
@@ -0,0 +1,68 @@
+import os
+import shutil
+import tempfile
+from models.livro import Livro
+from services.loja import Loja
+from services.persistencia import Persistencia
+
+def _livro(i: int) -> Livro:
+    return Livro(id=f"P{i}", titulo=f"Persistido {i}", preco=10.0 + i, estado="novo",
+                 autor="Teste", isbn="978", paginas=100, genero="Teste")
+
+def _estado(loja: Loja) -> dict:
+    return {pid: p.to_dict() for pid, p in loja.estoque.items()}
+
+def _reabrir(diretorio: str) -> Loja:
+    loja = Loja("Recuperada", persistencia=Persistencia(diretorio, intervalo=0))
+    loja.recuperar()
+    return loja
+
+# escritas confirmadas sobrevivem a reabrir a loja: snapshot (inclusive o feito em segundo
+# plano pela compactação automática) + cauda do log, e um registro final truncado é descartado
+def teste_recuperacao():
+    print("\n=== Teste iv) Recuperação da persistência (snapshot + log) ===")
+    diretorio = tempfile.mkdtemp(prefix="sebo_teste_")
+    try:
+        loja = Loja("Original", persistencia=Persistencia(diretorio, intervalo=0, ops_por_snapshot=20))
+        for i in range(50):
+            loja.add_produto(_livro(i))
+        for i in range(0, 50, 5):
+            loja.vender(f"P{i}")
+        loja.remover("P1")
+        loja.compactar()
+        # cauda do log depois do último snapshot
+        loja.vender("P2")
+        loja.add_produto(_livro(99))
+        esperado = _estado(loja)
+        # escrita confirmada já está em disco, mesmo antes de fechar (intervalo=0: sem gravação periódica)
+        copia = _reabrir(diretorio)
+        assert _estado(copia) == esperado
+        copia.persistencia.fechar()
+        loja.persistencia.fechar()
+        assert not os.path.exists(os.path.join(diretorio, "wal.old"))
+
+        recuperada = _reabrir(diretorio)
+        assert _estado(recuperada) == esperado
+        print(f"[PERSISTÊNCIA] {len(recuperada.estoque)} produtos recuperados, "
+              f"{len(recuperada.consultar(disponivel=False))} vendidos")
+        recuperada.persistencia.fechar()
+
+        # queda no meio da escrita de um registro: o final incompleto é descartado e truncado
+        caminho_wal = os.path.join(diretorio, "wal.log")
+        tamanho = os.path.getsize(caminho_wal)
+        with open(caminho_wal, "ab") as f:
+            f.write(b"\x00\x00\x01\x00\x12\x34")
+        recuperada = _reabrir(diretorio)
+        assert _estado(recuperada) == esperado
+        assert os.path.getsize(caminho_wal) == tamanho
+        print(f"[PERSISTÊNCIA] registro truncado descartado; log de volta a {tamanho} bytes")
+
+        # e a loja recuperada continua gravando a partir dali
+        recuperada.vender("P3")
+        esperado = _estado(recuperada)
+        recuperada.persistencia.fechar()
+        recuperada = _reabrir(diretorio)
+        assert _estado(recuperada) == esperado
+        recuperada.persistencia.fechar()
+    finally:
+        shutil.rmtree(diretorio)
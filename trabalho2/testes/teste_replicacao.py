@@ -0,0 +1,74 @@
+import threading
+from models.livro import Livro
+from rmi.naming import Registry, Repository
+from rmi.replicacao import RequestorReplicado
+from rmi.skeleton import Dispatcher
+from rmi.transport import Requestor, ServerRequestHandler
+from services.catalogo import CatalogoService
+from services.loja import Loja
+from services.replicacao import LogReplicacao, Replica, ReplicacaoService
+from app.client import CacheLRU, CatalogoProxy
+
+HOST = "127.0.0.1"
+PRIMARIO = 9301
+REPLICA = 9302
+
+def _livro(i: int) -> Livro:
+    return Livro(id=f"R{i}", titulo=f"Replicado {i}", preco=10.0 + i, estado="novo",
+                 autor="Teste", isbn="978", paginas=100, genero="Teste")
+
+def _servidor(port: int, loja: Loja, repo: Repository) -> None:
+    handler = ServerRequestHandler(HOST, port, Dispatcher(repo), versao=lambda: loja.versao)
+    handler.start_in_background()
+
+# réplica sem o estado do primário não responde leituras nem informa versão; depois da
+# carga, segue exatamente as versões do primário. Uma resposta de réplica atrasada não
+# entra no cache do proxy
+def teste_versoes_replica():
+    print("\n=== Teste iii) Versões e cache com réplicas ===")
+    primario = Loja("Primário")
+    for i in range(3):
+        primario.add_produto(_livro(i))
+    primario.replicacao = LogReplicacao(primario.versao)
+    repo = Repository()
+    repo.bind("CatalogoService", CatalogoService(primario))
+    repo.bind("ReplicacaoService", ReplicacaoService(primario, primario.replicacao))
+    _servidor(PRIMARIO, primario, repo)
+
+    # a carga só começa quando liberada, para observar a réplica antes dela
+    liberar = threading.Event()
+    req_primario = Requestor()
+    ror = Registry(HOST, PRIMARIO).ror("ReplicacaoService")
+    def estado():
+        liberar.wait()
+        return req_primario.doOperation(ror, "estado", {"args": []})
+    loja = Loja("Réplica")
+    replica = Replica(loja, estado=estado, espera=0.2, operacoes=lambda desde, maximo, espera:
+                      req_primario.doOperation(ror, "operacoes", {"args": [desde, maximo, espera]}))
+    repo_replica = Repository()
+    repo_replica.bind("CatalogoService", CatalogoService(loja, replica=replica))
+    _servidor(REPLICA, loja, repo_replica)
+    replica.iniciar()
+
+    req = RequestorReplicado([(HOST, REPLICA)], ler_escritas=False)
+    catalogo = CatalogoProxy(Registry(HOST, PRIMARIO).ror("CatalogoService"), req, cache=CacheLRU())
+    # a leitura recusada pela réplica é refeita no primário
+    assert len(catalogo.listar()) == 3
+    assert req.base.versoes.get(HOST, REPLICA) is None, "réplica informou versão antes da carga"
+    print(f"[RÉPLICA] antes da carga: versão {loja.versao}, leituras vão ao primário")
+
+    liberar.set()
+    assert replica.aguardar(primario.versao, 5)
+    assert loja.versao == primario.versao
+    catalogo.cadastrar(_livro(3))
+    assert replica.aguardar(primario.versao, 5) and loja.versao == primario.versao
+    print(f"[RÉPLICA] carregada e em dia: versão {loja.versao} (a do primário)")
+
+    # réplica parada: a escrita seguinte não chega a ela
+    replica.parar()
+    catalogo.cadastrar(_livro(4))
+    itens = catalogo.listar()
+    print(f"[CLIENTE] réplica atrasada respondeu {len(itens)} itens (primário tem {len(primario.estoque)})")
+    assert not catalogo.cache._itens, "resposta da réplica atrasada foi para o cache"
+    req.close()
+    req_primario.close()
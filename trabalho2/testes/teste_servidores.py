@@ -0,0 +1,28 @@
+import threading
+import time
+from xmlrpc.client import ServerProxy
+from rmi.servidores import ServidorPool
+
+# com 2 workers e 2 conexões keep-alive ociosas de um cliente, a chamada de um segundo
+# cliente não pode esperar o timeout das conexões ociosas (60 s)
+def teste_conexoes_ociosas():
+    print("\n=== Teste i) Conexões ociosas não prendem os workers do pool ===")
+    servidor = ServidorPool(("127.0.0.1", 0), workers=2, fila=8, allow_none=True, logRequests=False)
+    servidor.register_function(lambda x: x, "eco")
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    url = "http://127.0.0.1:%d" % servidor.server_address[1]
+
+    ociosas = [ServerProxy(url) for _ in range(2)]
+    for proxy in ociosas:
+        proxy.eco(1)
+
+    inicio = time.monotonic()
+    assert ServerProxy(url).eco(2) == 2
+    segundos = time.monotonic() - inicio
+    print(f"[CLIENTE] chamada atendida em {segundos:.2f} s com os 2 workers em conexões ociosas")
+    assert segundos < 5, segundos
+
+    # as conexões encerradas pelo servidor são reabertas de forma transparente
+    assert [proxy.eco(3) for proxy in ociosas] == [3, 3]
+    servidor.shutdown()
+    servidor.server_close()
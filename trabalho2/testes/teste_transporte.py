@@ -0,0 +1,126 @@
+import socket
+import struct
+import threading
+import time
+from concurrent.futures import TimeoutError
+from rmi.binario import codificar_resposta, decodificar, ler_quadro
+from rmi.protocol import RemoteObjectRef
+from rmi.transport import RequestorBinario, RequestorMultiplexado
+
+# servidor falso do protocolo binário: lê um quadro por conexão, anota o método e,
+# se `responde`, devolve "ok" antes de encerrar a conexão; sem resposta, só encerra
+def _servidor_falso(responde: bool, recebidos: list) -> RemoteObjectRef:
+    srv = socket.socket()
+    srv.bind(("127.0.0.1", 0))
+    srv.listen()
+
+    def atender() -> None:
+        while True:
+            conexao, _ = srv.accept()
+            req = decodificar(ler_quadro(conexao))
+            recebidos.append(req["methodId"])
+            if responde:
+                conexao.sendall(codificar_resposta(req["requestId"], "ok"))
+            conexao.close()
+    threading.Thread(target=atender, daemon=True).start()
+    return RemoteObjectRef("127.0.0.1", srv.getsockname()[1], "TransacaoService")
+
+# depois que o quadro foi enviado o servidor pode já ter executado a chamada: o erro vai
+# ao chamador em vez de um reenvio (que venderia duas vezes); uma conexão do pool que o
+# servidor encerrou enquanto ociosa continua sendo trocada de forma transparente
+def teste_binario_sem_reenvio():
+    print("\n=== Teste v) Protocolo binário não reenvia chamadas já enviadas ===")
+    req = RequestorBinario()
+
+    recebidos: list = []
+    ref = _servidor_falso(True, recebidos)
+    assert req.doOperation(ref, "vender", ["L1"]) == "ok"
+    time.sleep(0.1)
+    assert req.doOperation(ref, "vender", ["L2"]) == "ok"
+    assert recebidos == ["vender", "vender"], recebidos
+    print("[CLIENTE] conexão ociosa encerrada pelo servidor trocada sem reenvio")
+
+    recebidos = []
+    ref = _servidor_falso(False, recebidos)
+    try:
+        req.doOperation(ref, "vender", ["L1"])
+    except ConnectionResetError as e:
+        print(f"[CLIENTE] erro esperado: {e}")
+    else:
+        raise AssertionError("Chamada sem resposta não levantou erro.")
+    time.sleep(0.1)
+    assert recebidos == ["vender"], recebidos
+    print(f"[SERVIDOR] 'vender' recebido {len(recebidos)} vez")
+    req.close()
+
+# servidor falso para o RequestorMultiplexado: atende vários quadros por conexão e
+# responde conforme o método: "ruim" (corpo ilegível com requestId válido), "fatal"
+# (quadro sem cabeçalho), "espera" (nunca responde) ou eco do nome do método
+def _servidor_multiplexado(conexoes: list) -> RemoteObjectRef:
+    srv = socket.socket()
+    srv.bind(("127.0.0.1", 0))
+    srv.listen()
+
+    def atender(conexao: socket.socket) -> None:
+        while (corpo := ler_quadro(conexao)) is not None:
+            req = decodificar(corpo)
+            metodo = req["methodId"]
+            if metodo == "ruim":
+                inicio = codificar_resposta(req["requestId"], "x")[4:13]
+                conexao.sendall(struct.pack(">I", len(inicio) + 2) + inicio + b"\xff\xff")
+            elif metodo == "fatal":
+                conexao.sendall(struct.pack(">I", 1) + b"\x01")
+            elif metodo != "espera":
+                conexao.sendall(codificar_resposta(req["requestId"], metodo))
+
+    def aceitar() -> None:
+        while True:
+            conexao, _ = srv.accept()
+            conexoes.append(conexao)
+            threading.Thread(target=atender, args=(conexao,), daemon=True).start()
+    threading.Thread(target=aceitar, daemon=True).start()
+    return RemoteObjectRef("127.0.0.1", srv.getsockname()[1], "CatalogoService")
+
+# uma resposta ilegível falha só a sua chamada; um quadro que corrompe o fluxo falha todas as
+# pendentes (nenhuma fica esperando para sempre) e a próxima chamada abre outra conexão;
+# uma resposta que não chega esgota o timeout em vez de prender o chamador
+def teste_multiplexado_falhas():
+    print("\n=== Teste vi) Falhas na conexão multiplexada ===")
+    conexoes: list = []
+    ref = _servidor_multiplexado(conexoes)
+    req = RequestorMultiplexado(timeout=0.5)
+
+    ruim = req.doOperationAsync(ref, "ruim", [])
+    assert req.doOperation(ref, "listar", []) == "listar"
+    try:
+        ruim.result(2)
+    except Exception as e:
+        print(f"[CLIENTE] resposta ilegível falhou só a sua chamada: {type(e).__name__}")
+    else:
+        raise AssertionError("Resposta ilegível foi aceita.")
+
+    pendente = req.doOperationAsync(ref, "espera", [])
+    fatal = req.doOperationAsync(ref, "fatal", [])
+    for futuro in (pendente, fatal):
+        try:
+            futuro.result(2)
+        except ConnectionResetError:
+            pass
+        else:
+            raise AssertionError("Chamada pendente não falhou com a conexão.")
+    print("[CLIENTE] quadro inválido: as chamadas pendentes falharam com ConnectionResetError")
+    assert req.doOperation(ref, "buscar", []) == "buscar"
+    assert len(conexoes) == 2, len(conexoes)
+    print("[CLIENTE] a chamada seguinte abriu uma nova conexão")
+
+    inicio = time.monotonic()
+    try:
+        req.doOperation(ref, "espera", [])
+    except TimeoutError:
+        print(f"[CLIENTE] resposta perdida: TimeoutError em {time.monotonic() - inicio:.1f} s")
+    else:
+        raise AssertionError("Chamada sem resposta não esgotou o timeout.")
+    # a chamada abandonada não fica na tabela de pendentes da conexão
+    assert not any(conexao._pendentes for conexao in req._conexoes.values())
+    assert req.doOperation(ref, "listar", []) == "listar"
+    req.close()
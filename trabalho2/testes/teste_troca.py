@@ -0,0 +1,31 @@
+from models.ebook import EBook
+from services.loja import ConflitoError
+from services.loja_colunar import LojaColunar
+from services.transacao import TransacaoService
+
+def _loja() -> LojaColunar:
+    loja = LojaColunar("Loja de Mídias")
+    loja.add_produto(EBook(id="E1", titulo="Python Fluente", preco=60.0, estado="novo",
+                           autor="Luciano", isbn="978", formato="PDF", tamanho_mb=12.5, drm=False))
+    loja.add_produto(EBook(id="E2", titulo="Python Cookbook", preco=62.0, estado="novo",
+                           autor="Beazley", isbn="978", formato="PDF", tamanho_mb=15.0, drm=False))
+    return loja
+
+# troca validada antes de uma reprecificação não pode ser confirmada com o preço antigo
+def teste_troca_apos_reprecificar():
+    print("\n=== Teste ii) Troca cotada antes de uma reprecificação ===")
+    loja = _loja()
+    a, b = loja.get("E1"), loja.get("E2")
+    versao_a, versao_b = a.versao, b.versao
+    assert loja.reprecificar(1.5, tipo="EBook") == 2
+    try:
+        loja.confirmar_troca(a, versao_a, b, versao_b)
+    except ConflitoError as e:
+        print(f"[LOJA] conflito esperado: {e}")
+    else:
+        raise AssertionError("Troca confirmada com o preço antigo.")
+    assert a.disponivel and b.disponivel
+
+    # cotada de novo, com os preços atuais, a troca passa
+    print(f"[LOJA] {TransacaoService(loja).trocar('E1', 'E2')['mensagem']}")
+    assert not a.disponivel and not b.disponivel
@@ -1,19 +1,28 @@
-from typing import List, Optional, Union, Dict, Any
+import dataclasses
+import json
+import os
+from typing import List, Optional, Union, Dict, Any, Iterator
 from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from services.loja import Loja
+from services.loja import Loja, ConflitoError
 from services.catalogo import CatalogoService
 from services.transacao import TransacaoService
+from services.persistencia import Persistencia
 
 from models.livro import Livro
 from models.ebook import EBook
 from models.apostila import Apostila
 from models.cd import CD
+from models.pagina import Pagina
 
 app = FastAPI(title="Sebo API RESTful")
 
-loja = Loja("Sebo")
+# SEBO_DADOS aponta o diretório do log/snapshot; sem ele a loja é volátil
+_dados = os.environ.get("SEBO_DADOS")
+persistencia = Persistencia(_dados) if _dados else None
+loja = Loja("Sebo", persistencia=persistencia)
 
 def seed(loja: Loja):
     loja.add_produto(Livro(
@@ -49,12 +58,20 @@ def seed(loja: Loja):
         artista="Miles Davis", genero="Jazz", faixas=5
     ))
 
-seed(loja)
+loja.recuperar()
+if not loja.estoque:
+    seed(loja)
 
 catalogo_service = CatalogoService(loja)
 transacao_service = TransacaoService(loja)
 
 
+@app.on_event("shutdown")
+def fechar_persistencia():
+    if persistencia is not None:
+        persistencia.fechar()
+
+
 class ProdutoCreate(BaseModel):
     id: str
     tipo_produto: str 
@@ -71,17 +88,89 @@ class TrocaRequest(BaseModel):
 @app.get("/produtos")
 def listar_produtos(
     tipo: Optional[str] = Query(None, description="Filtrar por tipo (livro, cd, etc)"),
-    termo: Optional[str] = Query(None, description="Buscar por termo no título ou autor")
+    termo: Optional[str] = Query(None, description="Buscar por termo no título ou autor"),
+    disponivel: Optional[bool] = Query(None, description="Filtrar por disponibilidade"),
+    estado: Optional[str] = Query(None, description="Filtrar por estado (novo, usado)"),
+    preco_min: Optional[float] = Query(None, description="Preço mínimo"),
+    preco_max: Optional[float] = Query(None, description="Preço máximo"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Tamanho da página"),
+    cursor: Optional[str] = Query(None, description="Cursor devolvido pela página anterior"),
+    fields: Optional[str] = Query(None, description="Campos a retornar, separados por vírgula (ex.: id,titulo,preco)")
 ):
     """
-    Lista produtos. Pode filtrar por tipo ou buscar por termo.
+    Lista produtos. Os filtros podem ser combinados (ex.: disponíveis, usados, até R$50).
+    Com `limit` ou `cursor` a resposta é paginada: {"itens": [...], "proximo_cursor": ...}.
     """
-    if termo:
-        resultados = catalogo_service.buscar(termo)
-    else:
-        resultados = catalogo_service.listar(tipo)
-    
-    return [p.to_dict() for p in resultados]
+    try:
+        resultados = catalogo_service.listar(
+            tipo, termo=termo or None, disponivel=disponivel,
+            estado=estado, preco_min=preco_min, preco_max=preco_max,
+            limite=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    campos = _parse_campos(fields)
+    if isinstance(resultados, Pagina):
+        return {
+            "itens": [_projetar(p, campos) for p in resultados.itens],
+            "proximo_cursor": resultados.cursor,
+        }
+    return [_projetar(p, campos) for p in resultados]
+
+
+# campos aceitos em `fields`: os campos de dados de cada tipo de produto, mais o tipo
+# (atributos quaisquer, como métodos, não podem ser pedidos)
+_CAMPOS_POR_TIPO = {
+    cls: frozenset(f.name for f in dataclasses.fields(cls)) | {"tipo_produto"}
+    for cls in (Livro, EBook, Apostila, CD)
+}
+_CAMPOS_PROJETAVEIS = frozenset().union(*_CAMPOS_POR_TIPO.values())
+
+
+def _parse_campos(fields: Optional[str]) -> Optional[List[str]]:
+    if not fields:
+        return None
+    campos = [c.strip() for c in fields.split(",") if c.strip()]
+    desconhecidos = [c for c in campos if c not in _CAMPOS_PROJETAVEIS]
+    if desconhecidos:
+        raise HTTPException(status_code=400, detail=f"Campos desconhecidos: {', '.join(desconhecidos)}")
+    return campos
+
+
+# monta só os campos pedidos, sem serializar o produto inteiro; campos que o tipo do
+# produto não tem ficam de fora
+def _projetar(produto, campos: Optional[List[str]]) -> Dict[str, Any]:
+    if campos is None:
+        return produto.to_dict()
+    proprios = _CAMPOS_POR_TIPO[type(produto)]
+    return {c: type(produto).__name__.lower() if c == "tipo_produto" else getattr(produto, c)
+            for c in campos if c in proprios}
+
+
+@app.get("/produtos/export")
+def exportar_produtos(
+    fields: Optional[str] = Query(None, description="Campos a retornar, separados por vírgula")
+):
+    """
+    Exporta o catálogo inteiro como NDJSON (um produto por linha), em streaming.
+    """
+    return StreamingResponse(
+        _gerar_ndjson(_parse_campos(fields)),
+        media_type="application/x-ndjson"
+    )
+
+
+# gera o NDJSON em blocos a partir do estoque, sem montar a resposta inteira em memória
+def _gerar_ndjson(campos: Optional[List[str]], linhas_por_bloco: int = 500) -> Iterator[str]:
+    bloco = []
+    for p in loja.iterar():
+        bloco.append(json.dumps(_projetar(p, campos), ensure_ascii=False))
+        if len(bloco) >= linhas_por_bloco:
+            yield "\n".join(bloco) + "\n"
+            bloco = []
+    if bloco:
+        yield "\n".join(bloco) + "\n"
 
 
 @app.get("/produtos/{produto_id}")
@@ -161,6 +250,8 @@ def realizar_troca(dados: TrocaRequest):
         return resultado
     except KeyError:
         raise HTTPException(status_code=404, detail="Um dos produtos não foi encontrado")
+    except ConflitoError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -202,7 +293,7 @@ def atualizar_produto(produto_id: str, item: ProdutoCreate):
         else:
             raise HTTPException(status_code=400, detail=f"Tipo de produto '{tipo}' inválido.")
 
-        loja.estoque[produto_id] = novo_produto
+        loja.substituir(novo_produto)
         
         return novo_produto.to_dict()
 
@@ -219,5 +310,5 @@ def remover_produto(produto_id: str):
     if produto_id not in loja.estoque:
          raise HTTPException(status_code=404, detail="Produto não encontrado")
     
-    del loja.estoque[produto_id]
+    loja.remover(produto_id)
     return
\ No newline at end of file
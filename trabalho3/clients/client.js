@@ -32,6 +32,39 @@ async function request(endpoint, method = "GET", body = null) {
   }
 }
 
+// percorre GET /produtos página a página (limit + cursor), sem carregar o catálogo inteiro
+async function* listarPaginado(query = "", limit = 50) {
+  let cursor = null;
+  do {
+    const params = new URLSearchParams(query);
+    params.set("limit", String(limit));
+    if (cursor) params.set("cursor", cursor);
+    const pagina = await request(`/produtos?${params}`);
+    for (const p of pagina.itens) yield p;
+    cursor = pagina.proximo_cursor;
+  } while (cursor);
+}
+
+// lê GET /produtos/export como NDJSON em streaming, um produto por vez
+async function* exportarProdutos(query = "") {
+  const resp = await fetch(`${BASE}/produtos/export${query ? `?${query}` : ""}`);
+  if (!resp.ok) throw new Error(`HTTP ${resp.status} -> ${await resp.text()}`);
+
+  const decoder = new TextDecoder("utf-8");
+  let resto = "";
+  for await (const chunk of resp.body) {
+    resto += decoder.decode(chunk, { stream: true });
+    let fim;
+    while ((fim = resto.indexOf("\n")) >= 0) {
+      const linha = resto.slice(0, fim).trim();
+      resto = resto.slice(fim + 1);
+      if (linha) yield JSON.parse(linha);
+    }
+  }
+  resto += decoder.decode();
+  if (resto.trim()) yield JSON.parse(resto);
+}
+
 function produtoToString(p) {
   if (!p) return "Produto indefinido";
 
@@ -45,12 +78,14 @@ async function main() {
 
   try {
     console.log("\n== LISTANDO ==");
-    const lista = await request("/produtos");
-
-    if (!Array.isArray(lista)) {
-      throw new Error("A API não retornou uma lista.");
+    for await (const p of listarPaginado("fields=id,titulo,preco,estado")) {
+      console.log(produtoToString(p));
     }
-    lista.forEach((p) => console.log(produtoToString(p)));
+
+    console.log("\n== EXPORTANDO (NDJSON) ==");
+    let exportados = 0;
+    for await (const _ of exportarProdutos("fields=id")) exportados++;
+    console.log(`${exportados} produtos exportados.`);
 
     console.log("\n== BUSCA 'python' ==");
     const achados = await request("/produtos?termo=python");
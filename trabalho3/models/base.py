@@ -1,45 +1,89 @@
-from dataclasses import dataclass, field, asdict
-from typing import Literal
+from dataclasses import dataclass, field, fields
+from typing import Any, Callable, Dict, Literal
 from abc import ABC, abstractmethod
 
+# tipos concretos de produto por nome, preenchido ao definir cada subclasse
+_TIPOS: Dict[str, type] = {}
+# codificadores/decodificadores gerados uma única vez por classe
+_CODIFICADORES: Dict[type, Callable[["Produto"], dict]] = {}
+_DECODIFICADORES: Dict[type, Callable[[dict], "Produto"]] = {}
+
+# gera `codificar(o)`, que devolve {"id": o.id, ..., "__type__": "Livro"}, a partir dos campos do dataclass;
+# os campos são valores simples, então não é preciso a cópia profunda de asdict
+def _compilar_codificador(cls: type) -> Callable[["Produto"], dict]:
+    itens = "".join(f"{f.name!r}: o.{f.name}, " for f in fields(cls))
+    fonte = f"def codificar(o):\n    return {{{itens}'__type__': {cls.__name__!r}}}\n"
+    ns: Dict[str, Any] = {}
+    exec(fonte, ns)
+    return ns["codificar"]
+
+# gera o construtor direto `cls(id=d["id"], ...)`, copiando depois os campos fora do __init__
+def _compilar_decodificador(cls: type) -> Callable[[dict], "Produto"]:
+    args = ", ".join(f"{f.name}=d[{f.name!r}]" for f in fields(cls) if f.init)
+    linhas = ["def decodificar(d):", f"    obj = cls({args})"]
+    for f in fields(cls):
+        if not f.init:
+            linhas.append(f"    if {f.name!r} in d: obj.{f.name} = d[{f.name!r}]")
+    linhas.append("    return obj")
+    ns: Dict[str, Any] = {"cls": cls}
+    exec("\n".join(linhas) + "\n", ns)
+    return ns["decodificar"]
+
+# garante que as subclasses concretas foram importadas (e portanto registradas)
+def _carregar_tipos() -> None:
+    from . import livro, ebook, apostila, cd  # noqa: F401
+
 class Trocavel(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def pode_trocar_por(self, outro: "Produto") -> bool:
         pass
 
-@dataclass
+@dataclass(slots=True)
 class Produto(ABC):
     id: str
     titulo: str
     preco: float
     estado: Literal["novo", "usado"]
     disponivel: bool = field(default=True, init=False)
+    # incrementada a cada mudança de estado; usada no controle de concorrência otimista
+    versao: int = field(default=0, init=False)
 
     def marcar_vendido(self) -> None:
         if not self.disponivel:
             raise ValueError("Produto indisponível.")
         self.disponivel = False
+        self.versao += 1
+
+    # o dataclass com slots recria a classe, então super() precisa ser explícito
+    def __init_subclass__(cls, **kwargs):
+        super(Produto, cls).__init_subclass__(**kwargs)
+        _TIPOS[cls.__name__] = cls
 
     def to_dict(self) -> dict:
-        d = asdict(self)
-        d["__type__"] = self.__class__.__name__
-        return d
+        cls = self.__class__
+        codificar = _CODIFICADORES.get(cls)
+        if codificar is None:
+            codificar = _CODIFICADORES[cls] = _compilar_codificador(cls)
+        return codificar(self)
 
     @staticmethod
     def from_dict(d: dict) -> "Produto":
-        from .livro import Livro
-        from .ebook import EBook
-        from .apostila import Apostila
-        from .cd import CD
-        map_cls = {"Livro": Livro, "EBook": EBook, "Apostila": Apostila, "CD": CD}
-        cls = map_cls.get(d.get("__type__"))
-        if not cls:
-            raise ValueError("Tipo de produto desconhecido")
-        d = dict(d)
-        d.pop("__type__", None)
-        obj = cls(**{k: v for k, v in d.items() if k not in ("disponivel",)})
-        obj.disponivel = d.get("disponivel", True)
-        return obj
+        nome = d.get("__type__")
+        cls = _TIPOS.get(nome)
+        if cls is None:
+            _carregar_tipos()
+            cls = _TIPOS.get(nome)
+            if cls is None:
+                raise ValueError("Tipo de produto desconhecido")
+        decodificar = _DECODIFICADORES.get(cls)
+        if decodificar is None:
+            decodificar = _DECODIFICADORES[cls] = _compilar_decodificador(cls)
+        try:
+            return decodificar(d)
+        except KeyError as e:
+            raise TypeError(f"Campo obrigatório ausente para {nome}: {e}")
 
     def __str__(self):
         status = "disponível" if self.disponivel else "vendido"
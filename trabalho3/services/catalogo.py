@@ -1,22 +1,85 @@
-from typing import List, Optional
+import base64
+import binascii
+from typing import List, Optional, Union
 from models.base import Produto
+from models.pagina import Pagina
 from services.loja import Loja
+from services.replicacao import Replica
+
+LIMITE_PADRAO = 50
+
+# o cursor é o último ID da página em base64 url-safe; o cliente não deve interpretá-lo
+def codificar_cursor(produto_id: str) -> str:
+    return base64.urlsafe_b64encode(produto_id.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decodificar_cursor(cursor: str) -> str:
+    try:
+        return base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+    except (binascii.Error, UnicodeDecodeError):
+        raise ValueError("Cursor inválido.")
 
 # serviço de catálogo: cadastro, listagem e busca
+# `resultados` (um GerenciadorResultados) habilita listar(por_referencia=True)
+# com `replica` (services.replicacao.Replica) o serviço é somente leitura, e leituras com
+# versao_minima esperam até `espera_leitura` segundos a réplica alcançar essa versão
 class CatalogoService:
-    def __init__(self, loja: Loja):
+    def __init__(self, loja: Loja, resultados=None, replica: Optional[Replica] = None,
+                 espera_leitura: float = 2.0):
         self.loja = loja
+        self.resultados = resultados
+        self.replica = replica
+        self.espera_leitura = espera_leitura
 
     def cadastrar(self, produto: Produto) -> Produto:
+        if self.replica is not None:
+            raise ValueError("Réplica somente leitura: cadastre no primário.")
         self.loja.add_produto(produto)
         return produto
 
-    def listar(self, tipo: Optional[str] = None) -> List[Produto]:
-        itens = self.loja.listar()
-        if tipo:
-            tipo = tipo.lower()
-            itens = [p for p in itens if p.__class__.__name__.lower() == tipo]
-        return itens
+    # leitura das próprias escritas: a versão informada (a da resposta da escrita) já
+    # deve estar aplicada; no primário isso sempre vale
+    def _aguardar(self, versao_minima: Optional[int]) -> None:
+        if self.replica is None:
+            return
+        # antes da carga do estado, a réplica não tem o catálogo (nem a versão) do primário
+        if not self.replica.carregada:
+            raise ValueError("Réplica ainda carregando o estado do primário.")
+        if versao_minima is None:
+            return
+        if not self.replica.aguardar(versao_minima, self.espera_leitura):
+            raise ValueError(f"Réplica ainda não alcançou a versão {versao_minima}.")
+
+    def listar(
+        self,
+        tipo: Optional[str] = None,
+        termo: Optional[str] = None,
+        disponivel: Optional[bool] = None,
+        estado: Optional[str] = None,
+        preco_min: Optional[float] = None,
+        preco_max: Optional[float] = None,
+        limite: Optional[int] = None,
+        cursor: Optional[str] = None,
+        por_referencia: bool = False,
+        versao_minima: Optional[int] = None,
+    ) -> Union[List[Produto], Pagina, object]:
+        self._aguardar(versao_minima)
+        filtros = dict(
+            termo=termo, tipo=tipo, disponivel=disponivel,
+            estado=estado, preco_min=preco_min, preco_max=preco_max,
+        )
+        # o resultado fica no servidor; o cliente recebe só a referência (RemoteObjectRef)
+        # e puxa fatias
+        if por_referencia:
+            if self.resultados is None:
+                raise ValueError("Este servidor não exporta resultados por referência.")
+            return self.resultados.exportar(self.loja.consultar(**filtros))
+        # sem limite nem cursor mantém a resposta antiga (lista completa)
+        if limite is None and cursor is None:
+            return self.loja.consultar(**filtros)
+        apos = decodificar_cursor(cursor) if cursor else None
+        itens, ultimo = self.loja.paginar(limite or LIMITE_PADRAO, apos, **filtros)
+        return Pagina(itens, codificar_cursor(ultimo) if ultimo is not None else None)
 
-    def buscar(self, termo: str) -> List[Produto]:
+    def buscar(self, termo: str, versao_minima: Optional[int] = None) -> List[Produto]:
+        self._aguardar(versao_minima)
         return self.loja.buscar(termo)
\ No newline at end of file
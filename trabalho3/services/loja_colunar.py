@@ -0,0 +1,201 @@
+import bisect
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+from models.base import Produto
+from services.loja import Loja
+
+try:
+    import numpy as np
+except ImportError:  # numpy é opcional: sem ele as colunas são varridas em Python puro
+    np = None
+
+# colunas de texto codificadas por dicionário (código 0 = produto sem o atributo)
+COLUNAS_TEXTO = ("autor", "genero", "materia", "instituicao", "artista")
+
+# coluna de strings internadas: cada linha guarda só o código do valor
+class ColunaTexto:
+    def __init__(self) -> None:
+        self.codigos = array("I")
+        self.valores: List[Optional[str]] = [None]
+        self._codigo_de: Dict[str, int] = {}
+
+    def codificar(self, valor: Optional[str]) -> int:
+        if valor is None:
+            return 0
+        codigo = self._codigo_de.get(valor)
+        if codigo is None:
+            codigo = self._codigo_de[valor] = len(self.valores)
+            self.valores.append(valor)
+        return codigo
+
+    # código de um valor já visto; -1 quando nenhuma linha o contém
+    def codigo(self, valor: str) -> int:
+        return self._codigo_de.get(valor, -1)
+
+# Loja com cópia colunar dos atributos para filtros e agregações sobre o catálogo inteiro;
+# get/listar/buscar e os índices continuam os da Loja
+@dataclass
+class LojaColunar(Loja):
+    _linha: Dict[str, int] = field(default_factory=dict, init=False, repr=False)
+    _ids: List[str] = field(default_factory=list, init=False, repr=False)
+    _precos: array = field(default_factory=lambda: array("d"), init=False, repr=False)
+    _disponivel: array = field(default_factory=lambda: array("b"), init=False, repr=False)
+    # estado também é internado: um valor fora de "novo"/"usado" não pode deixar as colunas pela metade
+    _estado: ColunaTexto = field(default_factory=ColunaTexto, init=False, repr=False)
+    _tipo: ColunaTexto = field(default_factory=ColunaTexto, init=False, repr=False)
+    _textos: Dict[str, ColunaTexto] = field(
+        default_factory=lambda: {c: ColunaTexto() for c in COLUNAS_TEXTO}, init=False, repr=False
+    )
+
+    def _indexar(self, produto: Produto, ordenado: bool = True) -> None:
+        super()._indexar(produto, ordenado)
+        linha = self._linha.get(produto.id)
+        if linha is None:
+            linha = self._linha[produto.id] = len(self._ids)
+            self._ids.append(produto.id)
+            self._precos.append(0.0)
+            self._disponivel.append(0)
+            self._estado.codigos.append(0)
+            self._tipo.codigos.append(0)
+            for coluna in self._textos.values():
+                coluna.codigos.append(0)
+        self._precos[linha] = produto.preco
+        self._disponivel[linha] = produto.disponivel
+        self._estado.codigos[linha] = self._estado.codificar(produto.estado)
+        self._tipo.codigos[linha] = self._tipo.codificar(produto.__class__.__name__.lower())
+        for nome, coluna in self._textos.items():
+            coluna.codigos[linha] = coluna.codificar(getattr(produto, nome, None))
+
+    # remove a linha trocando-a pela última, para não deslocar as colunas
+    def _desindexar(self, produto_id: str) -> None:
+        super()._desindexar(produto_id)
+        linha = self._linha.pop(produto_id)
+        ultima = len(self._ids) - 1
+        colunas = [self._precos, self._disponivel, self._estado.codigos, self._tipo.codigos]
+        colunas.extend(c.codigos for c in self._textos.values())
+        if linha != ultima:
+            movido = self._ids[ultima]
+            self._ids[linha] = movido
+            self._linha[movido] = linha
+            for coluna in colunas:
+                coluna[linha] = coluna[ultima]
+        self._ids.pop()
+        for coluna in colunas:
+            coluna.pop()
+
+    # linhas que atendem aos filtros; atributos de texto (ex.: instituicao="UF") comparam igualdade
+    def _linhas(
+        self,
+        tipo: Optional[str] = None,
+        estado: Optional[str] = None,
+        disponivel: Optional[bool] = None,
+        preco_min: Optional[float] = None,
+        preco_max: Optional[float] = None,
+        **iguais: str,
+    ) -> Sequence[int]:
+        condicoes = []
+        if tipo:
+            condicoes.append((self._tipo.codigos, "==", self._tipo.codigo(tipo.lower())))
+        if estado:
+            condicoes.append((self._estado.codigos, "==", self._estado.codigo(estado)))
+        if disponivel is not None:
+            condicoes.append((self._disponivel, "==", int(disponivel)))
+        if preco_min is not None:
+            condicoes.append((self._precos, ">=", preco_min))
+        if preco_max is not None:
+            condicoes.append((self._precos, "<=", preco_max))
+        for nome, valor in iguais.items():
+            if nome not in self._textos:
+                raise ValueError(f"Coluna desconhecida: {nome}")
+            coluna = self._textos[nome]
+            condicoes.append((coluna.codigos, "==", coluna.codigo(valor)))
+
+        n = len(self._ids)
+        if np is not None:
+            mascara = np.ones(n, dtype=bool)
+            for coluna, op, valor in condicoes:
+                v = np.frombuffer(coluna, dtype=coluna.typecode)
+                mascara &= (v == valor) if op == "==" else (v >= valor) if op == ">=" else (v <= valor)
+            return np.flatnonzero(mascara)
+
+        linhas = range(n)
+        for coluna, op, valor in condicoes:
+            if op == "==":
+                linhas = [i for i in linhas if coluna[i] == valor]
+            elif op == ">=":
+                linhas = [i for i in linhas if coluna[i] >= valor]
+            else:
+                linhas = [i for i in linhas if coluna[i] <= valor]
+        return linhas
+
+    # produtos que atendem aos filtros, na ordem das linhas
+    def filtrar(self, **filtros) -> List[Produto]:
+        with self._lock_indices:
+            return [self.estoque[self._ids[i]] for i in self._linhas(**filtros)]
+
+    def contar(self, **filtros) -> int:
+        with self._lock_indices:
+            return len(self._linhas(**filtros))
+
+    # quantidade, soma, média, mínimo e máximo dos preços filtrados
+    def estatisticas_preco(self, **filtros) -> Dict[str, float]:
+        with self._lock_indices:
+            linhas = self._linhas(**filtros)
+            if len(linhas) == 0:
+                return {"quantidade": 0, "soma": 0.0, "media": 0.0, "minimo": 0.0, "maximo": 0.0}
+            if np is not None:
+                v = np.frombuffer(self._precos, dtype="d")[linhas]
+                soma, minimo, maximo = float(v.sum()), float(v.min()), float(v.max())
+            else:
+                v = [self._precos[i] for i in linhas]
+                soma, minimo, maximo = sum(v), min(v), max(v)
+        return {"quantidade": len(linhas), "soma": soma, "media": soma / len(linhas),
+                "minimo": minimo, "maximo": maximo}
+
+    # contagem de preços por faixa; `limites` crescentes definem len(limites) - 1 faixas [a, b)
+    def histograma_precos(self, limites: Sequence[float], **filtros) -> List[int]:
+        if len(limites) < 2:
+            raise ValueError("Informe pelo menos dois limites.")
+        with self._lock_indices:
+            return self._histograma(limites, filtros)
+
+    def _histograma(self, limites: Sequence[float], filtros: dict) -> List[int]:
+        if np is not None:
+            v = np.frombuffer(self._precos, dtype="d")
+            if filtros:
+                v = v[self._linhas(**filtros)]
+            contagem, _ = np.histogram(v, bins=list(limites))
+            return contagem.tolist()
+        linhas = self._linhas(**filtros) if filtros else range(len(self._ids))
+        contagem = [0] * (len(limites) - 1)
+        ultima = len(contagem) - 1
+        for i in linhas:
+            p = self._precos[i]
+            # a última faixa inclui o limite superior, como em numpy.histogram
+            k = ultima if p == limites[-1] else bisect.bisect_right(limites, p) - 1
+            if 0 <= k <= ultima:
+                contagem[k] += 1
+        return contagem
+
+    # multiplica o preço dos produtos filtrados por `fator`; retorna quantos mudaram
+    def reprecificar(self, fator: float, **filtros) -> int:
+        with self._lock_indices:
+            ids = [self._ids[i] for i in self._linhas(**filtros)]
+        alterados = 0
+        posicao = None
+        for produto_id in ids:
+            with self.travar(produto_id):
+                produto = self.estoque.get(produto_id)
+                if produto is None:
+                    continue
+                with self._lock_indices:
+                    produto.preco = round(produto.preco * fator, 2)
+                    # trocas validadas com o preço antigo passam a dar conflito
+                    produto.versao += 1
+                    self._indexar(produto)
+                posicao = self._registrar({"op": "substituir", "produto": produto.to_dict()})
+                alterados += 1
+        # um único fsync confirma todas as alterações (as posições no log são crescentes)
+        self._confirmar(posicao)
+        return alterados